@@ -1,5 +1,12 @@
+import importlib
+import warnings
+
+import gym
 from gym.envs.registration import register
 
+# Every entry point is a string, nothing is imported until gym.make asks for it (the subpackages are lazy as well,
+# see seagul.envs.lazy). Keep it that way, this module gets imported by every ARS/PPO worker process.
+
 register(id="mj_su_cartpole-v0", entry_point="seagul.envs.mujoco:MJSUCartPoleEnv")
 register(id="mj_su_cartpole_sparse-v0", entry_point="seagul.envs.mujoco:MJSUCartPoleSparseEnv")
 register(id="mj_su_cartpole_et-v0", entry_point="seagul.envs.mujoco:MJSUCartPoleEtEnv")
@@ -10,19 +17,30 @@ register(id="humanoid_long-v1", entry_point="gym.envs.mujoco:HumanoidEnv")
 
 register(id="lorenz-v0", entry_point="seagul.envs.simple_nonlinear:LorenzEnv")
 register(id="linear_z-v0", entry_point="seagul.envs.simple_nonlinear:LinearEnv")
+register(id="linear_z_vec-v0", entry_point="seagul.envs.simple_nonlinear:VecLinearEnv")
 register(id="gen_nonlin-v0", entry_point="seagul.envs.simple_nonlinear:GenEnv")
+register(id="gen_nonlin_vec-v0", entry_point="seagul.envs.simple_nonlinear:VecGenEnv")
 register(id="tree_simple-v0", entry_point="seagul.envs.simple_nonlinear:TreeSimple")
 register(id="tree_multi-v0", entry_point="seagul.envs.simple_nonlinear:TreeMulti")
+register(id="tree_vec-v0", entry_point="seagul.envs.simple_nonlinear:VecTreeEnv")
+register(id="tree_simple_vec-v0", entry_point="seagul.envs.simple_nonlinear:VecTreeSimple")
+register(id="tree_multi_vec-v0", entry_point="seagul.envs.simple_nonlinear:VecTreeMulti")
+register(id="pixel_tree-v0", entry_point="seagul.envs.simple_nonlinear:PixelTreeEnv")
+register(id="pixel_tree_vec-v0", entry_point="seagul.envs.simple_nonlinear:VecPixelTreeEnv")
 register(id="lqr-v0", entry_point="seagul.envs.classic_control:LQREnv")
+register(id="lqr_vec-v0", entry_point="seagul.envs.classic_control:VecLQREnv")
 
 
 register(id="dyn_car-v0", entry_point="seagul.envs.car:DynCarEnv")
+register(id="dyn_car_vec-v0", entry_point="seagul.envs.car:VecDynCarEnv")
 register(id="bullet_car-v0", entry_point="seagul.envs.bullet:RacecarGymEnv_v1")
 register(id="bullet_car_ast-v0", entry_point="seagul.envs.bullet:RacecarGymEnvAst_v1")
 # register(id="walker2d_five_link-v0", entry_point="seagul.envs.bullet:Walker2DFiveLink")
 
 register(id="planar_quad-v0", entry_point="seagul.envs.classic_control:PlanarQuadCopter")
 register(id="deadzone_quad-v0", entry_point="seagul.envs.classic_control:DeadzoneQuadCopter")
+register(id="planar_quad_vec-v0", entry_point="seagul.envs.classic_control:VecPlanarQuadCopter")
+register(id="deadzone_quad_vec-v0", entry_point="seagul.envs.classic_control:VecDeadzoneQuadCopter")
 register(id="linear-v0", entry_point="seagul.envs.classic_control:LinearEnv")
 
 
@@ -30,8 +48,13 @@ register(id="su_cartpole-v0", entry_point="seagul.envs.classic_control:SUCartPol
 register(id="sg_cartpole-v0", entry_point="seagul.envs.classic_control:SGCartPoleEnv")
 register(id="su_cartpole_push-v0", entry_point="seagul.envs.classic_control:SUCartPolePushEnv")
 register(id="su_cartpole_discrete-v0", entry_point="seagul.envs.classic_control:SUCartPoleDiscEnv")
+register(id="su_cartpole_vec-v0", entry_point="seagul.envs.classic_control:VecSUCartPoleEnv")
+register(id="sg_cartpole_vec-v0", entry_point="seagul.envs.classic_control:VecSGCartPoleEnv")
+register(id="su_cartpole_push_vec-v0", entry_point="seagul.envs.classic_control:VecSUCartPolePushEnv")
+register(id="su_cartpole_discrete_vec-v0", entry_point="seagul.envs.classic_control:VecSUCartPoleDiscEnv")
 register(id="su_pendulum-v0", entry_point="seagul.envs.classic_control:SUPendulumEnv")
 register(id="su_acrobot-v0", entry_point="seagul.envs.classic_control:SGAcroEnv")
+register(id="su_acrobot_vec-v0", entry_point="seagul.envs.classic_control:VecSGAcroEnv")
 
 register(id="su_acrobot-v2", entry_point="seagul.envs.classic_control:SGAcroEnv2")
 register(id="su_acroswitch-v0", entry_point="seagul.envs.classic_control:SGAcroSwitchEnv")
@@ -41,112 +64,67 @@ register(id="sym_pendulum-v0", entry_point="seagul.envs.classic_control:Pendulum
 register(id="dt_pendulum-v0", entry_point="seagul.envs.classic_control:PendulumDtEnv", max_episode_steps=200)
 register(id="su_acro_drake-v0", entry_point="seagul.envs.drake:DrakeAcroEnv")
 
-# Also go ahead and try to register environments for rllib as well
-
-try:
-    import pybullet_envs
-except:
-    import warnings
-
-    warnings.warn("Warning, pybullet envs not installed")
-
-try:
-    import switched_rl.dm_gym
-except:
-    import warnings
-
-    warnings.warn("Warning, pybullet envs not installed")
-
-try:
-    # Ray requires it's own registry, can't rely on the normal mechanisms that gym uses
-
-    #    from seagul.envs.mujoco.five_link import FiveLinkWalkerEnv
-    import gym
-    from ray.tune.registry import register_env
-
-
-    #   def five_link_creator(env_config):
-    #       return FiveLinkWalkerEnv()
-
-    # TODO I'm sure we can find a way to register all envs currently in the registry automatically...
-    def bullet_walker_creator(env_config):
-        return gym.make("Walker2DBulletEnv-v0")
-
-
-    def bullet_cheetah_creator(env_config):
-        return gym.make("HalfCheetahBulletEnv-v0")
-
-
-    def bullet_hopper_creator(env_config):
-        return gym.make("HopperBulletEnv-v0")
+# These use a matlab engine by default (shared by every env in the process), pass backend="numpy" to gym.make to run them in process instead
+register(id="bball-v0", entry_point="seagul.envs.matlab:BBallEnv")
+register(id="bball3-v1", entry_point="seagul.envs.matlab:BBall3Env")
+register(id="bball_vec-v0", entry_point="seagul.envs.matlab:VecBBallEnv")
+register(id="bball3_vec-v1", entry_point="seagul.envs.matlab:VecBBall3Env")
 
 
-    def bullet_humanoid_creator(env_config):
-        return gym.make("HumanoidBulletEnv-v0")
+# Optional backends register their own envs when they are imported, we only import them on demand
+_backends = {"pybullet": "pybullet_envs", "dm": "switched_rl.dm_gym"}
+_loaded_backends = {}
 
 
-    def sym_pendulum_creator(env_config):
-        return gym.make("sym_pendulum-v0")
+def load_backend(name):
+    """
+    Import one of the optional backends so that its envs get registered with gym.
 
+    Args:
+        name: "pybullet" for the pybullet_envs locomotion envs, "dm" for the switched_rl dm_control envs
 
-    def dt_pendulum_creator(env_config):
-        return gym.make("dt_pendulum-v0")
+    Returns:
+        True if the backend is available, False (with a warning) if it isn't installed
+    """
+    if name not in _loaded_backends:
+        try:
+            importlib.import_module(_backends[name])
+            _loaded_backends[name] = True
+        except ImportError:
+            warnings.warn(f"Warning, {_backends[name]} not installed, {name} envs not registered")
+            _loaded_backends[name] = False
 
+    return _loaded_backends[name]
 
-    def sg_pendulum_creator(env_config):
-        return gym.make("sg_cartpole-v0")
 
+def make(env_id, **kwargs):
+    """
+    gym.make, but if env_id isn't registered we load the optional backends and try again.
+    Use this for ids that come from pybullet_envs or switched_rl, e.g. make("HopperBulletEnv-v0"), a plain gym.make
+    only knows about them once load_backend has been called. Everything in seagul.rl makes its envs with this.
+    """
+    try:
+        return gym.make(env_id, **kwargs)
+    except gym.error.UnregisteredEnv:
+        if not any([load_backend(name) for name in _backends if name not in _loaded_backends]):
+            raise
 
-    def humanoid_long_creator(env_config):
-        return gym.make("humanoid_long-v1")
+    return gym.make(env_id, **kwargs)
 
 
-    def lorenz_creator(env_config):
-        return gym.make("lorenz-v0", **env_config)
-
-
-    def linear_creator(env_config):
-        return gym.make("linear_z-v0", **env_config)
-
-
-    def generic_creator(env_config):
-        return gym.make("gen_nonlin-v0", **env_config)
-
-
-    def drake_creator(env_config):
-        return gym.make("su_acro_drake-v0", **env_config)
-
-
-    def acro_creator(env_config):
-        return gym.make("su_acrobot-v0", **env_config)
-
-
-    def acroswitch_creator(env_config):
-        return gym.make("su_acroswitch-v0", **env_config)
-
-
-    def dm_creator(env_config):
-        return gym.make("dm_acrobot-v0", **env_config)
-
-
-    #  register_env("five_link-v3", five_link_creator)
-    register_env("Walker2DBulletEnv-v0", bullet_walker_creator)
-    register_env("HopperBulletEnv-v0", bullet_hopper_creator)
-    register_env("HalfCheetahBulletEnv-v0", bullet_humanoid_creator)
-    register_env("HumanoidBulletEnv-v0", bullet_humanoid_creator)
-    register_env("sym_pendulum-v0", sym_pendulum_creator)
-    register_env("dt_pendulum-v0", dt_pendulum_creator)
-    register_env("sg_cartpole-v0", sg_pendulum_creator)
-    register_env("humanoid_long-v1", humanoid_long_creator)
-    register_env("lorenz-v0", lorenz_creator)
-    register_env("linear_z-v0", linear_creator)
-    register_env("gen_nonlin-v0", generic_creator)
-    register_env("su_acro_drake-v0", drake_creator)
-    register_env("su_acrobot-v0", acro_creator)
-    register_env("su_acroswitch-v0", acroswitch_creator)
-    register_env("dm_acrobot-v0", dm_creator)
-
-except:
-    import warnings
+def register_rllib_envs():
+    """
+    Ray requires it's own registry, can't rely on the normal mechanisms that gym uses.
+    Call this before handing any of these ids to rllib, it used to happen whenever seagul.envs was imported.
+    """
+    from ray.tune.registry import register_env
 
-    warnings.warn("Warning, rllib environments not registered")
+    # TODO I'm sure we can find a way to register all envs currently in the registry automatically...
+    # These ignore env_config, the rest get it passed through as kwargs
+    for env_id in ["Walker2DBulletEnv-v0", "HopperBulletEnv-v0", "HalfCheetahBulletEnv-v0", "HumanoidBulletEnv-v0",
+                   "sym_pendulum-v0", "dt_pendulum-v0", "sg_cartpole-v0", "humanoid_long-v1"]:
+        register_env(env_id, lambda env_config, env_id=env_id: make(env_id))
+
+    for env_id in ["lorenz-v0", "linear_z-v0", "gen_nonlin-v0", "su_acro_drake-v0", "su_acrobot-v0",
+                   "su_acroswitch-v0", "dm_acrobot-v0"]:
+        register_env(env_id, lambda env_config, env_id=env_id: make(env_id, **env_config))
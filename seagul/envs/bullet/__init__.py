@@ -1,5 +1,13 @@
-# from seagul.envs.bullet.walker2d_fl import Walker2DFiveLink
-#from seagul.envs.bullet.bullet_car import RacecarGymEnv_v1
-#from seagul.envs.bullet.bullet_car_ast import RacecarGymEnvAst_v1
-from seagul.envs.bullet.walker import PBMJWalker2dEnv
-from seagul.envs.bullet.walker_fc import PBMJWalker2dFCEnv
+# Modules are only imported when one of their envs is asked for, see seagul.envs.lazy
+from seagul.envs.lazy import lazy_exports
+
+_exports = {
+    # "Walker2DFiveLink": "walker2d_fl",
+    "RacecarGymEnv_v1": "bullet_car",
+    "RacecarGymEnvAst_v1": "bullet_car_ast",
+    "PBMJWalker2dEnv": "walker",
+    "PBMJWalker2dFCEnv": "walker_fc",
+}
+
+__all__ = list(_exports)
+__getattr__, __dir__ = lazy_exports(__name__, _exports)
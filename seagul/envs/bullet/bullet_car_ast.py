@@ -17,6 +17,7 @@ import random
 from pybullet_envs.bullet import bullet_client
 import pybullet_data
 from pkg_resources import parse_version
+from seagul.envs.snapshot import BulletSnapshotMixin
 
 RENDER_HEIGHT = 720
 RENDER_WIDTH = 960
@@ -45,7 +46,9 @@ def rot_mat(theta):
     return np.array([[np.cos(theta), -np.sin(theta)], [np.sin(theta), np.cos(theta)]])
 
 
-class RacecarGymEnvAst_v1(gym.Env):
+class RacecarGymEnvAst_v1(BulletSnapshotMixin, gym.Env):
+    snapshot_attrs = ("_envStepCounter", "_observation", "goal")
+
     metadata = {"render.modes": ["human", "rgb_array"], "video.frames_per_second": 50}
     # default repeat only 5 times - 0.05 like in mujoco
     def __init__(
@@ -1,10 +1,12 @@
 import gym
 import numpy as np
-import pybullet as p
+import pybullet
 import pybullet_data
+from pybullet_envs.bullet import bullet_client
+from seagul.envs.snapshot import BulletSnapshotMixin
 
 
-class PBMJWalker2dEnv(gym.Env):
+class PBMJWalker2dEnv(BulletSnapshotMixin, gym.Env):
     motor_joints = [4, 6, 8, 10, 12, 14]
     num_joints = 16
 
@@ -28,33 +30,34 @@ class PBMJWalker2dEnv(gym.Env):
         low = -np.ones(17)*np.inf
         self.observation_space = gym.spaces.Box(low=low, high=-low, dtype=np.float32)
 
+        # Every env gets its own physics server, so any number of them can live in one process
         if render:
-            p.connect(p.GUI)
+            self._p = bullet_client.BulletClient(connection_mode=pybullet.GUI)
         else:
-            p.connect(p.DIRECT)
+            self._p = bullet_client.BulletClient(connection_mode=pybullet.DIRECT)
 
-        self.plane_id = p.loadSDF(pybullet_data.getDataPath() + "/plane_stadium.sdf")[0]
-        self.walker_id = p.loadMJCF(pybullet_data.getDataPath() + "/mjcf/walker2d.xml")[0]
-        #flags=p.URDF_USE_SELF_COLLISION | p.URDF_USE_SELF_COLLISION_EXCLUDE_ALL_PARENTS)[0] # TODO not sure the self collision needs to be here..
+        self.plane_id = self._p.loadSDF(pybullet_data.getDataPath() + "/plane_stadium.sdf")[0]
+        self.walker_id = self._p.loadMJCF(pybullet_data.getDataPath() + "/mjcf/walker2d.xml")[0]
+        #flags=pybullet.URDF_USE_SELF_COLLISION | pybullet.URDF_USE_SELF_COLLISION_EXCLUDE_ALL_PARENTS)[0] # TODO not sure the self collision needs to be here..
 
-        p.setGravity(0, 0, -9.8)
+        self._p.setGravity(0, 0, -9.8)
 
         if physics_params is None:
             physics_params = {}
         if dynamics_params is None:
             dynamics_params = {}
 
-        p.changeDynamics(self.plane_id, -1, **dynamics_params)
+        self._p.changeDynamics(self.plane_id, -1, **dynamics_params)
 
-        for i in range(p.getNumJoints(self.walker_id)):
-            p.changeDynamics(self.walker_id,i,**dynamics_params)
+        for i in range(self._p.getNumJoints(self.walker_id)):
+            self._p.changeDynamics(self.walker_id,i,**dynamics_params)
 
-        p.changeDynamics(self.walker_id, -1, **dynamics_params)
+        self._p.changeDynamics(self.walker_id, -1, **dynamics_params)
 
     
-        p.setPhysicsEngineParameter(**physics_params)
+        self._p.setPhysicsEngineParameter(**physics_params)
 
-        self.dt = p.getPhysicsEngineParameters()['fixedTimeStep']
+        self.dt = self._p.getPhysicsEngineParameters()['fixedTimeStep']
 
         self.reset()
 
@@ -67,16 +70,16 @@ class PBMJWalker2dEnv(gym.Env):
         #forces = (a*np.array([100, 100, 100, 100, 100, 100])).tolist()
         forces = (a*self.torque_limits).tolist()
         
-        x_before  = p.getLinkState(self.walker_id, 3, computeForwardKinematics=1)[0][0]
+        x_before  = self._p.getLinkState(self.walker_id, 3, computeForwardKinematics=1)[0][0]
 
-        p.setJointMotorControlArray(self.walker_id, self.motor_joints, p.TORQUE_CONTROL, forces=forces)
-        p.stepSimulation()
+        self._p.setJointMotorControlArray(self.walker_id, self.motor_joints, pybullet.TORQUE_CONTROL, forces=forces)
+        self._p.stepSimulation()
         
-        x_after  = p.getLinkState(self.walker_id, 3, computeForwardKinematics=1)[0][0]
+        x_after  = self._p.getLinkState(self.walker_id, 3, computeForwardKinematics=1)[0][0]
 
-        base_link_info = p.getLinkState(self.walker_id, 3, computeLinkVelocity=1, computeForwardKinematics=1)
+        base_link_info = self._p.getLinkState(self.walker_id, 3, computeLinkVelocity=1, computeForwardKinematics=1)
         base_pos = base_link_info[0]
-        base_orn = p.getEulerFromQuaternion(base_link_info[1])
+        base_orn = self._p.getEulerFromQuaternion(base_link_info[1])
         
         height = base_pos[2]
         pitch  = base_orn[1] # Pitch
@@ -98,14 +101,14 @@ class PBMJWalker2dEnv(gym.Env):
 
         state = []
 
-        base_link_info = p.getLinkState(self.walker_id, 3, computeLinkVelocity=1, computeForwardKinematics=1)
+        base_link_info = self._p.getLinkState(self.walker_id, 3, computeLinkVelocity=1, computeForwardKinematics=1)
         base_pos = base_link_info[0]
-        base_orn = p.getEulerFromQuaternion(base_link_info[1])
+        base_orn = self._p.getEulerFromQuaternion(base_link_info[1])
         
         state.append(base_pos[2]) # Z
         state.append(base_orn[1]) # Pitch
 
-        for s in p.getJointStates(self.walker_id, self.motor_joints):
+        for s in self._p.getJointStates(self.walker_id, self.motor_joints):
             state.append(s[0])
 
 
@@ -118,7 +121,7 @@ class PBMJWalker2dEnv(gym.Env):
         state.append(np.clip(base_angvel[1], -10,10)) # Pitch
 
         
-        for s in p.getJointStates(self.walker_id, self.motor_joints):
+        for s in self._p.getJointStates(self.walker_id, self.motor_joints):
             state.append(np.clip(s[1], -10,10))
             
         return np.array(state)
@@ -126,36 +129,35 @@ class PBMJWalker2dEnv(gym.Env):
 
     def reset(self):
 
-        p.resetBasePositionAndOrientation(self.walker_id, [0,0,0],[0,0,0,1])
+        self._p.resetBasePositionAndOrientation(self.walker_id, [0,0,0],[0,0,0,1])
 
-        for i in range(p.getNumJoints(self.walker_id)):
+        for i in range(self._p.getNumJoints(self.walker_id)):
             init_ang = np.random.uniform(low=-self.init_noise, high=self.init_noise)
             init_vel = np.random.uniform(low=-self.init_noise, high=self.init_noise)
-            p.resetJointState(self.walker_id, i,init_ang,init_vel)
+            self._p.resetJointState(self.walker_id, i,init_ang,init_vel)
 
         init_x = np.random.uniform(low=-self.init_noise, high=self.init_noise)
         init_z = np.random.uniform(low=-self.init_noise, high=self.init_noise)
         init_pitch = np.random.uniform(low=-self.init_noise, high=self.init_noise)
         init_pos = [init_x, 0, init_z]
-        init_orn = p.getQuaternionFromEuler([0, init_pitch, 0])
-        p.resetBasePositionAndOrientation(self.walker_id, init_pos, init_orn)
+        init_orn = self._p.getQuaternionFromEuler([0, init_pitch, 0])
+        self._p.resetBasePositionAndOrientation(self.walker_id, init_pos, init_orn)
 
         init_vx = np.random.uniform(low=-self.init_noise, high=self.init_noise)
         init_vz = np.random.uniform(low=-self.init_noise, high=self.init_noise)
         init_vp = np.random.uniform(low=-self.init_noise, high=self.init_noise)
-        p.resetBaseVelocity(self.walker_id,[init_vx,0,init_vz], [0,init_vp,0])
+        self._p.resetBaseVelocity(self.walker_id,[init_vx,0,init_vz], [0,init_vp,0])
 
-        p.setJointMotorControlArray(self.walker_id,
-                                    [i for i in range(p.getNumJoints(self.walker_id))],
-                                    p.POSITION_CONTROL,
+        self._p.setJointMotorControlArray(self.walker_id,
+                                    [i for i in range(self._p.getNumJoints(self.walker_id))],
+                                    pybullet.POSITION_CONTROL,
                                     positionGains=[0.1] * self.num_joints,
                                     velocityGains=[0.1] * self.num_joints,
-                                    forces=[0 for _ in range(p.getNumJoints(self.walker_id))]
+                                    forces=[0 for _ in range(self._p.getNumJoints(self.walker_id))]
                                     )
         self.cur_step = 0
         
         return self._get_obs()
 
-
-
-
+    def close(self):
+        self._p.disconnect()
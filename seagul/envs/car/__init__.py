@@ -1 +1,10 @@
-from seagul.envs.car.dynamic_car import DynCarEnv
+# Modules are only imported when one of their envs is asked for, see seagul.envs.lazy
+from seagul.envs.lazy import lazy_exports
+
+_exports = {
+    "DynCarEnv": "dynamic_car",
+    "VecDynCarEnv": "vec_dynamic_car",
+}
+
+__all__ = list(_exports)
+__getattr__, __dir__ = lazy_exports(__name__, _exports)
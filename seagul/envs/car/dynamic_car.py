@@ -2,12 +2,12 @@ import numpy as np
 from numpy import cos, sin, pi
 from gym.utils import seeding
 
+from seagul.integration import rk4, euler, wrap
+
 
 import gym
 
 
-from scipy.integrate import solve_ivp
-import matplotlib.pyplot as plt
 
 
 class DynCarEnv(gym.Env):
@@ -81,18 +81,11 @@ class DynCarEnv(gym.Env):
         xdot = q[3]; ydot = q[4]; thdot = q[5]
         """
 
-        qdot = np.zeros_like(q)
-
-        qdot[0] = np.cos(q[2])
-        qdot[1] = np.sin(q[2])
-        qdot[2] = q[5]
-
-        qdot[3] = a[0] * np.cos(q[2]) * self.m
-        qdot[4] = a[0] * np.sin(q[2]) * self.m
+        c = np.cos(q[2])
+        s = np.sin(q[2])
 
-        qdot[5] = a[1]
-
-        return qdot
+        # the goal (q[6:]) doesn't move
+        return np.array([c, s, q[5], a[0] * c * self.m, a[0] * s * self.m, a[1], 0.0, 0.0, 0.0])
 
     def render(self, mode="human"):
         raise NotImplementedError
@@ -110,62 +103,3 @@ class DynCarEnv(gym.Env):
     def _get_ob(self):
         return self.state + self.np_random.uniform(-self.state_noise_max, self.state_noise_max, size=(9,))
 
-
-def wrap(x, m, M):
-    """
-    :param x: a scalar
-    :param m: minimum possible value in range
-    :param M: maximum possible value in range
-    Wraps ``x`` so m <= x <= M; but unlike ``bound()`` which
-    truncates, ``wrap()`` wraps x around the coordinate system defined by m,M.\n
-    For example, m = -180, M = 180 (degrees), x = 360 --> returns 0.
-    """
-    diff = M - m
-    while x > M:
-        x = x - diff
-    while x < m:
-        x = x + diff
-    return x
-
-
-def rk4(derivs, a, t0, dt, s0):
-    """
-    Single step of an RK4 solver, designed for control applications, so it passed an action to your
-    derivs fcn
-
-    Attributes:
-        derivs: the function you are trying to integrate, should have signature:
-        function(t,s,a) -> ds/dt
-
-        a: action, should belong to the action space of your environment
-
-        t0: float, initial time, often you can just set this to zero if all that matters for your
-        derivs is the state and dt
-
-        dt: how big of a timestep to integrate
-
-        s0: initial state of your system, should belong to the envs obvervation space
-
-    Returns:
-        s[n+1]: I.E. the state of your system after integrating with action a for dt seconds
-
-    Example:
-        derivs = lambda t,q,a: (q+a)**2
-        a =  1.0
-        t0 = 0
-        dt = .1
-        s0 = 5
-        s1 = rk4(derivs, a, t0, dt, s0)
-
-    """
-
-    k1 = dt * derivs(t0, s0, a)
-    k2 = dt * derivs(t0 + dt / 2, s0 + k1 / 2, a)
-    k3 = dt * derivs(t0 + dt / 2, s0 + k2 / 2, a)
-    k4 = dt * derivs(t0 + dt, s0 + k3, a)
-
-    return s0 + 1 / 6 * (k1 + 2 * k2 + 2 * k3 + k4)
-
-
-def euler(derivs, a, t0, dt, s0):
-    return s0 + dt * derivs(t0 + dt, s0, a)
@@ -0,0 +1,100 @@
+import numpy as np
+from numpy import pi
+from gym.utils import seeding
+
+import gym
+
+from seagul.integration import batch_euler, wrap
+
+
+class VecDynCarEnv(gym.Env):
+    """
+      N copies of DynCarEnv simulated in lock-step, the state is an (N, 9) array with the same layout
+      [x(m), y(m) theta(rads), dx/dt, dy/dt, dth/dt, goal_x, goal_y, goal_t]
+
+      step takes (N, 2) actions and returns (N, 9) obs, (N,) rewards and (N,) dones. Envs that finish are reset
+      automatically, the obs they finished on are in info["terminal_obs"].
+    """
+
+    metadata = {"render.modes": []}
+
+    def __init__(self, num_envs=1, dt=0.01, integrator=batch_euler):
+        self.num_envs = num_envs
+        self.m = 1
+        self.a_max = 10
+        self.dt = dt
+        self.integrator = integrator
+        self.state_noise_max = 0.0
+
+        self.X_MAX = self.Y_MAX = 100.0
+        self.DX_MAX = self.DY_MAX = 500.0
+        self.DTHETA_MAX = 100.0 * pi
+
+        self.T_MAX = 10
+        self.init_state = np.array([0, 0, 0, 0, 0, 0, 0, 0, 10], dtype=np.float64)
+
+        car_state_max = np.array([self.X_MAX, self.Y_MAX, pi, self.DX_MAX, self.DY_MAX, self.DTHETA_MAX])
+        goal_state_max = np.array([self.X_MAX, self.Y_MAX, self.T_MAX])
+
+        aug_state_max = np.concatenate((car_state_max, goal_state_max))
+        self.observation_space = gym.spaces.Box(low=-aug_state_max, high=aug_state_max)
+
+        self.action_space = gym.spaces.Box(-self.a_max, self.a_max, shape=(2,))
+
+        self.seed()
+        self.reset()
+
+    def seed(self, seed=None):
+        self.np_random, seed = seeding.np_random(seed)
+        return [seed]
+
+    def _sample_init(self, n):
+        return self.init_state + self.np_random.uniform(-self.state_noise_max, self.state_noise_max, size=(n, 9))
+
+    def reset(self):
+        self.state = self._sample_init(self.num_envs)
+        return self.state.copy()
+
+    def step(self, action):
+        action = np.asarray(action, dtype=np.float64).reshape(self.num_envs, 2)
+
+        ns = self.integrator(self._derivs, action, 0, self.dt, self.state)
+
+        # state 6 and 7 are the goal xy and don't change, 8 is the time left
+        self.state[:, 0:6] = ns[:, 0:6]
+        self.state[:, 2] = wrap(ns[:, 2], -pi, pi)
+        self.state[:, 8] -= self.dt
+
+        reward = (self.state[:, 6] - self.state[:, 0]) ** 2 + (self.state[:, 7] - self.state[:, 1]) ** 2
+        done = self.state[:, 8] < 0
+
+        obs = self.state.copy()
+        info = {"terminal_obs": obs.copy()}
+        if done.any():
+            self.state[done] = self._sample_init(done.sum())
+            obs[done] = self.state[done]
+
+        return obs, reward, done, info
+
+    def _derivs(self, t, Q, A):
+        """
+        Same dynamics as DynCarEnv._derivs over an (N, 9) batch of states and (N, 2) batch of actions
+        """
+        Qdot = np.zeros_like(Q)
+
+        c = np.cos(Q[:, 2])
+        s = np.sin(Q[:, 2])
+
+        Qdot[:, 0] = c
+        Qdot[:, 1] = s
+        Qdot[:, 2] = Q[:, 5]
+
+        Qdot[:, 3] = A[:, 0] * c * self.m
+        Qdot[:, 4] = A[:, 0] * s * self.m
+
+        Qdot[:, 5] = A[:, 1]
+
+        return Qdot
+
+    def render(self, mode="human"):
+        raise NotImplementedError
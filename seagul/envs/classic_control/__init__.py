@@ -1,24 +1,33 @@
-from seagul.envs.classic_control.su_cartpole import SUCartPoleEnv
-from seagul.envs.classic_control.sg_cartpole import SGCartPoleEnv
-from seagul.envs.classic_control.su_cartpole_gym import CartPoleEnv
+# Modules are only imported when one of their envs is asked for, see seagul.envs.lazy
+from seagul.envs.lazy import lazy_exports
 
-# from seagul.envs.classic_control.cartpole_tedrake import SUCartPoleEnv
+_exports = {
+    "SUCartPoleEnv": "su_cartpole",
+    "SGCartPoleEnv": "sg_cartpole",
+    "VecSUCartPoleEnv": "vec_cartpole",
+    "VecSGCartPoleEnv": "vec_cartpole",
+    "VecSUCartPolePushEnv": "vec_cartpole",
+    "VecSUCartPoleDiscEnv": "vec_cartpole",
+    "CartPoleEnv": "su_cartpole_gym",
+    # "SUCartPoleEnv": "cartpole_tedrake",
+    "SUCartPoleDiscEnv": "su_cartpole_discrete",
+    "SUPendulumEnv": "su_pendulum",
+    "SUCartPolePushEnv": "su_cartpole_push",
+    "SGAcroEnv": "acrobot",
+    "VecSGAcroEnv": "vec_acrobot",
+    "SGAcroEnv2": "acrobot2",
+    "SGAcroSwitchEnv": "acrobot_switch",
+    "SGAcroSwitchSinEnv": "acroswitchsin",
+    "PendulumSymEnv": "sym_pendulum",
+    "PendulumDtEnv": "dt_pendulum",
+    "DeadzoneQuadCopter": "deadzone_quadcopter",
+    "PlanarQuadCopter": "planar_quadcopter",
+    "VecPlanarQuadCopter": "vec_quadcopter",
+    "VecDeadzoneQuadCopter": "vec_quadcopter",
+    "LinearEnv": "linear",
+    "LQREnv": "lqr",
+    "VecLQREnv": "vec_lqr",
+}
 
-from seagul.envs.classic_control.su_cartpole_discrete import SUCartPoleDiscEnv
-
-from seagul.envs.classic_control.su_pendulum import SUPendulumEnv
-from seagul.envs.classic_control.su_cartpole_push import SUCartPolePushEnv
-from seagul.envs.classic_control.acrobot import SGAcroEnv
-from seagul.envs.classic_control.acrobot2 import SGAcroEnv2
-from seagul.envs.classic_control.acrobot_switch import SGAcroSwitchEnv
-from seagul.envs.classic_control.acroswitchsin import SGAcroSwitchSinEnv
-
-
-from seagul.envs.classic_control.sym_pendulum import PendulumSymEnv
-from seagul.envs.classic_control.dt_pendulum import PendulumDtEnv
-
-from seagul.envs.classic_control.deadzone_quadcopter import DeadzoneQuadCopter
-from seagul.envs.classic_control.planar_quadcopter import PlanarQuadCopter
-from seagul.envs.classic_control.linear import LinearEnv
-
-from seagul.envs.classic_control.lqr import LQREnv
+__all__ = list(_exports)
+__getattr__, __dir__ = lazy_exports(__name__, _exports)
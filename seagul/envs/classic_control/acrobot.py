@@ -6,13 +6,16 @@ import numpy as np
 from numpy import pi
 from numpy import sin, cos, pi
 
-from seagul.integration import rk4, euler,wrap
+from seagul.integration import rk4, euler, wrap, integrate_hold
+from seagul.envs.snapshot import SnapshotMixin
 
 
-class SGAcroEnv(core.Env):
+class SGAcroEnv(SnapshotMixin, core.Env):
     """ A simple acrobot environment
     """
 
+    snapshot_attrs = ("state", "t")
+
     def __init__(self,
                  max_torque=25,
                  init_state=np.array([-pi/2, 0.0, 0.0, 0.0]),
@@ -81,6 +84,7 @@ class SGAcroEnv(core.Env):
         self.t = 0
 
         self.num_steps = int(self.max_t / (self.act_hold * self.dt))
+        self.full_state = np.empty((self.act_hold, 4))
         self.state = self.reset()
 
     def reset(self, init_vec=None):
@@ -99,13 +103,13 @@ class SGAcroEnv(core.Env):
 
 
     def step(self, a):
+        """
+        Note that info["full_state"] is a buffer that gets overwritten on the next step, copy it if you want to keep it
+        """
         a = np.clip(a, -self.max_torque, self.max_torque)
+        integrate_hold(self._dynamics, a, self.t, self.dt, self.state, self.act_hold, out=self.full_state, integrator=self.integrator)
+        self.state = self.full_state[-1].copy()
         self.t += self.dt * self.act_hold
-        full_state = []
-
-        for _ in range(self.act_hold):
-            self.state = self.integrator(self._dynamics, a, self.t, self.dt, self.state)
-            full_state.append(self.state)
 
         done = False
         reward, done = self.reward_fn(self.state, a)
@@ -118,8 +122,7 @@ class SGAcroEnv(core.Env):
             reward -= 5
             done = True
 
-        full_state = np.array(full_state).reshape(-1, 4)
-        return self._get_obs(), reward, done, {"full_state": full_state}
+        return self._get_obs(), reward, done, {"full_state": self.full_state}
 
     def _get_obs(self):
         obs = self.state.copy()
@@ -7,12 +7,15 @@ from numpy import pi
 from numpy import sin, cos, pi
 
 from seagul.integration import rk4, euler,wrap
+from seagul.envs.snapshot import SnapshotMixin
 
 
-class SGAcroEnv2(core.Env):
+class SGAcroEnv2(SnapshotMixin, core.Env):
     """ A simple acrobot environment
     """
 
+    snapshot_attrs = ("state", "t")
+
     def __init__(self,
                  max_torque=25,
                  init_state=np.array([-pi/2, 0.0, 0.0, 0.0]),
@@ -8,12 +8,15 @@ from numpy import pi
 from numpy import sin, cos, pi
 
 from seagul.integration import rk4, euler,wrap
+from seagul.envs.snapshot import SnapshotMixin
 
 
-class SGAcroSwitchEnv(core.Env):
+class SGAcroSwitchEnv(SnapshotMixin, core.Env):
     """ A simple acrobot environment
     """
 
+    snapshot_attrs = ("state", "t", "lqr_on")
+
     def __init__(self,
                  gate_fn = None,
                  controller = None,
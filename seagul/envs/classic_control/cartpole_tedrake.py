@@ -5,11 +5,10 @@ from numpy import cos, sin, pi
 from gym.utils import seeding
 
 from seagul.integration import rk4, euler, wrap
-import matplotlib.pyplot as plt
-import matplotlib.animation as animation
+from seagul.envs.snapshot import SnapshotMixin
 
 
-class SUCartPoleEnv(gym.Env):
+class SUCartPoleEnv(SnapshotMixin, gym.Env):
     """
     Environment for for a classic_control cartpole pendulum.
 
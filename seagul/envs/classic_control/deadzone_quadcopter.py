@@ -3,9 +3,10 @@ import gym
 import os
 from numpy import pi, sin, cos
 from seagul.integration import rk4, euler, wrap
+from seagul.envs.snapshot import SnapshotMixin
 
 
-class DeadzoneQuadCopter(gym.Env):
+class DeadzoneQuadCopter(SnapshotMixin, gym.Env):
     """
     A simple quadcopter, going from here: https://hybrid-robotics.berkeley.edu/publications/ACC2016_Safety_Control_Planar_Quadrotor.pdf
     q[0] = x
@@ -87,21 +88,16 @@ class DeadzoneQuadCopter(gym.Env):
         return self._get_obs(), reward, done, {}
 
     def _derivs(self, t, q, u):
-        dqdt = np.zeros_like(q)
-
         # Directly set the thrust and moment, but can derive these if we want.
         F = u[0]
         M = u[1]
 
-        dqdt[0] = q[3]
-        dqdt[1] = q[4]
-        dqdt[2] = q[5]
-
-        dqdt[3] = F * sin(q[2]) / self.m
-        dqdt[4] = (F * cos(q[2]) - self.m * self.g) / self.m
-        dqdt[5] = -M / self.J
-
-        return dqdt
+        return np.array([q[3],
+                         q[4],
+                         q[5],
+                         F * sin(q[2]) / self.m,
+                         (F * cos(q[2]) - self.m * self.g) / self.m,
+                         -M / self.J])
 
     def render(self, mode=None):
         pass
@@ -5,9 +5,12 @@ from gym import spaces
 from gym.utils import seeding
 import numpy as np
 from os import path
+from seagul.envs.snapshot import SnapshotMixin
 
 
-class PendulumDtEnv(gym.Env):
+class PendulumDtEnv(SnapshotMixin, gym.Env):
+    snapshot_attrs = ("state", "last_u")
+
     metadata = {"render.modes": ["human", "rgb_array"], "video.frames_per_second": 30}
 
     def __init__(self, g=10.0):
@@ -1,14 +1,17 @@
 import numpy as np
 from numpy.random import default_rng
 import gym
+from seagul.envs.snapshot import SnapshotMixin
 
 
-class LinearEnv(gym.Env):
+class LinearEnv(SnapshotMixin, gym.Env):
     """
     A linear system of the form x+ = A*x + B*u , where B is ones.
 
     """
 
+    snapshot_attrs = ("X", "cur_step")
+
     def __init__(self, A, num_steps = 100, act_limit = 1, reset_range=5, seed = None, Q = None, R = None):
         self.A = A
         self.act_limit = act_limit
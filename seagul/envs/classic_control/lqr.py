@@ -3,8 +3,9 @@ import numpy as np
 import gym
 import gym.spaces
 from gym.utils import seeding
+from seagul.envs.snapshot import SnapshotMixin
 
-class LQREnv(gym.Env):
+class LQREnv(SnapshotMixin, gym.Env):
     """
     Simple LQR learning envioronment using numpy
     
@@ -16,6 +17,8 @@ class LQREnv(gym.Env):
 
     """
 
+    snapshot_attrs = ("x", "cur_step")
+
     def __init__(self,
                  ep_length = 100,
                  obs_size = 3,
@@ -3,9 +3,10 @@ import gym
 import os
 from numpy import pi, sin, cos
 from seagul.integration import rk4, euler, wrap
+from seagul.envs.snapshot import SnapshotMixin
 
 
-class PlanarQuadCopter(gym.Env):
+class PlanarQuadCopter(SnapshotMixin, gym.Env):
     """
     A simple quadcopter, going from here: https://hybrid-robotics.berkeley.edu/publications/ACC2016_Safety_Control_Planar_Quadrotor.pdf
     q[0] = x
@@ -17,7 +18,7 @@ class PlanarQuadCopter(gym.Env):
 
     """
 
-    def __init__(self, num_steps=100, m = .25, J = .25, g = 9.8, max_F = 5, max_M = 5, dt = .01, xtarg = 2, ytarg = 2, theta_targ=0):
+    def __init__(self, num_steps=100, m = .25, J = .25, g = 9.8, max_F = 5, max_M = 5, dt = .01, xtarg = 2, ytarg = 2, theta_targ=0, integrator=rk4):
         self.num_steps = num_steps
         self.cur_step = 0
 
@@ -27,6 +28,7 @@ class PlanarQuadCopter(gym.Env):
         self.max_F = max_F
         self.max_M = max_M
         self.dt = dt
+        self.integrator = integrator
 
         self.xtarg = xtarg
         self.ytarg = xtarg
@@ -57,7 +59,7 @@ class PlanarQuadCopter(gym.Env):
         action[1] = np.clip(action[1], -self.max_M, self.max_M)
 
         for _ in range(self.act_hold):
-            ns = rk4(self._derivs, action, 0, self.dt, self.state)
+            ns = self.integrator(self._derivs, action, 0, self.dt, self.state)
             self.state[0] = ns[0]
             self.state[1] = ns[1]
             self.state[2] = wrap(ns[2], -2*pi, 2*pi) # We might not need to wrap ...
@@ -80,21 +82,16 @@ class PlanarQuadCopter(gym.Env):
 
 
     def _derivs(self, t, q, u):
-        dqdt = np.zeros_like(q)
-
         # Directly set the thrust and moment, but can derive these if we want. 
         F = u[0]
         M = u[1]
 
-        dqdt[0] = q[3]
-        dqdt[1] = q[4]
-        dqdt[2] = q[5]
-        
-        dqdt[3] = F*sin(q[2])/self.m
-        dqdt[4] = (F*cos(q[2]) - self.m*self.g)/self.m
-        dqdt[5] = -M/self.J
-
-        return dqdt
+        return np.array([q[3],
+                         q[4],
+                         q[5],
+                         F*sin(q[2])/self.m,
+                         (F*cos(q[2]) - self.m*self.g)/self.m,
+                         -M/self.J])
         
 
     def render(self, mode=None):
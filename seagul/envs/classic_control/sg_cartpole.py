@@ -5,8 +5,7 @@ from numpy import cos, sin, pi
 from gym.utils import seeding
 
 from seagul.integration import rk4, euler, wrap
-import matplotlib.pyplot as plt
-import matplotlib.animation as animation
+from seagul.envs.snapshot import SnapshotMixin
 
 # from dm_control import mujoco
 # from dm_control.rl import control
@@ -16,7 +15,7 @@ import matplotlib.animation as animation
 # from dm_control.utils import rewards
 
 
-class SGCartPoleEnv(gym.Env):
+class SGCartPoleEnv(SnapshotMixin, gym.Env):
     """
     Environment for for a classic_control cartpole pendulum.
 
@@ -27,6 +26,7 @@ class SGCartPoleEnv(gym.Env):
         mc:  mass of the kart (kg)
         mp: magnitude of pointmass at the end of the cart's pole (kg)
         g: force f gravity (N)
+        integrator: which integrator to use, must be from seagul.integration (symplectic_euler or verlet let you use a larger dt)
 
         state: state of the cartpole, [theta(rads), x(m), dtheta(rads/s), dx (m/s)]
 
@@ -34,12 +34,13 @@ class SGCartPoleEnv(gym.Env):
 
     metadata = {"render.modes": ["human"], "video.frames_per_second": 15}
 
-    def __init__(self, num_steps=1500, dt=0.01):
+    def __init__(self, num_steps=1500, dt=0.01, integrator=euler):
         self.L = 1.0  # length of the pole (m)
         self.mc = 4.0  # mass of the cart (kg)
         self.mp = 1.0  # mass of the ball at the end of the pole
 
         self.g = 9.8
+        self.integrator = integrator
 
         self.dt = dt
         self.num_steps = num_steps
@@ -98,7 +99,7 @@ class SGCartPoleEnv(gym.Env):
 
         for _ in range(5):
             # ns = rk4(self._derivs, torque, 0, self.dt, self.state)
-            ns = euler(self._derivs, torque, 0, self.dt, self.state)
+            ns = self.integrator(self._derivs, torque, 0, self.dt, self.state)
 
             self.state[0] = wrap(ns[0], -2 * pi, 2 * pi)
             # self.state[0] = ns[0]
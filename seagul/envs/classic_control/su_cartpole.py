@@ -5,8 +5,7 @@ from numpy import cos, sin, pi
 from gym.utils import seeding
 
 from seagul.integration import rk4, euler, wrap
-import matplotlib.pyplot as plt
-import matplotlib.animation as animation
+from seagul.envs.snapshot import SnapshotMixin
 
 # from dm_control import mujoco
 # from dm_control.rl import control
@@ -16,7 +15,7 @@ import matplotlib.animation as animation
 # from dm_control.utils import rewards
 
 
-class SUCartPoleEnv(gym.Env):
+class SUCartPoleEnv(SnapshotMixin, gym.Env):
     """
     Environment for for a classic_control cartpole pendulum.
 
@@ -27,6 +26,7 @@ class SUCartPoleEnv(gym.Env):
         mc:  mass of the kart (kg)
         mp: magnitude of pointmass at the end of the cart's pole (kg)
         g: force f gravity (N)
+        integrator: which integrator to use, must be from seagul.integration (symplectic_euler or verlet let you use a larger dt)
 
         state: state of the cartpole, [theta(rads), x(m), dtheta(rads/s), dx (m/s)]
 
@@ -41,12 +41,14 @@ class SUCartPoleEnv(gym.Env):
                  mc = 4.0,
                  mp = 1.0,
                  g = 9.8,
+                 integrator = euler,
                  ):
         self.L = L  # length of the pole (m)
         self.mc = mc  # mass of the cart (kg)
         self.mp = mp  # mass of the ball at the end of the pole
 
         self.g = g # who doesn't like moon pendulums?
+        self.integrator = integrator
 
         self.dt = dt
         self.num_steps = num_steps
@@ -105,7 +107,7 @@ class SUCartPoleEnv(gym.Env):
 
         for _ in range(5):
             # ns = rk4(self._derivs, torque, 0, self.dt, self.state)
-            ns = euler(self._derivs, torque, 0, self.dt, self.state)
+            ns = self.integrator(self._derivs, torque, 0, self.dt, self.state)
 
             self.state[0] = wrap(ns[0], -2 * pi, 2 * pi)
             # self.state[0] = ns[0]
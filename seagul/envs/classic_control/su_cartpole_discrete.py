@@ -3,13 +3,12 @@ import gym
 from numpy import cos, sin, pi
 
 from gym.utils import seeding
+from seagul.envs.snapshot import SnapshotMixin
 
 
-import matplotlib.pyplot as plt
-import matplotlib.animation as animation
 
 
-class SUCartPoleDiscEnv(gym.Env):
+class SUCartPoleDiscEnv(SnapshotMixin, gym.Env):
     """
     Environment for for a classic_control cartpole pendulum.
 
@@ -9,9 +9,10 @@ import gym
 from gym import spaces, logger
 from gym.utils import seeding
 import numpy as np
+from seagul.envs.snapshot import SnapshotMixin
 
 
-class CartPoleEnv(gym.Env):
+class CartPoleEnv(SnapshotMixin, gym.Env):
     """
     Description:
         A pole is attached by an un-actuated joint to a cart, which moves along a frictionless track. The pendulum starts upright, and the goal is to prevent it from falling over by increasing and reducing the cart's velocity.
@@ -44,6 +45,8 @@ class CartPoleEnv(gym.Env):
         Considered solved when the average reward is greater than or equal to 195.0 over 100 consecutive trials.
     """
 
+    snapshot_attrs = ("state", "steps", "steps_beyond_done")
+
     metadata = {"render.modes": ["human", "rgb_array"], "video.frames_per_second": 50}
 
     def __init__(self):
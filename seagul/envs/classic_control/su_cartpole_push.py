@@ -5,12 +5,11 @@ import random
 
 from gym.utils import seeding
 from seagul.integration import euler, rk4, wrap
+from seagul.envs.snapshot import SnapshotMixin
 
-import matplotlib.pyplot as plt
-import matplotlib.animation as animation
 
 
-class SUCartPolePushEnv(gym.Env):
+class SUCartPolePushEnv(SnapshotMixin, gym.Env):
     """
     Environment for for a classic_control cartpole pendulum.
 
@@ -3,13 +3,12 @@ import gym
 import os
 from numpy import pi, sin, cos
 from scipy.integrate import solve_ivp
-import matplotlib.animation as animation
-import matplotlib.pyplot as plt
+from seagul.envs.snapshot import SnapshotMixin
 
 
 # TODO
 # warning this is incomplete, check out su_cartpole for a working example
-class SUPendulumEnv(gym.Env):
+class SUPendulumEnv(SnapshotMixin, gym.Env):
     def __init__(self, num_steps=1500):
 
         self.num_steps = num_steps
@@ -48,6 +47,9 @@ class SUPendulumEnv(gym.Env):
         return self._get_obs()
 
     def animate(self, t, y):
+        import matplotlib.animation as animation
+        import matplotlib.pyplot as plt
+
         dt = t[-1] / len(t)
 
         x1 = self.L * sin(y[:, 0])
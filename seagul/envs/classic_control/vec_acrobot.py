@@ -0,0 +1,179 @@
+"""Vectorized version of the classic Acrobot task"""
+from gym import core, spaces
+from gym.utils import seeding
+
+import numpy as np
+from numpy import sin, cos, pi
+
+from seagul.integration import batch_euler, wrap
+from seagul.envs.snapshot import SnapshotMixin
+
+
+class VecSGAcroEnv(SnapshotMixin, core.Env):
+    """ N copies of SGAcroEnv simulated in lock-step, the state is an (N, 4) array.
+
+    Same parameters and semantics as SGAcroEnv, except that everything is batched:
+    step takes an (N, 1) array of torques and returns (N, 4) obs, (N,) rewards and (N,) dones.
+    Envs that finish are reset automatically, the obs they finished on are in info["terminal_obs"].
+
+    observation_space and action_space describe a single acrobot.
+    """
+
+    snapshot_attrs = ("state", "t")
+
+    def __init__(self,
+                 num_envs=1,
+                 max_torque=25,
+                 init_state=np.array([-pi/2, 0.0, 0.0, 0.0]),
+                 init_state_weights=np.array([0.0, 0.0, 0.0, 0.0]),
+                 dt=.01,
+                 max_t=5,
+                 act_hold=1,
+                 integrator=batch_euler,
+                 reward_fn=lambda ns, a: ((np.sin(ns[:, 0]) + np.sin(ns[:, 0] + ns[:, 1])), np.zeros(ns.shape[0], dtype=bool)),
+                 th1_range=[0, 2 * pi],
+                 th2_range=[-pi, pi],
+                 max_th1dot=float('inf'),
+                 max_th2dot=float('inf'),
+                 m1=1,
+                 m2=1,
+                 l1=1,
+                 lc1=.5,
+                 lc2=.5,
+                 i1=.2,
+                 i2=.8
+                 ):
+        """
+        Args:
+            num_envs: how many acrobots to simulate
+            integrator: must operate on batches, batch_euler, batch_rk4, symplectic_euler, verlet and dopri5 all work
+            reward_fn: lambda mapping (N, 4) states and (N, 1) actions to (N,) rewards and (N,) dones
+
+            everything else is exactly the same as SGAcroEnv
+        """
+        self.num_envs = num_envs
+        self.init_state = np.asarray(init_state, dtype=np.float64)
+        self.init_state_weights = np.asarray(init_state_weights, dtype=np.float64)
+        self.dt = dt
+        self.max_t = max_t
+        self.act_hold = act_hold
+        self.reward_fn = reward_fn
+        self.integrator = integrator
+
+        self.max_th1dot = max_th1dot
+        self.max_th2dot = max_th2dot
+        self.th1_range = th1_range
+        self.th2_range = th2_range
+        self.max_torque = max_torque
+
+        self.m1 = m1
+        self.m2 = m2
+        self.l1 = l1
+        self.lc1 = lc1
+        self.lc2 = lc2
+        self.i1 = i1
+        self.i2 = i2
+
+        low = np.array([th1_range[0], th2_range[0], -max_th1dot, -max_th2dot], dtype=np.float32)
+        high = np.array([th1_range[1], th2_range[1], max_th1dot, max_th2dot], dtype=np.float32)
+
+        self.observation_space = spaces.Box(low=low-1, high=high+1, dtype=np.float32)
+        self.action_space = spaces.Box(low=np.array([-max_torque],dtype=np.float32), high=np.array([max_torque], dtype=np.float32), dtype=np.float32)
+
+        self.num_steps = int(self.max_t / (self.act_hold * self.dt))
+        self.t = np.zeros(num_envs)
+        self.state = np.zeros((num_envs, 4))
+
+        self.seed()
+        self.reset()
+
+    def seed(self, seed=None):
+        self.np_random, seed = seeding.np_random(seed)
+        return [seed]
+
+    def _sample_init(self, n):
+        noise = self.np_random.random((n, 4)) * (self.init_state_weights * 2) - self.init_state_weights
+        return self.init_state + noise
+
+    def reset(self, init_vec=None):
+        """
+        init_vec: optional (4,) or (N, 4) array to start from, instead of sampling around init_state
+        """
+        if init_vec is None:
+            self.state = self._sample_init(self.num_envs)
+        else:
+            self.state = np.broadcast_to(np.asarray(init_vec, dtype=np.float64), (self.num_envs, 4)).copy()
+
+        self.t[:] = 0
+        return self._get_obs()
+
+    def step(self, a):
+        a = np.clip(np.asarray(a, dtype=np.float64).reshape(self.num_envs, 1), -self.max_torque, self.max_torque)
+
+        for i in range(self.act_hold):
+            self.state = self.integrator(self._dynamics, a, self.t + i*self.dt, self.dt, self.state)
+        self.t += self.dt * self.act_hold
+
+        reward, done = self.reward_fn(self.state, a)
+        reward = np.array(reward, dtype=np.float64)
+        done = np.array(done, dtype=bool)
+
+        done |= self.t >= self.max_t
+
+        blown_up = (np.abs(self.state[:, 2]) > self.max_th1dot) | (np.abs(self.state[:, 3]) > self.max_th2dot)
+        reward[blown_up] -= 5
+        done |= blown_up
+
+        obs = self._get_obs()
+        info = {"terminal_obs": obs.copy()}
+        if done.any():
+            self.state[done] = self._sample_init(done.sum())
+            self.t[done] = 0
+            obs[done] = self._get_obs()[done]
+
+        return obs, reward, done, info
+
+    def _get_obs(self):
+        obs = self.state.copy()
+        obs[:, 0] = wrap(obs[:, 0], self.th1_range[0], self.th1_range[1])
+        obs[:, 1] = wrap(obs[:, 1], self.th2_range[0], self.th2_range[1])
+        return obs
+
+    def render(self, mode='human'):
+        raise NotImplementedError
+
+    def _dynamics(self, t, s0, act):
+        """
+        Same equations as SGAcroEnv._dynamics, but over an (N, 4) batch, with the 2x2 mass matrix inverted in closed
+        form instead of calling np.linalg.solve per acrobot
+        """
+        th1 = s0[:, 0]
+        th2 = s0[:, 1]
+        th1d = s0[:, 2]
+        th2d = s0[:, 3]
+        tau = act[:, 0]
+        g = 9.8
+
+        s2 = sin(th2)
+        c2 = cos(th2)
+
+        m11 = self.m1*self.lc1**2 + self.m2*(self.l1**2 + self.lc2**2 + 2*self.l1*self.lc2*c2) + self.i1 + self.i2
+        m22 = self.m2*self.lc2**2 + self.i2
+        m12 = self.m2*(self.lc2**2 + self.l1*self.lc2*c2) + self.i2
+
+        h1 = -self.m2*self.l1*self.lc2*s2*th2d**2 - 2*self.m2*self.l1*self.lc2*s2*th2d*th1d
+        h2 = self.m2*self.l1*self.lc2*s2*th1d**2
+
+        phi2 = self.m2*self.lc2*g*cos(th1+th2)
+        phi1 = (self.m1*self.lc1+self.m2*self.l1)*g*cos(th1) + phi2
+
+        r1 = -h1 - phi1
+        r2 = tau - h2 - phi2
+        det = m11*m22 - m12**2
+
+        dqdt = np.empty_like(s0)
+        dqdt[:, 0] = th1d
+        dqdt[:, 1] = th2d
+        dqdt[:, 2] = (m22*r1 - m12*r2) / det
+        dqdt[:, 3] = (m11*r2 - m12*r1) / det
+        return dqdt
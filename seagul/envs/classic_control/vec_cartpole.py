@@ -0,0 +1,249 @@
+import numpy as np
+import gym
+from numpy import cos, sin, pi
+
+from gym.utils import seeding
+
+from seagul.integration import batch_euler, batch_rk4, wrap
+from seagul.envs.snapshot import SnapshotMixin
+
+
+class VecSUCartPoleEnv(SnapshotMixin, gym.Env):
+    """
+    N copies of SUCartPoleEnv simulated in lock-step, the state is an (N, 4) array of
+    [theta(rads), x(m), dtheta(rads/s), dx (m/s)], one row per cartpole.
+
+    step takes an (N, 1) array of forces and returns (N, 4) obs, (N,) rewards and (N,) dones.
+    Envs that finish are reset automatically, the obs they finished on are in info["terminal_obs"].
+    observation_space and action_space describe a single cartpole.
+
+    The other cartpoles in this file only override the parameters in __init__ and the hooks below
+    (_get_torque, _perturb, _reward), so look there if you want to add another variant.
+
+    Attributes:
+        L: length of the pendulum in (m)
+        mc:  mass of the kart (kg)
+        mp: magnitude of pointmass at the end of the cart's pole (kg)
+        g: force f gravity (N)
+        integrator: must operate on batches, e.g. batch_euler, batch_rk4, symplectic_euler or verlet
+    """
+
+    metadata = {"render.modes": []}
+
+    def __init__(self,
+                 num_envs=1,
+                 num_steps=1500,
+                 dt=0.001,
+                 L = 1.0,
+                 mc = 4.0,
+                 mp = 1.0,
+                 g = 9.8,
+                 integrator = batch_euler,
+                 ):
+        self.num_envs = num_envs
+        self.L = L
+        self.mc = mc
+        self.mp = mp
+        self.g = g
+        self.integrator = integrator
+
+        self.dt = dt
+        self.num_steps = num_steps
+        self.num_substeps = 5
+        self.th_range = (-2 * pi, 2 * pi)
+
+        self.X_MAX = 50.0
+        self.X_PENALTY = 5.0  # subtracted from the reward when |x| > X_MAX
+        self.DTHETA_MAX = 100.0 * pi
+        self.DX_MAX = 500.0
+
+        self.init_state = np.array([0.0, 0.0, 0.0, 0.0])
+        self.state_noise_max = 0
+        self.init_state_noise_max = 0.1
+        high = np.array([pi, self.X_MAX, self.DTHETA_MAX, self.DX_MAX])
+        self.observation_space = gym.spaces.Box(low=-high, high=high)
+
+        self.TORQUE_MAX = 5.0
+        self.torque_noise_max = 0.0
+        self.action_space = gym.spaces.Box(-self.TORQUE_MAX, self.TORQUE_MAX, shape=(1,))
+
+        self.seed()
+        self.reset()
+
+    def seed(self, seed=None):
+        self.np_random, seed = seeding.np_random(seed)
+        return [seed]
+
+    def _sample_init(self, n):
+        return self.init_state + self.np_random.uniform(-self.init_state_noise_max, self.init_state_noise_max, size=(n, 4))
+
+    def reset(self):
+        self.state = self._sample_init(self.num_envs)
+        self.cur_step = np.zeros(self.num_envs, dtype=np.int64)
+        return self._get_ob()
+
+    def _get_ob(self):
+        if self.state_noise_max > 0:
+            return self.state + self.np_random.uniform(-self.state_noise_max, self.state_noise_max, size=self.state.shape)
+        return self.state.copy()
+
+    def _get_torque(self, action):
+        """
+        Maps the (N, act_dim) or (N,) action to an (N, 1) array of forces on the cart
+        """
+        action = np.asarray(action, dtype=np.float64).reshape(self.num_envs, 1)
+        return np.clip(action, -self.TORQUE_MAX, self.TORQUE_MAX)
+
+    def _perturb(self):
+        """
+        Called once per step before integrating, for variants that poke the state
+        """
+        pass
+
+    def _reward(self, torque):
+        """
+        Returns (N,) rewards and (N,) dones for the current state, the time limit is handled in step
+        """
+        reward = (
+            -5 * np.cos(self.state[:, 0])
+            - 0.001 * self.state[:, 2] ** 2
+            - 0.001 * self.state[:, 3] ** 2
+            - 0.001 * torque[:, 0] ** 2
+        )
+        return reward, np.zeros(self.num_envs, dtype=bool)
+
+    def step(self, action):
+        torque = self._get_torque(action)
+
+        if self.torque_noise_max > 0:
+            torque = torque + self.np_random.uniform(-self.torque_noise_max, self.torque_noise_max, size=torque.shape)
+
+        self._perturb()
+
+        for _ in range(self.num_substeps):
+            self.state = self.integrator(self._derivs, torque, 0, self.dt, self.state)
+            self.state[:, 0] = wrap(self.state[:, 0], *self.th_range)
+
+        reward, done = self._reward(torque)
+
+        self.cur_step += 1
+        timeout = self.cur_step > self.num_steps
+        reward[~timeout & (np.abs(self.state[:, 1]) > self.X_MAX)] -= self.X_PENALTY
+        done |= timeout
+
+        obs = self._get_ob()
+        info = {"terminal_obs": obs.copy()}
+        if done.any():
+            self.state[done] = self._sample_init(done.sum())
+            self.cur_step[done] = 0
+            obs[done] = self.state[done]
+
+        return obs, reward, done, info
+
+    def render(self, mode="human"):
+        raise NotImplementedError
+
+    def _derivs(self, t, q, u):
+        """
+        Same equations as SUCartPoleEnv._derivs, but over an (N, 4) batch of states and (N, 1) batch of forces
+        """
+        dqdt = np.empty_like(q)
+
+        th = q[:, 0]
+        thd = q[:, 2]
+        u = u[:, 0]
+        s = sin(th)
+        c = cos(th)
+
+        delta = self.mp * s ** 2 + self.mc
+
+        dqdt[:, 0] = thd
+        dqdt[:, 1] = q[:, 3]
+
+        dqdt[:, 2] = (
+            -self.mp * (thd ** 2) * s * c / delta
+            - (self.mp + self.mc) * self.g * s / delta / self.L
+            - u * c / delta / self.L
+        )
+
+        dqdt[:, 3] = (
+            self.mp * self.L * (thd ** 2) * s / delta
+            + self.mp * self.L * self.g * s * c / delta / self.L
+            + u / delta
+        )
+
+        return dqdt
+
+
+class VecSGCartPoleEnv(VecSUCartPoleEnv):
+    """
+    Vectorized SGCartPoleEnv, balance only: starts near upright and ends as soon as theta leaves pi +- .2
+    """
+
+    def __init__(self, num_envs=1, num_steps=1500, dt=0.01, integrator=batch_euler):
+        super().__init__(num_envs=num_envs, num_steps=num_steps, dt=dt, integrator=integrator)
+
+        self.init_state = np.array([pi, 0.0, 0.0, 0.0])
+        high = np.array([2 * pi, self.X_MAX, self.DTHETA_MAX, self.DX_MAX])
+        self.observation_space = gym.spaces.Box(low=-high, high=high, dtype=np.float32)
+        self.action_space = gym.spaces.Box(-self.TORQUE_MAX, self.TORQUE_MAX, shape=(1,), dtype=np.float32)
+        self.reset()
+
+    def _reward(self, torque):
+        upright = ((pi - 0.2) < self.state[:, 0]) & (self.state[:, 0] < (pi + 0.2))
+        return upright.astype(np.float64), ~upright
+
+
+class VecSUCartPolePushEnv(VecSUCartPoleEnv):
+    """
+    Vectorized SUCartPolePushEnv, bigger cartpole that randomly gets pushed while it's near upright
+    """
+
+    def __init__(self, num_envs=1, num_steps=4500, dt=0.001, integrator=batch_rk4):
+        super().__init__(num_envs=num_envs, num_steps=num_steps, dt=dt, L=5.0, mc=4.0, mp=5.0, integrator=integrator)
+
+        self.init_state = np.array([pi, 0.0, 0.0, 0.0])
+        self.init_state_noise_max = 0
+
+        self.TORQUE_MAX = 50.0
+        self.action_space = gym.spaces.Box(-self.TORQUE_MAX, self.TORQUE_MAX, shape=(1,))
+        self.reset()
+
+    def _perturb(self):
+        near_top = (self.state[:, 0] > 145 * pi / 180) & (self.state[:, 0] < 215 * pi / 180)
+        pushed = near_top & (self.np_random.random(self.num_envs) > 0.99)
+        self.state[pushed, 0] += self.np_random.normal(0, 0.2, size=pushed.sum())
+
+    def _reward(self, torque):
+        return -np.cos(self.state[:, 0]), np.zeros(self.num_envs, dtype=bool)
+
+
+class VecSUCartPoleDiscEnv(VecSUCartPoleEnv):
+    """
+    Vectorized SUCartPoleDiscEnv, actions are an (N,) array of indices into AVAIL_ACTIONS
+    """
+
+    def __init__(self, num_envs=1, num_steps=1500, dt=0.2, integrator=batch_euler):
+        super().__init__(num_envs=num_envs, num_steps=num_steps, dt=dt, integrator=integrator)
+
+        self.num_substeps = 1
+        self.th_range = (0, 2 * pi)
+        self.init_state_noise_max = 0.0
+
+        self.X_MAX = 100.0
+        self.X_PENALTY = 0.0
+        high = np.array([pi, self.X_MAX, self.DTHETA_MAX, self.DX_MAX])
+        self.observation_space = gym.spaces.Box(low=-high, high=high)
+
+        self.TORQUE_LIMIT = 1000.0
+        self.AVAIL_ACTIONS = np.array([+1.0, 0.0, -1.0])
+        self.action_space = gym.spaces.Discrete(3)
+        self.reset()
+
+    def _get_torque(self, action):
+        action = np.asarray(action, dtype=np.int64).reshape(self.num_envs)
+        return (self.AVAIL_ACTIONS[action] * self.TORQUE_LIMIT).reshape(-1, 1)
+
+    def _reward(self, torque):
+        reward = -5 * np.cos(self.state[:, 0]) - 0.001 * (self.state[:, 1] ** 2) + 50
+        return reward, np.abs(self.state[:, 1]) > self.X_MAX
@@ -0,0 +1,92 @@
+import numpy as np
+
+import gym
+import gym.spaces
+from gym.utils import seeding
+from seagul.envs.snapshot import SnapshotMixin
+
+
+class VecLQREnv(SnapshotMixin, gym.Env):
+    """
+    N copies of LQREnv stepped with one matrix multiply
+
+    X is Nxn, A is nxn (shared) or Nxnxn (per env),
+    B is nxm (shared) or Nxnxm (per env), U is Nxm
+
+    X+ = X@A' + U@B'        (shared dynamics)
+    x+ = A[i]@x + B[i]@u    (per env dynamics, for every row i)
+    r = x'x
+
+    step returns (N, n) obs, (N,) rewards and (N,) dones, envs that finish are reset automatically and the obs they
+    finished on are in info["terminal_obs"]. observation_space and action_space describe a single env.
+    """
+
+    snapshot_attrs = ("X", "cur_step")
+
+    def __init__(self,
+                 num_envs=1,
+                 ep_length=100,
+                 obs_size=3,
+                 act_size=3,
+                 A=None,
+                 B=None,
+                 per_env_dynamics=False,
+                 seed=None
+                 ):
+        """
+        per_env_dynamics: if A or B is None and this is True, sample an independent A/B for every env instead of one
+        shared pair, for randomized dynamics studies
+        """
+        self.num_envs = num_envs
+        self.ep_length = ep_length
+        self.seed(seed)
+
+        dyn_shape = (num_envs,) if per_env_dynamics else ()
+        if A is None:
+            A = self.np_random.standard_normal(dyn_shape + (obs_size, obs_size))
+        if B is None:
+            B = self.np_random.standard_normal(dyn_shape + (obs_size, act_size))
+
+        self.A = np.asarray(A, dtype=np.float64)
+        self.B = np.asarray(B, dtype=np.float64)
+        self.obs_size = self.A.shape[-1]
+        self.act_size = self.B.shape[-1]
+
+        self.observation_space = gym.spaces.Box(low=-np.inf, high=np.inf, dtype=np.float32, shape=(self.obs_size,))
+        self.action_space = gym.spaces.Box(low=-np.inf, high=np.inf, dtype=np.float32, shape=(self.act_size,))
+
+        self.X = self.reset()
+
+    def seed(self, seed=None):
+        self.np_random, seed = seeding.np_random(seed)
+        return [seed]
+
+    def reset(self):
+        self.X = self.np_random.standard_normal((self.num_envs, self.obs_size))
+        self.cur_step = np.zeros(self.num_envs, dtype=np.int64)
+        return self.X.copy()
+
+    @staticmethod
+    def _apply(M, V):
+        # M is either one matrix shared by every row of V, or a stack with one matrix per row
+        if M.ndim == 2:
+            return V @ M.T
+        return np.matmul(M, V[:, :, None])[:, :, 0]
+
+    def step(self, act):
+        U = np.asarray(act, dtype=np.float64).reshape(self.num_envs, self.act_size)
+        self.X = self._apply(self.A, self.X) + self._apply(self.B, U)
+        reward = -np.einsum('ij,ij->i', self.X, self.X)
+
+        self.cur_step += 1
+
+        done = np.any(self.X > 1e6, axis=1) | (self.cur_step > self.ep_length)
+
+        obs = self.X.copy()
+        info = {"terminal_obs": obs.copy()}
+        if done.any():
+            self.X[done] = self.np_random.standard_normal((done.sum(), self.obs_size))
+            self.cur_step[done] = 0
+            obs[done] = self.X[done]
+
+        return obs, reward, done, info
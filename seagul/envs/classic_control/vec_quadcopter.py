@@ -0,0 +1,126 @@
+import numpy as np
+import gym
+from numpy import pi, sin, cos
+from seagul.integration import batch_rk4, wrap
+from seagul.envs.snapshot import SnapshotMixin
+
+
+def batch_quad_derivs(t, Q, U, m=.25, J=.25, g=9.8):
+    """
+    Batched planar quadcopter dynamics, shared by every quadcopter env in this module.
+    Q is (N, 6) [x, y, theta, xdot, ydot, thetadot], U is (N, 2) [thrust, moment]
+    """
+    dQdt = np.empty_like(Q)
+    F = U[:, 0]
+    M = U[:, 1]
+
+    dQdt[:, 0:3] = Q[:, 3:6]
+    dQdt[:, 3] = F*sin(Q[:, 2])/m
+    dQdt[:, 4] = (F*cos(Q[:, 2]) - m*g)/m
+    dQdt[:, 5] = -M/J
+
+    return dQdt
+
+
+class VecPlanarQuadCopter(SnapshotMixin, gym.Env):
+    """
+    N copies of PlanarQuadCopter simulated in lock-step, the state is an (N, 6) array with the same layout.
+
+    step takes (N, 2) actions and returns (N, 6) obs, (N,) rewards and (N,) dones. Envs that finish are reset
+    automatically, the obs they finished on are in info["terminal_obs"].
+    """
+
+    def __init__(self, num_envs=1, num_steps=100, m = .25, J = .25, g = 9.8, max_F = 5, max_M = 5, dt = .01, xtarg = 2, ytarg = 2, theta_targ=0, integrator=batch_rk4):
+        self.num_envs = num_envs
+        self.num_steps = num_steps
+
+        self.m = m
+        self.J = J
+        self.g = g
+        self.max_F = max_F
+        self.max_M = max_M
+        self.dt = dt
+        self.integrator = integrator
+
+        self.xtarg = xtarg
+        self.ytarg = ytarg
+        self.theta_targ = theta_targ
+
+        self.act_hold = 1
+
+        obs_high = np.ones(6)*100
+        self.act_high = np.array([max_F, max_M])
+
+        self.observation_space = gym.spaces.Box(low=-obs_high, high=obs_high)
+        self.action_space = gym.spaces.Box(low=-self.act_high, high=self.act_high)
+        self.reset()
+
+    def reset(self):
+        self.state = np.zeros((self.num_envs, 6))
+        self.cur_step = np.zeros(self.num_envs, dtype=np.int64)
+        return self.state.copy()
+
+    def _derivs(self, t, Q, U):
+        return batch_quad_derivs(t, Q, U, self.m, self.J, self.g)
+
+    def _reward(self):
+        """
+        Returns (N,) rewards and (N,) dones for the current state, the time limit is handled in step
+        """
+        xpen = -0.01*np.clip((self.state[:, 0] - self.xtarg)**2, -4, 4)
+        ypen = -0.01*np.clip((self.state[:, 1] - self.ytarg)**2, -4, 4)
+        thpen = -0.01*np.clip((self.state[:, 2] - self.theta_targ)**2, -2, 2)
+        return xpen + ypen + thpen, np.zeros(self.num_envs, dtype=bool)
+
+    def step(self, action):
+        action = np.clip(np.asarray(action, dtype=np.float64).reshape(self.num_envs, 2), -self.act_high, self.act_high)
+
+        for i in range(self.act_hold):
+            self.state = self.integrator(self._derivs, action, i*self.dt, self.dt, self.state)
+            self.state[:, 2] = wrap(self.state[:, 2], -2*pi, 2*pi)
+
+        reward, done = self._reward()
+
+        self.cur_step += 1
+        done |= self.cur_step > self.num_steps
+
+        obs = self.state.copy()
+        info = {"terminal_obs": obs.copy()}
+        if done.any():
+            self.state[done] = 0
+            self.cur_step[done] = 0
+            obs[done] = 0
+
+        return obs, reward, done, info
+
+    def render(self, mode=None):
+        pass
+
+
+class VecDeadzoneQuadCopter(VecPlanarQuadCopter):
+    """
+    Vectorized DeadzoneQuadCopter, the episode ends with a -10 penalty when the quad enters any of the deadzones.
+    deadzone_x and deadzone_y are (K, 2) arrays of [low, high] bounds, one row per rectangular deadzone.
+    """
+
+    def __init__(self, num_envs=1, num_steps=1000, m=.25, J=.25, g=9.8, max_F=5, max_M=5, dt=.01, xtarg = 2, ytarg = 2, theta_targ=0,
+                 deadzone_x = np.array([3, 7]), deadzone_y = np.array([3, 7]), integrator=batch_rk4):
+        super().__init__(num_envs=num_envs, num_steps=num_steps, m=m, J=J, g=g, max_F=max_F, max_M=max_M, dt=dt,
+                         xtarg=xtarg, ytarg=ytarg, theta_targ=theta_targ, integrator=integrator)
+
+        self.observation_space = gym.spaces.Box(low=self.observation_space.low, high=self.observation_space.high, dtype=np.float32)
+        self.action_space = gym.spaces.Box(low=-self.act_high, high=self.act_high, dtype=np.float32)
+
+        self.deadzone_x = np.atleast_2d(deadzone_x)
+        self.deadzone_y = np.atleast_2d(deadzone_y)
+
+    def _reward(self):
+        reward, _ = super()._reward()
+
+        # (N, K) membership of every quad in every deadzone
+        x = self.state[:, 0:1]
+        y = self.state[:, 1:2]
+        term = ((x >= self.deadzone_x[:, 0]) & (x <= self.deadzone_x[:, 1]) &
+                (y >= self.deadzone_y[:, 0]) & (y <= self.deadzone_y[:, 1])).any(axis=1)
+
+        return reward - 10*term, term
@@ -1 +1,9 @@
-from seagul.envs.drake.acrobot import DrakeAcroEnv
+# Modules are only imported when one of their envs is asked for, see seagul.envs.lazy
+from seagul.envs.lazy import lazy_exports
+
+_exports = {
+    "DrakeAcroEnv": "acrobot",
+}
+
+__all__ = list(_exports)
+__getattr__, __dir__ = lazy_exports(__name__, _exports)
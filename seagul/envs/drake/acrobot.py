@@ -27,8 +27,6 @@ from pydrake.all import (
 
 from pydrake.examples.acrobot import AcrobotInput, AcrobotPlant, AcrobotState
 
-import matplotlib.pyplot as plt
-from IPython.display import HTML
 
 # We use a global action variable to implement an action hold/frame skip...
 g_action = 0
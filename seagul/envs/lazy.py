@@ -0,0 +1,36 @@
+import importlib
+
+
+def lazy_exports(package, exports):
+    """
+    Module level __getattr__ and __dir__ for a package that shouldn't import its modules until they are needed.
+
+    The env subpackages pull in mujoco_py, pybullet, matlab, pygame etc. gym.make resolves entry points like
+    "seagul.envs.classic_control:SUCartPoleEnv" with a getattr on the package, so with this only the module that
+    defines the requested env is imported.
+
+    Args:
+        package: __name__ of the package
+        exports: dict mapping every public name to the submodule (relative to package) that defines it
+
+    Returns:
+        __getattr__, __dir__ to be assigned at the package level
+
+    Example:
+        __getattr__, __dir__ = lazy_exports(__name__, {"SUCartPoleEnv": "su_cartpole"})
+    """
+
+    def __getattr__(name):
+        try:
+            module = exports[name]
+        except KeyError:
+            raise AttributeError(f"module {package!r} has no attribute {name!r}") from None
+
+        value = getattr(importlib.import_module("." + module, package), name)
+        setattr(importlib.import_module(package), name, value)  # cache so we only go through here once per name
+        return value
+
+    def __dir__():
+        return sorted(set(vars(importlib.import_module(package))) | set(exports))
+
+    return __getattr__, __dir__
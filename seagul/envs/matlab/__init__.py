@@ -1 +1,12 @@
-from seagul.envs.matlab.bball_env import BBallEnv
\ No newline at end of file
+# Modules are only imported when one of their envs is asked for, see seagul.envs.lazy
+from seagul.envs.lazy import lazy_exports
+
+_exports = {
+    "BBallEnv": "bball_env",
+    "BBall3Env": "bball3_env",
+    "VecBBallEnv": "vec_bball",
+    "VecBBall3Env": "vec_bball",
+}
+
+__all__ = list(_exports)
+__getattr__, __dir__ = lazy_exports(__name__, _exports)
@@ -1,11 +1,11 @@
 from gym import core, spaces
 from gym.utils import seeding
-import matlab.engine
-import matlab
 import numpy as np
 from numpy import pi
 import seagul
 import seagul.envs.matlab.bball3_src
+from seagul.envs.matlab import bball_np
+from seagul.envs.matlab.engine_pool import get_engine
 
 
 class BBall3Env(core.Env):
@@ -22,6 +22,9 @@ class BBall3Env(core.Env):
     [7] upper link velocity (rad/s)
     [8] ball x velocity (m/s)
     [9] ball y velocity (m/s)
+
+    backend="numpy" runs the same model in process with seagul.envs.matlab.bball_np (float64, event driven impacts)
+    instead of starting a matlab engine, select it with gym.make("bball3-v1", backend="numpy")
     """
 
     def __init__(self,
@@ -32,14 +35,23 @@ class BBall3Env(core.Env):
                  init_state_weights=(pi, pi, pi, .5, .5, 0, 0, 0, 0, 0),
                  reward_fn=lambda s, a: s[4],
                  max_steps = 100,
+                 backend="matlab",
                  ):
 
-        self.eng = matlab.engine.start_matlab()
-        self.eng.addpath(seagul.envs.matlab.bball3_src.__path__._path[0], nargout=0)
+        self.backend = backend
+        self._eng = None
+        if backend == "matlab":
+            import matlab
+            self.init_state = matlab.single(init_state, size=(10, 1))
+            self.init_state_weights = matlab.single(init_state_weights, size=(10, 1))
+        elif backend == "numpy":
+            self.init_state = np.array(init_state, dtype=np.float64)
+            self.init_state_weights = np.array(init_state_weights, dtype=np.float64)
+        else:
+            raise ValueError(f"backend must be 'matlab' or 'numpy', got {backend}")
+
         self.max_torque = max_torque
         self.dt = dt
-        self.init_state = matlab.single(init_state, size=(10, 1))
-        self.init_state_weights = matlab.single(init_state_weights, size=(10, 1))
         np.random.seed(seed)
 
         self.reward_fn = reward_fn
@@ -52,6 +64,13 @@ class BBall3Env(core.Env):
         self.cur_step = 0
         self.reset()
 
+    @property
+    def eng(self):
+        # engines come from a pool shared by every env in the process, and only once we actually need one
+        if self._eng is None and self.backend == "matlab":
+            self._eng = get_engine(seagul.envs.matlab.bball3_src.__path__._path[0])
+        return self._eng
+
     def reset(self):
         self.t = 0
         init_state = self.init_state
@@ -59,13 +78,20 @@ class BBall3Env(core.Env):
         #init_state += self.eng.rand(8)*(self.init_state_weights*matlab.single([2.0])) - self.init_state_weights
 
         self.state = init_state
+        if self.backend == "numpy":
+            self.state = init_state.copy()
+
         return np.array(init_state, dtype=np.float32).reshape((10,))
 
     def step(self, action):
+        if self.backend == "numpy":
+            return self._step_np(action)
+
+        import matlab
         action = np.clip(action, -self.max_torque, self.max_torque)
         action = matlab.single(action.tolist())
         action.reshape((3, 1))
-        tout, xout = self.eng.integrateODE(matlab.single([self.t, self.t + self.dt]), self.state, self.dt, action, nargout=2)
+        tout, xout = self.eng.integrateTorqueODE(matlab.single([self.t, self.t + self.dt]), self.state, self.dt, action, nargout=2)
         impactState, impactTime = self.eng.detectImpact(tout, xout, nargout=2)
 
         if impactTime == -1:  # No contact
@@ -90,8 +116,31 @@ class BBall3Env(core.Env):
 
         return np.array(self.state, dtype=np.float32).reshape((10,)), reward.item(), done, {"tout": tout, "xout": xout}
 
+    def _step_np(self, action):
+        action = np.clip(np.asarray(action, dtype=np.float64).reshape(3), -self.max_torque, self.max_torque)
+        tout, xout = bball_np.integrate_ode(bball_np.ode_torque3, (self.t, self.t + self.dt), self.state, self.dt, action)
+        impactState, impactTime = bball_np.detect_impact(tout, xout, bball_np.BBALL3_PARAMS)
+
+        if impactTime == -1:  # No contact
+            self.state = xout[-1].copy()
+            self.t = tout[-1]
+        else:
+            self.state = bball_np.impact(impactState, bball_np.BBALL3_PARAMS)
+            self.t = impactTime
+
+        reward = self.reward_fn(self.state, action)
+        done = bball_np.constraint(self.state, bball_np.BBALL3_PARAMS) != 0
+
+        self.cur_step += 1
+        if self.cur_step > self.max_steps:
+            done = True
+
+        return self.state.astype(np.float32), float(reward), done, {"tout": tout, "xout": xout}
+
     def render(self):
         raise NotImplementedError('Frame by frame rendering not supported, call animate instead')
 
     def animate(self, t, x):
+        if self.backend == "numpy":
+            raise NotImplementedError("animate needs the matlab backend")
         self.eng.animate(t, x, nargout=0)
@@ -0,0 +1,18 @@
+%% Discrete time integration of 3 link arm dynamics under fixed joint torques
+% integrateODE tracks a desired trajectory, this is the torque driven version the envs step with
+
+function [tout, xout] = integrateTorqueODE(timeSpan, initialState, timeStep, inputTorque)
+
+dt = timeStep;
+currentState = initialState;
+xout = currentState';
+tout = timeSpan(1);
+
+for t = timeSpan(1) + dt:dt:timeSpan(2)
+    nextStateDerivative = ode_input_torque(t, currentState, inputTorque);
+    nextVelocity = currentState(6:10) + nextStateDerivative(6:10).*dt;
+    nextPosition = currentState(1:5) + nextVelocity.*dt;
+    currentState = [nextPosition; nextVelocity];
+    xout = [xout; currentState'];
+    tout = [tout; t];
+end
@@ -0,0 +1,25 @@
+%% Steps a batch of envs in one engine call, same as calling integrateTorqueODE/detectImpact/impact/constraint for each column
+
+function [Xnext, tnext, flags] = stepBatch(t, X, timeStep, inputTorque)
+
+% t: 1xN start times, X: 10xN states, inputTorque: 3xN torques
+
+numEnvs = size(X, 2);
+Xnext = zeros(size(X), 'single');
+tnext = zeros(1, numEnvs);
+flags = zeros(1, numEnvs);
+
+for n = 1:1:numEnvs
+    [tout, xout] = integrateTorqueODE([t(n) t(n) + timeStep], X(:, n), timeStep, inputTorque(:, n));
+    [impactState, impactTime] = detectImpact(tout, xout);
+
+    if impactTime == -1 % No contact
+        Xnext(:, n) = xout(end, :)';
+        tnext(n) = tout(end);
+    else
+        Xnext(:, n) = impact(single(impactState));
+        tnext(n) = impactTime;
+    end
+
+    flags(n) = constraint(Xnext(:, n));
+end
@@ -1,11 +1,11 @@
 from gym import core, spaces
 from gym.utils import seeding
-import matlab.engine
-import matlab
 import numpy as np
 from numpy import pi
 import seagul
 import seagul.envs.matlab.bball_src
+from seagul.envs.matlab import bball_np
+from seagul.envs.matlab.engine_pool import get_engine
 
 
 
@@ -21,6 +21,9 @@ class BBallEnv(core.Env):
     [5] lower link velocity (rad/s)
     [6] ball x velocity (m/s)
     [7] ball y velocity (m/s)
+
+    backend="numpy" runs the same model in process with seagul.envs.matlab.bball_np (float64, event driven impacts)
+    instead of starting a matlab engine, select it with gym.make("bball-v0", backend="numpy")
     """
 
     def __init__(self,
@@ -30,15 +33,24 @@ class BBallEnv(core.Env):
                  init_state=(-pi / 4, 3 * pi / 4, 0.025, .5, 0, 0, 0, 0),
                  init_state_weights=(pi, pi, 0, .5, 0, 0, 0, 0),
                  reward_fn = lambda s,a: s[3],
-                 done_criteria = lambda s: s[3] < (.3*np.cos(s[0]) + .3*np.cos(s[0] + s[1]) )
+                 done_criteria = lambda s: s[3] < (.3*np.cos(s[0]) + .3*np.cos(s[0] + s[1]) ),
+                 backend="matlab",
                 ):
 
-        self.eng = matlab.engine.start_matlab()
-        self.eng.addpath(seagul.envs.matlab.bball_src.__path__[0], nargout=0)
+        self.backend = backend
+        self._eng = None
+        if backend == "matlab":
+            import matlab
+            self.init_state = matlab.single(init_state,size=(8,1))
+            self.init_state_weights = matlab.single(init_state_weights,size=(8,1))
+        elif backend == "numpy":
+            self.init_state = np.array(init_state, dtype=np.float64)
+            self.init_state_weights = np.array(init_state_weights, dtype=np.float64)
+        else:
+            raise ValueError(f"backend must be 'matlab' or 'numpy', got {backend}")
+
         self.max_torque = max_torque
         self.dt = dt
-        self.init_state = matlab.single(init_state,size=(8,1))
-        self.init_state_weights = matlab.single(init_state_weights,size=(8,1))
         np.random.seed(seed)
 
         self.reward_fn = reward_fn
@@ -50,15 +62,29 @@ class BBallEnv(core.Env):
 
         self.reset()
 
+    @property
+    def eng(self):
+        # engines come from a pool shared by every env in the process, and only once we actually need one
+        if self._eng is None and self.backend == "matlab":
+            self._eng = get_engine(seagul.envs.matlab.bball_src.__path__[0])
+        return self._eng
+
     def reset(self):
         self.t = 0
         init_state = self.init_state
         #init_state += self.eng.rand(8)*(self.init_state_weights*matlab.single([2.0])) - self.init_state_weights
 
         self.state = init_state
+        if self.backend == "numpy":
+            self.state = init_state.copy()
+
         return np.array(init_state).reshape((8,))
 
     def step(self, action):
+        if self.backend == "numpy":
+            return self._step_np(action)
+
+        import matlab
         action = np.clip(action, -self.max_torque, self.max_torque)
         tout, xout = self.eng.integrateODE(matlab.single([self.t, self.t+self.dt]), self.state, self.dt, matlab.single([action.item()]), nargout=2)
         impactState, impactTime = self.eng.detectImpact(tout,xout, nargout=2)
@@ -78,9 +104,29 @@ class BBallEnv(core.Env):
 
         return np.array(self.state).reshape((8,)), reward.item(), done, {"tout": tout, "xout": xout}
 
+    def _step_np(self, action):
+        action = np.clip(np.asarray(action, dtype=np.float64).reshape(-1), -self.max_torque, self.max_torque)
+        # matlab broadcasts the single torque over both joints
+        tout, xout = bball_np.integrate_ode(bball_np.ode_torque2, (self.t, self.t + self.dt), self.state, self.dt, np.broadcast_to(action, (2,)))
+        impactState, impactTime = bball_np.detect_impact(tout, xout, bball_np.BBALL_PARAMS)
+
+        if impactTime == -1:  #No contact
+            self.state = xout[-1].copy()
+            self.t = tout[-1]
+        else:
+            self.state = bball_np.impact(impactState, bball_np.BBALL_PARAMS)
+            self.t = impactTime
+
+        reward = self.reward_fn(self.state, action)
+        done = self.done_criteria(self.state)
+
+        return self.state.copy(), float(reward), bool(done), {"tout": tout, "xout": xout}
+
     def render(self):
         raise NotImplementedError('Frame by frame rendering not supported, call animate instead')
 
     def animate(self,t,x):
+        if self.backend == "numpy":
+            raise NotImplementedError("animate needs the matlab backend")
         self.eng.animate(t,x,nargout=0)
         
\ No newline at end of file
@@ -0,0 +1,237 @@
+"""
+Numpy port of nihars bouncing ball matlab code (bball_src and bball3_src), so the bouncing ball envs can run without
+a matlab engine. Each function here mirrors the .m file with the same name, states are laid out the same way:
+
+[q_1 .. q_n, xb, yb, dq_1 .. dq_n, vbx, vby]
+
+where q_1 is the absolute angle of the lower link (from vertical) and the rest are relative joint angles.
+"""
+import numpy as np
+from numpy import sin, cos, pi
+
+# params.m from bball_src and bball3_src
+BBALL_PARAMS = dict(M=(1.0, 1.0), l=(0.3, 0.3), p=(0.15, 0.15), I=(0.0075, 0.0075), Mb=0.1, rb=0.05, g=9.8, e=0.8)
+BBALL3_PARAMS = dict(M=(1.0, 1.0, 1.0), l=(0.3, 0.3, 0.3), p=(0.15, 0.15, 0.15), I=(0.0075, 0.0075, 0.0075),
+                     Mb=0.1, rb=0.05, g=9.8, e=0.8)
+
+
+def ode_torque2(t, X, U, prm=BBALL_PARAMS):
+    """
+    State derivative of the 2 link arm + ball under joint torques U, same D and C as bball_src/ode_torque.m
+    """
+    M1, M2 = prm["M"]
+    l1, l2 = prm["l"]
+    p1, p2 = prm["p"]
+    I1, I2 = prm["I"]
+    g = prm["g"]
+
+    q1, q2 = X[0], X[1]
+    dq1, dq2 = X[4], X[5]
+
+    D = np.array([[M2*l1**2 + 2*M2*cos(q2)*l1*p2 + M1*p1**2 + M2*p2**2 + I1 + I2, M2*p2**2 + M2*l1*cos(q2)*p2 + I2],
+                  [M2*p2**2 + M2*l1*cos(q2)*p2 + I2, M2*p2**2 + I2]])
+
+    C = np.array([-M2*l1*p2*sin(q2)*dq2**2 - 2*M2*dq1*l1*p2*sin(q2)*dq2 - M2*g*p2*sin(q1 + q2) - M2*g*l1*sin(q1) - M1*g*p1*sin(q1),
+                  -M2*p2*(-l1*sin(q2)*dq1**2 + g*sin(q1 + q2))])
+
+    d2x = np.linalg.solve(D, -C + np.asarray(U, dtype=np.float64).reshape(2))
+    return np.concatenate((X[4:8], d2x, [0.0, -g]))
+
+
+def ode_torque3(t, X, U, prm=BBALL3_PARAMS):
+    """
+    State derivative of the 3 link arm + ball under joint torques U, same D and C as bball3_src/ode_torque.m
+
+    ode_torque.m computes U itself with a feedback linearizing PD controller tracking a desired trajectory,
+    BBall3Env hands us the torques directly so that part is left out, like bball3_src/ode_input_torque.m.
+    """
+    M1, M2, M3 = prm["M"]
+    l1, l2, l3 = prm["l"]
+    p1, p2, p3 = prm["p"]
+    I1, I2, I3 = prm["I"]
+    g = prm["g"]
+
+    q1, q2, q3 = X[0], X[1], X[2]
+    dq1, dq2, dq3 = X[5], X[6], X[7]
+
+    D12 = M3*l2**2 + 2*M3*cos(q3)*l2*p3 + M3*l1*cos(q2)*l2 + M2*p2**2 + M2*l1*cos(q2)*p2 + M3*p3**2 + M3*l1*cos(q2 + q3)*p3 + I2 + I3
+    D13 = I3 + M3*p3**2 + M3*l1*p3*cos(q2 + q3) + M3*l2*p3*cos(q3)
+    D23 = M3*p3**2 + M3*l2*cos(q3)*p3 + I3
+    D = np.array([[I1 + I2 + I3 + M2*l1**2 + M3*l1**2 + M3*l2**2 + M1*p1**2 + M2*p2**2 + M3*p3**2 + 2*M3*l1*p3*cos(q2 + q3)
+                   + 2*M3*l1*l2*cos(q2) + 2*M2*l1*p2*cos(q2) + 2*M3*l2*p3*cos(q3), D12, D13],
+                  [D12, M3*l2**2 + 2*M3*cos(q3)*l2*p3 + M2*p2**2 + M3*p3**2 + I2 + I3, D23],
+                  [D13, D23, M3*p3**2 + I3]])
+
+    C = np.array([- M3*g*l2*sin(q1 + q2) - M2*g*p2*sin(q1 + q2) - M2*g*l1*sin(q1) - M3*g*l1*sin(q1) - M1*g*p1*sin(q1)
+                  - M3*g*p3*sin(q1 + q2 + q3) - M3*dq2**2*l1*p3*sin(q2 + q3) - M3*dq3**2*l1*p3*sin(q2 + q3)
+                  - M3*dq2**2*l1*l2*sin(q2) - M2*dq2**2*l1*p2*sin(q2) - M3*dq3**2*l2*p3*sin(q3)
+                  - 2*M3*dq1*dq2*l1*p3*sin(q2 + q3) - 2*M3*dq1*dq3*l1*p3*sin(q2 + q3) - 2*M3*dq2*dq3*l1*p3*sin(q2 + q3)
+                  - 2*M3*dq1*dq2*l1*l2*sin(q2) - 2*M2*dq1*dq2*l1*p2*sin(q2) - 2*M3*dq1*dq3*l2*p3*sin(q3)
+                  - 2*M3*dq2*dq3*l2*p3*sin(q3),
+                  M3*dq1**2*l1*p3*sin(q2 + q3) - M2*g*p2*sin(q1 + q2) - M3*g*p3*sin(q1 + q2 + q3) - M3*g*l2*sin(q1 + q2)
+                  + M3*dq1**2*l1*l2*sin(q2) + M2*dq1**2*l1*p2*sin(q2) - M3*dq3**2*l2*p3*sin(q3)
+                  - 2*M3*dq1*dq3*l2*p3*sin(q3) - 2*M3*dq2*dq3*l2*p3*sin(q3),
+                  M3*p3*(dq1**2*l1*sin(q2 + q3) - g*sin(q1 + q2 + q3) + dq1**2*l2*sin(q3) + dq2**2*l2*sin(q3) + 2*dq1*dq2*l2*sin(q3))])
+
+    d2x = np.linalg.solve(D, -C + np.asarray(U, dtype=np.float64).reshape(3))
+    return np.concatenate((X[5:10], d2x, [0.0, -g]))
+
+
+def integrate_ode(ode, t_span, X, dt, U):
+    """
+    Semi-implicit euler over t_span with a fixed step, like integrateODE.m
+
+    Returns:
+        tout: (K,) times, including t_span[0]
+        xout: (K, state_dim) states, xout[0] is X
+    """
+    n = len(X) // 2
+    num_steps = max(int(round((t_span[1] - t_span[0]) / dt)), 1)
+
+    tout = t_span[0] + dt*np.arange(num_steps + 1)
+    xout = np.empty((num_steps + 1, len(X)))
+    xout[0] = X
+    for i in range(num_steps):
+        dX = ode(tout[i + 1], xout[i], U)
+        xout[i + 1, n:] = xout[i, n:] + dX[n:]*dt
+        xout[i + 1, :n] = xout[i, :n] + xout[i + 1, n:]*dt
+
+    return tout, xout
+
+
+def _joints(X, prm):
+    """
+    Returns the absolute link angles th and the (n+1, 2) positions of the base, every joint, and the tip
+    """
+    nl = len(prm["l"])
+    th = np.cumsum(X[:nl])
+    P = np.zeros((nl + 1, 2))
+    P[1:, 0] = np.cumsum(-np.array(prm["l"])*sin(th))
+    P[1:, 1] = np.cumsum(np.array(prm["l"])*cos(th))
+    return th, P
+
+
+def _contact(X, prm):
+    """
+    Signed distance from the ball center to the center line of the last link and how far along that link (from its
+    base joint) the ball is.
+    """
+    nl = len(prm["l"])
+    th, P = _joints(X, prm)
+    d = np.array([-sin(th[-1]), cos(th[-1])])  # along the link
+    rel = X[nl:nl + 2] - P[-2]
+    return d[0]*rel[1] - d[1]*rel[0], d @ rel
+
+
+def detect_impact(tout, xout, prm):
+    """
+    Finds the first time the ball reaches the last link in a trajectory, like detectImpact.m
+
+    Rather than checking samples against rb we look for the ball crossing distance rb (or the center line itself,
+    so fast balls can't tunnel through) between consecutive samples, then bisect for the crossing time on the
+    linearly interpolated state. Only crossings where the ball is over the link count.
+
+    Returns:
+        preImpactState: the interpolated state at the impact, None if there wasn't one
+        impactTime: the time of the impact, -1 if there wasn't one
+    """
+    rb = prm["rb"]
+    l_imp = prm["l"][-1]
+
+    s_prev, _ = _contact(xout[0], prm)
+    for i in range(1, len(tout)):
+        s, _ = _contact(xout[i], prm)
+        side = np.sign(s_prev) if s_prev != 0 else 1.0
+        if abs(s_prev) >= rb and (abs(s) < rb or np.sign(s) != side):
+            target = rb*side
+            lo, hi = 0.0, 1.0
+            for _ in range(30):
+                mid = (lo + hi)/2
+                s_mid, _ = _contact(xout[i - 1] + mid*(xout[i] - xout[i - 1]), prm)
+                if (s_mid - target)*side > 0:
+                    lo = mid
+                else:
+                    hi = mid
+
+            pre = xout[i - 1] + hi*(xout[i] - xout[i - 1])
+            _, along = _contact(pre, prm)
+            if 0 <= along <= l_imp:
+                return pre, tout[i - 1] + hi*(tout[i] - tout[i - 1])
+
+        s_prev = s
+
+    return None, -1
+
+
+def impact(X, prm):
+    """
+    Post impact state for a ball touching the last link, like impact.m
+
+    Angular momentum of the arm + ball is conserved about the base and every joint, the relative velocity along
+    the link is unchanged, and the relative velocity normal to the link is reversed and scaled by the coefficient
+    of restitution. This is the 3 link impact.m for any number of links. The 2 link impact.m leaves thetaPerp out
+    of the restitution row, and both special case slopes below 1e-10 (including negative ones) as horizontal, we
+    don't reproduce either.
+    """
+    nl = len(prm["l"])
+    M = np.array(prm["M"])
+    l = np.array(prm["l"])
+    p = np.array(prm["p"])
+    I = np.array(prm["I"])
+    Mb = prm["Mb"]
+
+    th, P = _joints(X, prm)
+    thetaPerp = th[-1] + pi/2
+
+    _, limp = _contact(X, prm)
+    imp = P[-2] + limp*np.array([-sin(th[-1]), cos(th[-1])])
+
+    com = P[:-1] + p[:, None]*np.column_stack((-sin(th), cos(th)))
+
+    # Jacobians of the link com's and the contact point wrt dq, link k moves with every q_j for j <= k
+    lower = np.tril(np.ones((nl, nl)))
+    strict = np.tril(np.ones((nl, nl)), -1)
+    JX = -(strict*(l*cos(th)) + np.diag(p*cos(th))) @ lower
+    JY = -(strict*(l*sin(th)) + np.diag(p*sin(th))) @ lower
+    arm = np.append(l[:-1], limp)
+    JcX = -(arm*cos(th)) @ lower
+    JcY = -(arm*sin(th)) @ lower
+
+    eqns = np.zeros((nl + 2, nl + 2))
+    for i in range(nl):
+        # angular momentum about joint i of every link past it + the ball
+        Mx = np.where(np.arange(nl) >= i, -M*(com[:, 1] - P[i, 1]), 0)
+        My = np.where(np.arange(nl) >= i, M*(com[:, 0] - P[i, 0]), 0)
+        Mt = np.where(np.arange(nl) >= i, I, 0)
+        eqns[i, :nl] = Mx @ JX + My @ JY + Mt @ lower
+        eqns[i, nl:] = [-Mb*(imp[1] - P[i, 1]), Mb*(imp[0] - P[i, 0])]
+
+    # relative velocity of the ball wrt the contact point, along the link and normal to it
+    t_dir = np.array([cos(thetaPerp), sin(thetaPerp)])
+    n_dir = np.array([-sin(thetaPerp), cos(thetaPerp)])
+    eqns[nl, :nl] = -(t_dir[0]*JcX + t_dir[1]*JcY)
+    eqns[nl, nl:] = t_dir
+    eqns[nl + 1, :nl] = -(n_dir[0]*JcX + n_dir[1]*JcY)
+    eqns[nl + 1, nl:] = n_dir
+
+    LHS = eqns @ X[nl + 2:]
+    LHS[nl + 1] *= -prm["e"]
+
+    return np.concatenate((X[:nl + 2], np.linalg.solve(eqns, LHS)))
+
+
+def constraint(X, prm):
+    """
+    Like constraint.m, 0 if nothing is wrong, n+1 if the ball is below the ground, else the index of the highest
+    joint that is below the ground
+    """
+    nl = len(prm["l"])
+    if X[nl + 1] < 0:
+        return nl + 1
+
+    _, P = _joints(X, prm)
+    for k in range(nl, 0, -1):
+        if P[k, 1] < 0:
+            return k
+
+    return 0
@@ -0,0 +1,22 @@
+%% Steps a batch of envs in one engine call, same as calling integrateODE/detectImpact/impact for each column
+
+function [Xnext, tnext] = stepBatch(t, X, timeStep, inputTorque)
+
+% t: 1xN start times, X: 8xN states, inputTorque: 1xN torques
+
+numEnvs = size(X, 2);
+Xnext = zeros(size(X), 'single');
+tnext = zeros(1, numEnvs);
+
+for n = 1:1:numEnvs
+    [tout, xout] = integrateODE([t(n) t(n) + timeStep], X(:, n), timeStep, inputTorque(:, n));
+    [impactState, impactTime] = detectImpact(tout, xout);
+
+    if impactTime == -1 % No contact
+        Xnext(:, n) = xout(end, :)';
+        tnext(n) = tout(end);
+    else
+        Xnext(:, n) = impact(impactState);
+        tnext(n) = impactTime;
+    end
+end
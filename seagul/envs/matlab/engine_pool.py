@@ -0,0 +1,75 @@
+import atexit
+
+# src path -> EnginePool. The bball_src and bball3_src folders define functions with the same names, so an engine
+# only ever gets one of them on its path and every src folder has its own pool.
+_pools = {}
+_pool_size = 1
+
+
+class EnginePool:
+    """
+    MATLAB engines shared by every env in this process that uses the same matlab source folder.
+
+    Starting an engine takes tens of seconds and a lot of memory, so instead of one engine per env instance we start
+    size engines (in parallel) the first time one is needed and hand them out round robin. Envs in the same process
+    are stepped one after another anyway, so sharing an engine doesn't cost anything.
+    """
+
+    def __init__(self, path, size=1):
+        self.path = path
+        self.size = size
+        self.engines = []
+        self.next_idx = 0
+
+    def start(self):
+        import matlab.engine
+
+        futures = [matlab.engine.start_matlab(background=True) for _ in range(self.size - len(self.engines))]
+        for future in futures:
+            eng = future.result()
+            eng.addpath(self.path, nargout=0)
+            self.engines.append(eng)
+
+    def acquire(self):
+        if len(self.engines) < self.size:
+            self.start()
+
+        eng = self.engines[self.next_idx % len(self.engines)]
+        self.next_idx += 1
+        return eng
+
+    def close(self):
+        for eng in self.engines:
+            try:
+                eng.quit()
+            except Exception:
+                pass  # engine already died, nothing else to clean up
+
+        self.engines = []
+
+
+def set_pool_size(size):
+    """
+    Number of engines each pool starts, only affects pools that haven't started yet. Defaults to 1
+    """
+    global _pool_size
+    _pool_size = size
+
+
+def get_engine(path):
+    """
+    Returns an engine with path added, starting the pool for path if this is the first time anyone asked for it
+    """
+    if path not in _pools:
+        _pools[path] = EnginePool(path, _pool_size)
+
+    return _pools[path].acquire()
+
+
+@atexit.register
+def close_all():
+    """
+    Quit every engine this process started
+    """
+    for pool in _pools.values():
+        pool.close()
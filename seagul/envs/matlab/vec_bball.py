@@ -0,0 +1,175 @@
+from gym import core, spaces
+import numpy as np
+from numpy import pi
+import seagul
+import seagul.envs.matlab.bball_src
+import seagul.envs.matlab.bball3_src
+from seagul.envs.matlab import bball_np
+from seagul.envs.matlab.engine_pool import get_engine
+
+
+class VecBBallEnv(core.Env):
+    """
+    N copies of BBallEnv stepped together. With the matlab backend every step is a single stepBatch call that ships
+    all N states to the engine and back, instead of three engine round trips per env.
+
+    step takes (N,) or (N, 1) torques and returns (N, 8) obs, (N,) rewards and (N,) dones. Envs that finish are reset
+    automatically, the obs they finished on are in info["terminal_obs"].
+    """
+
+    src_path = seagul.envs.matlab.bball_src.__path__[0]
+    ode = staticmethod(bball_np.ode_torque2)
+    params = bball_np.BBALL_PARAMS
+    state_dim = 8
+    act_dim = 1
+
+    def __init__(self,
+                 num_envs=1,
+                 max_torque=float('inf'),
+                 dt=.02,
+                 init_state=(-pi / 4, 3 * pi / 4, 0.025, .5, 0, 0, 0, 0),
+                 reward_fn=lambda S, A: S[:, 3],
+                 done_criteria=lambda S: S[:, 3] < (.3*np.cos(S[:, 0]) + .3*np.cos(S[:, 0] + S[:, 1])),
+                 backend="matlab",
+                 ):
+        """
+        reward_fn: batched version of BBallEnv's, maps (N, 8) states and (N, 1) actions to (N,) rewards
+        done_criteria: batched version of BBallEnv's, maps (N, 8) states to (N,) bools
+        """
+        if backend not in ("matlab", "numpy"):
+            raise ValueError(f"backend must be 'matlab' or 'numpy', got {backend}")
+
+        self.num_envs = num_envs
+        self.backend = backend
+        self._eng = None
+        self.max_torque = max_torque
+        self.dt = dt
+        self.init_state = np.array(init_state, dtype=np.float64)
+        self.reward_fn = reward_fn
+        self.done_criteria = done_criteria
+
+        low = np.array([-pi, -pi, -5, -5, -10, -30, -10, -10])
+        self.observation_space = spaces.Box(low=low, high=-low, dtype=np.float32)
+        self.action_space = spaces.Box(low=np.array([-max_torque]), high=np.array([max_torque]), dtype=np.float32)
+
+        self.reset()
+
+    @property
+    def eng(self):
+        if self._eng is None:
+            self._eng = get_engine(self.src_path)
+        return self._eng
+
+    def reset(self):
+        self.t = np.zeros(self.num_envs)
+        self.cur_step = np.zeros(self.num_envs, dtype=np.int64)
+        self.state = np.tile(self.init_state, (self.num_envs, 1))
+        return self.state.astype(np.float32)
+
+    def _step_batch(self, action):
+        """
+        Integrates every env for dt and handles impacts, returns the (N, state_dim) states, the (N,) times, and
+        the (N,) constraint flags from constraint.m (or None if this model doesn't have one)
+        """
+        if self.backend == "numpy":
+            state = np.empty_like(self.state)
+            t = np.empty(self.num_envs)
+            for i in range(self.num_envs):
+                u = np.broadcast_to(action[i], (len(self.params["l"]),))  # matlab broadcasts a single torque
+                tout, xout = bball_np.integrate_ode(self.ode, (self.t[i], self.t[i] + self.dt), self.state[i], self.dt, u)
+                impact_state, impact_time = bball_np.detect_impact(tout, xout, self.params)
+                if impact_time == -1:
+                    state[i], t[i] = xout[-1], tout[-1]
+                else:
+                    state[i], t[i] = bball_np.impact(impact_state, self.params), impact_time
+
+            return state, t, None
+
+        import matlab
+        out = self.eng.stepBatch(matlab.double(self.t.tolist(), size=(1, self.num_envs)),
+                                 matlab.single(self.state.T.tolist()),
+                                 float(self.dt),
+                                 matlab.single(action.T.tolist()),
+                                 nargout=2)
+
+        return (np.array(out[0], dtype=np.float64).reshape(self.state_dim, self.num_envs).T,
+                np.array(out[1], dtype=np.float64).reshape(self.num_envs), None)
+
+    def _done(self, flags):
+        return np.asarray(self.done_criteria(self.state), dtype=bool)
+
+    def step(self, action):
+        action = np.clip(np.asarray(action, dtype=np.float64).reshape(self.num_envs, self.act_dim), -self.max_torque, self.max_torque)
+
+        self.state, self.t, flags = self._step_batch(action)
+
+        reward = np.array(self.reward_fn(self.state, action), dtype=np.float64)  # copy, reward_fn can return a view of state
+        self.cur_step += 1
+        done = self._done(flags)
+
+        obs = self.state.astype(np.float32)
+        info = {"terminal_obs": obs.copy()}
+        if done.any():
+            self.state[done] = self.init_state
+            self.t[done] = 0
+            self.cur_step[done] = 0
+            obs[done] = self.state[done]
+
+        return obs, reward, done, info
+
+    def render(self, mode=None):
+        raise NotImplementedError('Frame by frame rendering not supported')
+
+
+class VecBBall3Env(VecBBallEnv):
+    """
+    N copies of BBall3Env stepped together, see VecBBallEnv.
+
+    step takes (N, 3) torques and returns (N, 10) obs, (N,) rewards and (N,) dones.
+    """
+
+    src_path = seagul.envs.matlab.bball3_src.__path__._path[0]
+    ode = staticmethod(bball_np.ode_torque3)
+    params = bball_np.BBALL3_PARAMS
+    state_dim = 10
+    act_dim = 3
+
+    def __init__(self,
+                 num_envs=1,
+                 max_torque=5.0,
+                 dt=.02,
+                 init_state=(-pi/4, 0.0, -3*pi/4, 0.025, .5, 0, 0, 0, 0, 0),
+                 reward_fn=lambda S, A: S[:, 4],
+                 max_steps=100,
+                 backend="matlab",
+                 ):
+        """
+        reward_fn: batched version of BBall3Env's, maps (N, 10) states and (N, 3) actions to (N,) rewards
+        """
+        self.max_steps = max_steps
+        super().__init__(num_envs=num_envs, max_torque=max_torque, dt=dt, init_state=init_state, reward_fn=reward_fn,
+                         done_criteria=None, backend=backend)
+
+        low = np.array([-pi, -pi, -pi, -5, -5, -10, -30, -30, -10, -10])
+        self.observation_space = spaces.Box(low=low, high=-low, dtype=np.float32)
+        self.action_space = spaces.Box(low=-max_torque*np.ones(3), high=max_torque*np.ones(3), dtype=np.float32)
+
+    def _step_batch(self, action):
+        if self.backend == "numpy":
+            state, t, _ = super()._step_batch(action)
+            return state, t, np.array([bball_np.constraint(s, self.params) for s in state])
+
+        import matlab
+        out = self.eng.stepBatch(matlab.double(self.t.tolist(), size=(1, self.num_envs)),
+                                 matlab.single(self.state.T.tolist()),
+                                 float(self.dt),
+                                 matlab.single(action.T.tolist()),
+                                 nargout=3)
+
+        return (np.array(out[0], dtype=np.float64).reshape(self.state_dim, self.num_envs).T,
+                np.array(out[1], dtype=np.float64).reshape(self.num_envs),
+                np.array(out[2]).reshape(self.num_envs))
+
+    def _done(self, flags):
+        # same as BBall3Env, which ends the episode once cur_step goes past max_steps
+        return (flags != 0) | (self.cur_step > self.max_steps)
@@ -1,8 +1,16 @@
-from seagul.envs.mujoco.su_cartpole import MJSUCartPoleEnv
-from seagul.envs.mujoco.su_cartpole_sparse import MJSUCartPoleSparseEnv
-from seagul.envs.mujoco.su_cartpole_et import MJSUCartPoleEtEnv
-from seagul.envs.mujoco.su_cartpole_discrete import MJSUCartPoleDiscreteEnv
-from seagul.envs.mujoco.five_link import FiveLinkWalkerEnv
-from seagul.envs.mujoco.det_humanoid import DetHumanoidEnv
-from seagul.envs.mujoco.hmap_hopper import HmapHopperEnv
-from seagul.envs.mujoco.hurdle_hopper import HurdleHopperEnv
+# Modules are only imported when one of their envs is asked for, see seagul.envs.lazy
+from seagul.envs.lazy import lazy_exports
+
+_exports = {
+    "MJSUCartPoleEnv": "su_cartpole",
+    "MJSUCartPoleSparseEnv": "su_cartpole_sparse",
+    "MJSUCartPoleEtEnv": "su_cartpole_et",
+    "MJSUCartPoleDiscreteEnv": "su_cartpole_discrete",
+    "FiveLinkWalkerEnv": "five_link",
+    "DetHumanoidEnv": "det_humanoid",
+    "HmapHopperEnv": "hmap_hopper",
+    "HurdleHopperEnv": "hurdle_hopper",
+}
+
+__all__ = list(_exports)
+__getattr__, __dir__ = lazy_exports(__name__, _exports)
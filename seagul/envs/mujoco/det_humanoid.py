@@ -1,4 +1,5 @@
 from gym.envs.mujoco.humanoid import HumanoidEnv
+from seagul.envs.snapshot import MujocoSnapshotMixin
 
 
 def mass_center(model, sim):
@@ -7,7 +8,7 @@ def mass_center(model, sim):
     return (np.sum(mass * xpos, 0) / np.sum(mass))[0]
 
 
-class DetHumanoidEnv(HumanoidEnv):
+class DetHumanoidEnv(MujocoSnapshotMixin, HumanoidEnv):
     def reset_model(self):
         self.set_state(self.init_qpos, self.init_qvel)
         return self._get_obs()
@@ -3,9 +3,10 @@ from gym import utils
 from gym.envs.registration import EnvSpec
 from gym.envs.mujoco import mujoco_env
 from seagul.resources import getResourcePath
+from seagul.envs.snapshot import MujocoSnapshotMixin
 
 
-class FiveLinkWalkerEnv(mujoco_env.MujocoEnv, utils.EzPickle):
+class FiveLinkWalkerEnv(MujocoSnapshotMixin, mujoco_env.MujocoEnv, utils.EzPickle):
     def __init__(self):
         self.qpos_cur = np.zeros([1, 7])
         self.qvel_cur = np.zeros([1, 7])
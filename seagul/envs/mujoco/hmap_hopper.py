@@ -5,11 +5,24 @@ import numpy as np
 import mujoco_py as mj
 import math
 from seagul.resources import getResourcePath
-import random
+from seagul.envs.mujoco.terrain import slope_profile, terrain_bank
+from numpy.random import default_rng
+from seagul.envs.snapshot import MujocoSnapshotMixin
 
 
-class HmapHopperEnv(HopperEnv):
-    def __init__(self, slope_set=None, random=True):
+class HmapHopperEnv(MujocoSnapshotMixin, HopperEnv):
+    """
+    Hopper on a heightfield made of ramps with slopes drawn from slope_set.
+
+    Courses come from a bank of bank_size precomputed terrains (generated from terrain_seed and shared by every
+    env in the process), reset just copies one in. Which one is picked is deterministic given env.seed.
+    With random=False the bank has one single ramp course per slope in slope_set instead.
+    """
+
+    def __init__(self, slope_set=None, random=True, bank_size=64, terrain_seed=0):
+        self.bank_size = bank_size
+        self.terrain_seed = terrain_seed
+        self.terrain_rng = default_rng()  # replaced by a seeded one whenever seed() is called
         mujoco_env.MujocoEnv.__init__(self, getResourcePath() + "/hmap_hopper.xml", 4)
         utils.EzPickle.__init__(self)
 
@@ -28,28 +41,36 @@ class HmapHopperEnv(HopperEnv):
         else:
             self.slope_set = slope_set
 
-    def reset(self):
-        obs = super().reset()
+    def seed(self, seed=None):
+        seeds = super().seed(seed)
+        self.terrain_rng = default_rng(seeds[0])
+        return seeds
 
-        self.cur_idx = int(self.init_x * (self.ncol / 400))
-        self.cur_hfield_val = .5
-        self.model.hfield_data[:] = self.cur_hfield_val
+    def _terrain_bank(self):
+        start_idx = int(self.init_x * (self.ncol / 400))
+        slopes = tuple(self.slope_set)
 
         if self.random:
-            for _ in range(self.course_length//self.ramp_length):
-                slope = random.choice(self.slope_set)
-                self.make_slope(slope, ramp_length=self.ramp_length)
+            n_ramps = self.course_length//self.ramp_length
+            config = (slopes, self.ncol, start_idx, self.ramp_length, n_ramps)
+            return terrain_bank("hmap_hopper", config,
+                                lambda i, rng: slope_profile(rng.choice(slopes, n_ramps), self.ncol, start_idx, self.ramp_length),
+                                self.bank_size, self.terrain_seed)
         else:
-            slope = random.choice(self.slope_set)
-
-            try:
-                self.make_slope(slope)
-            except:
-                print("Error making slope set")
-                print(self.slope_set)
-                print()
-                print(slope)
-                
+            config = (slopes, self.ncol, start_idx)
+            return terrain_bank("hmap_hopper_single", config,
+                                lambda i, rng: slope_profile([slopes[i]], self.ncol, start_idx),
+                                len(slopes), self.terrain_seed)
+
+    def reset(self):
+        obs = super().reset()
+
+        # slope_set can be changed between resets, the bank for every configuration is cached after the first time
+        bank = self._terrain_bank()
+        self.model.hfield_data[:] = bank[self.terrain_rng.integers(len(bank))]
+        self.cur_idx = self.ncol
+        self.cur_hfield_val = self.model.hfield_data[self.ncol - 1]
+
         if self.viewer:
             mj.functions.mjr_uploadHField(self.model, self.sim.render_contexts[0].con, 0)
 
@@ -5,11 +5,23 @@ import numpy as np
 import mujoco_py as mj
 import math
 from seagul.resources import getResourcePath
-import random
+from seagul.envs.mujoco.terrain import hurdle_profile, terrain_bank
+from numpy.random import default_rng
+from seagul.envs.snapshot import MujocoSnapshotMixin
 
 
-class HurdleHopperEnv(HopperEnv):
-    def __init__(self, gap_length=None, hurdle_height=.52, gap_set=None):
+class HurdleHopperEnv(MujocoSnapshotMixin, HopperEnv):
+    """
+    Hopper jumping over hurdles, the gap after each hurdle is gap_length or drawn from gap_set.
+
+    Courses come from a bank of bank_size precomputed terrains (generated from terrain_seed and shared by every
+    env in the process), reset just copies one in. Which one is picked is deterministic given env.seed.
+    """
+
+    def __init__(self, gap_length=None, hurdle_height=.52, gap_set=None, bank_size=64, terrain_seed=0):
+        self.bank_size = bank_size
+        self.terrain_seed = terrain_seed
+        self.terrain_rng = default_rng()  # replaced by a seeded one whenever seed() is called
         self.hurdle_start_x = 82
         self.hopper_start_x = 80
         self.neutral_hfield_val = .5
@@ -37,26 +49,33 @@ class HurdleHopperEnv(HopperEnv):
         else:
             self.n_hurdles = (self.ncol - self.hurdle_start_idx) // (self.gap_length + self.h_length)
 
-    def reset(self):
-        obs = super().reset()
-        self._update_num_hurdles()
+    def seed(self, seed=None):
+        seeds = super().seed(seed)
+        self.terrain_rng = default_rng(seeds[0])
+        return seeds
 
-        self.model.hfield_data[:] = self.neutral_hfield_val
+    def _terrain_bank(self):
+        profile_args = (self.ncol, self.hurdle_start_idx, self.h_length, self.hurdle_height, self.neutral_hfield_val)
+        n_hurdles = self.n_hurdles
 
-        offset = 0
+        if self.gap_set:
+            gaps = tuple(self.gap_set)
+            return terrain_bank("hurdle_hopper", (gaps, n_hurdles) + profile_args,
+                                lambda i, rng: hurdle_profile(rng.choice(gaps, n_hurdles), *profile_args),
+                                self.bank_size, self.terrain_seed)
+        else:
+            gap = self.gap_length
+            return terrain_bank("hurdle_hopper", ((gap,), n_hurdles) + profile_args,
+                                lambda i, rng: hurdle_profile([gap]*n_hurdles, *profile_args),
+                                1, self.terrain_seed)
 
-        for h in range(self.n_hurdles):
-            _from = self.hurdle_start_idx + offset
-            _to = self.hurdle_start_idx + offset + self.h_length
-            self.model.hfield_data[_from:_to] = self.hurdle_height
-            self.model.hfield_data[(self.ncol + _from):(self.ncol + _to)] = self.hurdle_height
+    def reset(self):
+        obs = super().reset()
+        self._update_num_hurdles()
 
-            if self.gap_set:
-                gap = random.choice(self.gap_set)
-                offset += (gap + self.h_length)
-            else:
-                offset += (self.gap_length + self.h_length)
-            #print(offset)
+        # gap_set / gap_length can be changed between resets, the bank for every configuration is cached after the first time
+        bank = self._terrain_bank()
+        self.model.hfield_data[:] = bank[self.terrain_rng.integers(len(bank))]
 
         if self.viewer:
             mj.functions.mjr_uploadHField(self.model, self.sim.render_contexts[0].con, 0)
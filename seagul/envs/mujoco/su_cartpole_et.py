@@ -2,9 +2,12 @@ import numpy as np
 import os
 from numpy import pi
 from gym.envs.mujoco import mujoco_env
+from seagul.envs.snapshot import MujocoSnapshotMixin
 
 
-class MJSUCartPoleEtEnv(mujoco_env.MujocoEnv):
+class MJSUCartPoleEtEnv(MujocoSnapshotMixin, mujoco_env.MujocoEnv):
+    snapshot_attrs = ("cur_step", "upright_count")
+
     def __init__(self, num_steps=400):
 
         self.num_steps = num_steps
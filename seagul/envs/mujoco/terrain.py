@@ -0,0 +1,89 @@
+import numpy as np
+from numpy.random import default_rng, SeedSequence
+
+# (generator name, config, bank_size, seed) -> read only (bank_size, nrow*ncol) array of hfield_data
+_banks = {}
+
+
+def slope_profile(slopes, ncol, start_idx, ramp_length=None, init_val=.5):
+    """
+    One row of heightfield made of consecutive ramps, same as calling HmapHopperEnv.make_slope once per slope.
+
+    Args:
+        slopes: sequence of slopes (change in height per column) one per ramp
+        ncol: number of columns in the heightfield
+        start_idx: column the first ramp starts at, everything before it stays at init_val
+        ramp_length: columns per ramp, if None the ramp goes until the height reaches 0 (or the end of the course
+            for a slope of 0) like make_slope does
+        init_val: starting height
+
+    Returns:
+        (ncol,) array of heights in [0, 1]
+    """
+    profile = np.full(ncol, init_val, dtype=np.float64)
+    cur_idx = start_idx
+    cur_val = init_val
+
+    for slope in slopes:
+        if ramp_length is not None:
+            length = ramp_length
+        elif slope != 0:
+            length = int(cur_val // abs(slope))
+        else:
+            length = ncol - cur_idx
+        length = min(length, ncol - cur_idx)
+
+        # clipping every step is the same as clipping the straight line, once we hit 0 or 1 we stay there
+        ramp = np.clip(cur_val + slope*np.arange(1, length + 1), 0, 1)
+        profile[cur_idx:cur_idx + length] = ramp
+        cur_idx += length
+        if length:
+            cur_val = ramp[-1]
+        profile[cur_idx:] = cur_val
+
+    return profile
+
+
+def hurdle_profile(gaps, ncol, start_idx, h_length, hurdle_height, neutral_val=.5):
+    """
+    One row of heightfield with a hurdle of h_length columns followed by each gap, same as HurdleHopperEnv used to
+    write into hfield_data.
+
+    Returns:
+        (ncol,) array of heights
+    """
+    profile = np.full(ncol, neutral_val, dtype=np.float64)
+    if len(gaps) == 0:
+        return profile  # course too short for even one hurdle
+
+    offsets = np.concatenate(([0], np.cumsum(np.asarray(gaps[:-1], dtype=np.int64) + h_length)))
+    idx = (start_idx + offsets[:, None] + np.arange(h_length)).ravel()
+    profile[idx[idx < ncol]] = hurdle_height
+    return profile
+
+
+def terrain_bank(name, config, generate, bank_size, seed, nrow=2):
+    """
+    Cached bank of terrains, so resetting an env is one array copy instead of rebuilding the heightfield.
+
+    Banks are shared by every env in the process and are deterministic, the same (name, config, bank_size, seed)
+    always gives the same array. Terrain i is made by generate(i, rng_i) where rng_i is spawned from seed.
+
+    Args:
+        name: which generator this is, e.g. "hmap_hopper"
+        config: hashable description of everything generate depends on
+        generate: function (i, rng) -> (ncol,) profile for one row of the heightfield, every row gets the same profile
+        bank_size: number of terrains
+        seed: seed for the bank
+
+    Returns:
+        read only (bank_size, nrow*ncol) float32 array, rows are ready to be copied into model.hfield_data
+    """
+    key = (name, config, bank_size, seed)
+    if key not in _banks:
+        rngs = [default_rng(s) for s in SeedSequence(seed).spawn(bank_size)]
+        bank = np.stack([np.tile(generate(i, rng), nrow) for i, rng in enumerate(rngs)]).astype(np.float32)
+        bank.flags.writeable = False
+        _banks[key] = bank
+
+    return _banks[key]
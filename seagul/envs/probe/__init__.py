@@ -1,4 +1,11 @@
-from seagul.envs.probe.p1 import ProbeEnv1
-from seagul.envs.probe.p2 import ProbeEnv2
-from seagul.envs.probe.p4 import ProbeEnv4
+# Modules are only imported when one of their envs is asked for, see seagul.envs.lazy
+from seagul.envs.lazy import lazy_exports
 
+_exports = {
+    "ProbeEnv1": "p1",
+    "ProbeEnv2": "p2",
+    "ProbeEnv4": "p4",
+}
+
+__all__ = list(_exports)
+__getattr__, __dir__ = lazy_exports(__name__, _exports)
@@ -1,8 +1,22 @@
-# from seagul.envs.simple_nonlinear.lorenz import LorenzEnv
-# from seagul.envs.simple_nonlinear.linear_z import LinearEnv
-# from seagul.envs.simple_nonlinear.linear_z2d import LinearEnv2D
-# from seagul.envs.simple_nonlinear.generic import GenEnv
-from seagul.envs.simple_nonlinear.tree_game import TreeEnv
-from seagul.envs.simple_nonlinear.pixel_tree import PixelTreeEnv
-from seagul.envs.simple_nonlinear.tree_simple import TreeSimple
-from seagul.envs.simple_nonlinear.tree_multi import TreeMulti
+# Modules are only imported when one of their envs is asked for, see seagul.envs.lazy
+from seagul.envs.lazy import lazy_exports
+
+_exports = {
+    "LorenzEnv": "lorenz",
+    "LinearEnv": "linear_z",
+    "LinearEnv2D": "linear_z2d",
+    "GenEnv": "generic",
+    "VecLinearEnv": "vec_linear_z",
+    "VecGenEnv": "vec_generic",
+    "TreeEnv": "tree_game",
+    "PixelTreeEnv": "pixel_tree",
+    "VecPixelTreeEnv": "pixel_tree",
+    "TreeSimple": "tree_simple",
+    "TreeMulti": "tree_multi",
+    "VecTreeEnv": "vec_tree",
+    "VecTreeSimple": "vec_tree",
+    "VecTreeMulti": "vec_tree",
+}
+
+__all__ = list(_exports)
+__getattr__, __dir__ = lazy_exports(__name__, _exports)
@@ -5,9 +5,8 @@ from numpy import cos, sin, pi
 from gym.utils import seeding
 import gym.spaces
 
-import matplotlib.pyplot as plt
-import matplotlib.animation as animation
 from seagul.integration import euler,rk4
+from seagul.envs.snapshot import SnapshotMixin
 
 
 def lorenz_dynamics(t, q, u):
@@ -23,7 +22,7 @@ def lorenz_dynamics(t, q, u):
             dqdt: numpy array with the derivatives of the current state variable [thetadot, xdot, theta2dot, x2dot]
     """
 
-    s = 10.0; b = 8/3; r = 28.0,
+    s = 10.0; b = 8/3; r = 28.0
     
     xdot = s * (q[1] - q[0]) - u[0]
     ydot = r * q[0] - q[1] - q[0] * q[2] - u[1]
@@ -32,7 +31,7 @@ def lorenz_dynamics(t, q, u):
     return np.array([xdot, ydot, zdot])
 
 
-class GenEnv(gym.core.Env):
+class GenEnv(SnapshotMixin, gym.core.Env):
     """
     Environment for the lorenz system
 
@@ -51,6 +50,7 @@ class GenEnv(gym.core.Env):
                  act_hold = 10,
                  dynamics = lorenz_dynamics,
                  reward_fn = lambda s: -((.01*s[0])**2 + (.01*s[1])**2 + (.01*s[2])**2),
+                 integrator = rk4,
     ):
         
 
@@ -67,7 +67,7 @@ class GenEnv(gym.core.Env):
 
 
         self.state = None
-        self.integrator = rk4
+        self.integrator = integrator
 
         # Observation (state) paramaters
         self.state_max = np.array([xyz_max, xyz_max, xyz_max,1])
@@ -4,14 +4,17 @@ import gym
 from gym.utils import seeding
 import gym.spaces
 
-from seagul.integration import euler,rk4
+from seagul.integration import euler, rk4, integrate_hold
+from seagul.envs.snapshot import SnapshotMixin
 
-class LinearEnv(gym.Env):
+class LinearEnv(SnapshotMixin, gym.Env):
     """
     Environment for the our "Linear Z" system.. just take a look at the dynamics. Also includes an extra
     "reward" state for the policy, in case you have a time dependend reward
     """
 
+    snapshot_attrs = ("state", "cur_step", "reward_state")
+
     def __init__(
         self,
         num_steps=50,
@@ -45,6 +48,7 @@ class LinearEnv(gym.Env):
         self.act_hold = act_hold
         self.cur_step = 0
         self.integrator = integrator
+        self.full_obs = np.empty((act_hold, 3))
 
         self.state_max = np.array([xyz_max, xyz_max, xyz_max, 1])
         self.observation_space = gym.spaces.Box(low=-(self.state_max+50), high=self.state_max+50, dtype=np.float32)
@@ -75,12 +79,13 @@ class LinearEnv(gym.Env):
         return aug_state
 
     def step(self, action):
+        """
+        Note that info["full_obs"] is a buffer that gets overwritten on the next step, copy it if you want to keep it
+        """
         action = np.clip(action, -self.action_max, self.action_max)
 
-        full_obs = np.zeros((self.act_hold,3))
-        for i in range(self.act_hold):
-            self.state = self.integrator(self._derivs, action, 0, self.dt, self.state)
-            full_obs[i,:] = self.state
+        integrate_hold(self._derivs, action, 0, self.dt, self.state, self.act_hold, out=self.full_obs, integrator=self.integrator)
+        self.state = self.full_obs[-1].copy()
 
         aug_state = np.concatenate((self.state, np.array(self.reward_state).reshape(-1)))
         reward, aug_state = self.reward_fn(aug_state)
@@ -91,7 +96,7 @@ class LinearEnv(gym.Env):
         if self.cur_step >= self.num_steps:
             done = True
 
-        return aug_state , reward, done, {"full_obs": full_obs}
+        return aug_state , reward, done, {"full_obs": self.full_obs}
 
     def render(self, mode="human"):
         raise NotImplementedError
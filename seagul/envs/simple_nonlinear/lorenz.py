@@ -5,12 +5,11 @@ from numpy import cos, sin, pi
 from gym.utils import seeding
 import gym.spaces
 
-import matplotlib.pyplot as plt
-import matplotlib.animation as animation
 from seagul.integration import euler,rk4
+from seagul.envs.snapshot import SnapshotMixin
 
 
-class LorenzEnv(gym.core.Env):
+class LorenzEnv(SnapshotMixin, gym.core.Env):
     """
     Environment for the lorenz system
 
@@ -1,11 +1,75 @@
-import pygame as pg
-import pygame.freetype as ft
 import sys
 from gym import core, spaces
+from numpy.random import default_rng
 import numpy as np
-
-class PixelTreeEnv(core.Env):
-    def __init__(self, render=True):
+from seagul.envs.snapshot import SnapshotMixin
+
+
+def _rect_bounds(left, top, width, height, scale=1, h=None, w=None):
+    """
+    Rows r0:r1 and columns c0:c1 covered by a rectangle given in screen pixels, in a buffer (H, W) downsampled by
+    scale. left and top can be arrays, then you get arrays of bounds back.
+
+    At scale 1 the corner is truncated like pygame.Rect does, so we paint exactly the pixels render would. When
+    downsampling partially covered pixels get painted, so thin objects never vanish
+    """
+    if scale == 1:
+        r0 = np.trunc(top)
+        c0 = np.trunc(left)
+        r1 = r0 + int(height)
+        c1 = c0 + int(width)
+    else:
+        r0 = np.floor(np.divide(top, scale))
+        r1 = np.ceil(np.divide(np.add(top, height), scale))
+        c0 = np.floor(np.divide(left, scale))
+        c1 = np.ceil(np.divide(np.add(left, width), scale))
+
+    r0, r1 = np.clip(r0, 0, h).astype(np.int64), np.clip(r1, 0, h).astype(np.int64)
+    c0, c1 = np.clip(c0, 0, w).astype(np.int64), np.clip(c1, 0, w).astype(np.int64)
+    return r0, r1, c0, c1
+
+
+def _fill_rect(buf, left, top, width, height, scale=1, value=255):
+    """
+    Paints an axis aligned rectangle given in screen pixels into buf (..., H, W), which may be downsampled by scale
+    """
+    h, w = buf.shape[-2:]
+    r0, r1, c0, c1 = (int(b) for b in _rect_bounds(left, top, width, height, scale, h, w))
+    if r0 < r1 and c0 < c1:
+        buf[..., r0:r1, c0:c1] = value
+
+
+def _fill_rects(buf, left, top, width, height, scale=1, value=255):
+    """
+    Same as _fill_rect for N rectangles at once, rectangle i (left[i], top[i]) is painted into buf[i] (N, C, H, W).
+    Done with one broadcast mask instead of a python loop over the envs
+    """
+    n, h, w = buf.shape[0], buf.shape[-2], buf.shape[-1]
+    left, top = np.broadcast_to(left, (n,)), np.broadcast_to(top, (n,))
+    r0, r1, c0, c1 = _rect_bounds(left, top, width, height, scale, h, w)
+
+    rows = np.arange(h)[None, :, None]
+    cols = np.arange(w)[None, None, :]
+    mask = ((rows >= r0[:, None, None]) & (rows < r1[:, None, None])
+            & (cols >= c0[:, None, None]) & (cols < c1[:, None, None]))
+    buf[np.broadcast_to(mask[:, None], buf.shape)] = value
+
+
+class PixelTreeEnv(SnapshotMixin, core.Env):
+    """
+    Pixel version of TreeEnv, dodge the falling tree. Observations are (1, H, W) uint8 images painted directly into a
+    reused numpy buffer, so no display (or pygame) is needed unless you call render.
+
+    Args:
+        render: if True, also draw to a pygame window every step (the old behavior), only useful for watching
+        downsample: integer factor to shrink the observation by, e.g. 4 gives (1, 120, 160) images
+
+    Note that the observation returned by step is a view of the env's buffer and is repainted on the next step,
+    copy it if you want to keep it around.
+    """
+
+    snapshot_attrs = ("x", "tree_x", "tree_y", "cur_step")
+    def __init__(self, render=False, downsample=1):
         self.screen_size = self.screen_width, self.screen_height = 640, 480
         self.color_black = (0, 0, 0)
         self.color_white = (255, 255, 255)
@@ -18,22 +82,29 @@ class PixelTreeEnv(core.Env):
         self.ymax = self.screen_height + 50
 
         self.renderer_is_init = False
+        self.render_every_step = render
+        self.downsample = downsample
 
         # self.max_steps = 1000
         # self.cur_step = 0
 
-        self.obs_size = self.screen_width*self.screen_height
-        obs_shape = (1, self.screen_height, self.screen_width)
-        self.observation_space = spaces.Box(shape=obs_shape, low=np.zeros(obs_shape,dtype=np.uint8), high=np.ones(obs_shape,dtype=np.uint8),dtype=np.uint8)
+        obs_shape = (1, self.screen_height // downsample, self.screen_width // downsample)
+        self.obs_size = obs_shape[1]*obs_shape[2]
+        self.observation_space = spaces.Box(shape=obs_shape, low=0, high=255, dtype=np.uint8)
         self.action_space = spaces.Box(low=np.array([-1.0]), high=np.array([1.0]))
 
-        self.init_render()
+        self.obs_buf = np.zeros(obs_shape, dtype=np.uint8)
+        self.background = np.zeros(obs_shape, dtype=np.uint8)
+        _fill_rect(self.background, 100, 0, 2, self.screen_height, downsample)
+        _fill_rect(self.background, self.screen_width - 100, 0, 2, self.screen_height, downsample)
+
+        self.seed()
         self.tree_x = self._spawn_tree()
 
         self.reset()
 
     def seed(self, seed=None):
-        np.random.seed(seed)
+        self.rng = default_rng(seed)
 
     def reset(self):
         self.x = 0.0
@@ -43,12 +114,11 @@ class PixelTreeEnv(core.Env):
         return self._get_obs()
 
     def _spawn_tree(self):
-        self.tree_x = np.random.randint(100, self.screen_width-100)  - self.screen_width//2
+        self.tree_x = self.rng.integers(100, self.screen_width-100)  - self.screen_width//2
         self.tree_y = -50
         return self.tree_x
 
     def step(self, act):
-        self.render()
         act = np.clip(act, -1,1)
         self.x += act * self.xvel
         self.x = np.clip(self.x, 100 - self.screen_width/2, self.screen_width/2 - 100).item()
@@ -70,14 +140,23 @@ class PixelTreeEnv(core.Env):
             self.tree_y = self.tree_y % self.ymax
             self.tree_x = self._spawn_tree()
 
+        if self.render_every_step:
+            self.render()
+
         reward = 1
         return self._get_obs(), reward, done, {}
 
     def _get_obs(self):
-        return pg.surfarray.array2d(self.screen).reshape((1, self.screen_height, self.screen_width))
+        self.obs_buf[:] = self.background
+        _fill_rect(self.obs_buf, self.x + self.screen_width/2 - self.sprite_width/2, self.y, self.sprite_width, self.sprite_height, self.downsample)
+        _fill_rect(self.obs_buf, self.tree_x + self.screen_width/2 - self.tree_width/2, self.tree_y, self.tree_width, self.tree_height, self.downsample)
+        return self.obs_buf
         #return np.array([self.x/220, (self.tree_y - self.y)/480, (self.x - self.tree_x)/480])
 
     def init_render(self):
+        import pygame as pg
+        import pygame.freetype as ft
+
         pg.init()
         self.screen = pg.display.set_mode(self.screen_size)
         pg.key.set_repeat(1, 10)
@@ -111,6 +190,91 @@ class PixelTreeEnv(core.Env):
         pg.display.flip()
 
 
+class VecPixelTreeEnv(SnapshotMixin, core.Env):
+    """
+    N copies of PixelTreeEnv stepped in lock-step, observations are an (N, 1, H, W) uint8 array painted into one reused
+    buffer. Envs that crash are reset automatically, the frames they crashed on are in info["terminal_obs"]. That's
+    another reused (N, 1, H, W) buffer, only the rows of the envs that are done on this step are written.
+
+    Args:
+        num_envs: how many games to run
+        downsample: integer factor to shrink the observations by
+    """
+
+    snapshot_attrs = ("x", "tree_x", "tree_y")
+    def __init__(self, num_envs=1, downsample=1):
+        self.num_envs = num_envs
+        self.screen_size = self.screen_width, self.screen_height = 640, 480
+        self.sprite_size = self.sprite_width, self.sprite_height = 10,10
+        self.tree_size = self.tree_width, self.tree_height = 150,50
+
+        self.yvel = 10
+        self.xvel = 20
+        self.ymax = self.screen_height + 50
+        self.downsample = downsample
+
+        obs_shape = (1, self.screen_height // downsample, self.screen_width // downsample)
+        self.observation_space = spaces.Box(shape=obs_shape, low=0, high=255, dtype=np.uint8)
+        self.action_space = spaces.Box(low=np.array([-1.0]), high=np.array([1.0]))
+
+        self.obs_buf = np.zeros((num_envs,) + obs_shape, dtype=np.uint8)
+        self.terminal_buf = np.zeros((num_envs,) + obs_shape, dtype=np.uint8)
+        self.background = np.zeros(obs_shape, dtype=np.uint8)
+        _fill_rect(self.background, 100, 0, 2, self.screen_height, downsample)
+        _fill_rect(self.background, self.screen_width - 100, 0, 2, self.screen_height, downsample)
+
+        self.seed()
+        self.reset()
+
+    def seed(self, seed=None):
+        self.rng = default_rng(seed)
+
+    def _spawn_tree(self, mask):
+        self.tree_x[mask] = self.rng.integers(100, self.screen_width-100, size=mask.sum()) - self.screen_width//2
+        self.tree_y[mask] = -50
+
+    def reset(self):
+        self.x = np.zeros(self.num_envs)
+        self.y = self.screen_height - 50.0
+        self.tree_x = np.zeros(self.num_envs, dtype=np.int64)
+        self.tree_y = np.zeros(self.num_envs, dtype=np.int64)
+        self._spawn_tree(np.ones(self.num_envs, dtype=bool))
+        return self._get_obs()
+
+    def step(self, act):
+        act = np.clip(np.asarray(act, dtype=np.float64).reshape(self.num_envs), -1, 1)
+        self.x = np.clip(self.x + act * self.xvel, 100 - self.screen_width/2, self.screen_width/2 - 100)
+        self.tree_y += self.yvel
+
+        in_y = ((self.tree_y + self.tree_height/2) > (self.y - self.sprite_height/2)) & ((self.tree_y - self.tree_height/2) < (self.y + self.sprite_height/2))
+        in_x = ((self.tree_x + self.tree_width/2) > (self.x - self.sprite_width/2)) & ((self.tree_x - self.tree_width/2) < (self.x + self.sprite_width/2))
+        done = in_y & in_x
+
+        self._spawn_tree(self.tree_y > self.ymax)
+
+        if done.any():
+            # paint just the crash frames before the auto reset, the full buffer is only painted once below
+            frames = np.empty((done.sum(),) + self.obs_buf.shape[1:], dtype=np.uint8)
+            self.terminal_buf[done] = self._paint(frames, self.x[done], self.tree_x[done], self.tree_y[done])
+            self.x[done] = 0.0
+            self._spawn_tree(done)
+
+        reward = np.ones(self.num_envs)
+        return self._get_obs(), reward, done, {"terminal_obs": self.terminal_buf}
+
+    def _paint(self, buf, x, tree_x, tree_y):
+        buf[:] = self.background
+        _fill_rects(buf, x + self.screen_width/2 - self.sprite_width/2, self.y, self.sprite_width, self.sprite_height, self.downsample)
+        _fill_rects(buf, tree_x + self.screen_width/2 - self.tree_width/2, tree_y, self.tree_width, self.tree_height, self.downsample)
+        return buf
+
+    def _get_obs(self):
+        return self._paint(self.obs_buf, self.x, self.tree_x, self.tree_y)
+
+    def render(self, mode=None):
+        raise NotImplementedError
+
+
 def update():
     obs, rews, done, _ = env.step(act)
     env.render()
@@ -1,8 +1,11 @@
 import sys
 from gym import core, spaces
 import numpy as np
+from seagul.envs.snapshot import SnapshotMixin
+
+class TreeEnv(SnapshotMixin, core.Env):
+    snapshot_attrs = ("x", "tree_x", "tree_y", "cur_step")
 
-class TreeEnv(core.Env):
     def __init__(self, render=True):
         self.screen_size = self.screen_width, self.screen_height = 640, 480
         self.color_black = (0, 0, 0)
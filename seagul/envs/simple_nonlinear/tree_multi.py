@@ -1,8 +1,11 @@
 from gym import core, spaces
 import numpy as np
+from seagul.envs.snapshot import SnapshotMixin
 
 
-class TreeMulti(core.Env):
+class TreeMulti(SnapshotMixin, core.Env):
+    snapshot_attrs = ("X", "cur_step")
+
     def __init__(self, L=2.5, init_y=2, g=-5, dt=.1, tol=.1, N=5):
         self.L = L
         self.init_y = init_y
@@ -1,9 +1,12 @@
 from gym import core, spaces
 from numpy.random import default_rng
 import numpy as np
+from seagul.envs.snapshot import SnapshotMixin
 
 
-class TreeSimple(core.Env):
+class TreeSimple(SnapshotMixin, core.Env):
+    snapshot_attrs = ("X", "cur_step")
+
     def __init__(self, L=5.0, init_y=2, g=-5, dt=.1, tol=.1, N=5, seed=None):
         self.L = L
         self.init_y = init_y
@@ -0,0 +1,130 @@
+import numpy as np
+import gym
+
+from gym.utils import seeding
+import gym.spaces
+
+from seagul.integration import batch_rk4
+from seagul.envs.snapshot import SnapshotMixin
+
+
+def batch_lorenz_dynamics(t, Q, U, s=10.0, b=8/3, r=28.0):
+    """
+    Batched version of generic.lorenz_dynamics
+
+    Args:
+        t: float with the current time (not actually used but most ODE solvers want to pass this in anyway)
+        Q: (N, 3) array of states [x,y,z]
+        U: (N, 3) array of control inputs
+
+    Returns:
+        dQdt: (N, 3) array with the derivatives of every state [xdot, ydot, zdot]
+    """
+    dQdt = np.empty_like(Q)
+    dQdt[:, 0] = s * (Q[:, 1] - Q[:, 0]) - U[:, 0]
+    dQdt[:, 1] = r * Q[:, 0] - Q[:, 1] - Q[:, 0] * Q[:, 2] - U[:, 1]
+    dQdt[:, 2] = Q[:, 0] * Q[:, 1] - b * Q[:, 2] - U[:, 2]
+    return dQdt
+
+
+def batch_quadratic_reward(S):
+    """
+    Batched version of the default GenEnv reward, S is the (N, 4) augmented state
+    """
+    return -((.01 * S[:, :3]) ** 2).sum(axis=1)
+
+
+class VecGenEnv(SnapshotMixin, gym.core.Env):
+    """
+    N copies of GenEnv simulated in lock-step, with a pluggable batched dynamics function. Defaults to the lorenz
+    system, so with the default arguments this is also a vectorized LorenzEnv.
+
+    step takes (N, 3) actions and returns (N, 4) augmented states, (N,) rewards and (N,) dones.
+    Envs that finish are reset automatically, the states they finished on are in info["terminal_obs"].
+    """
+
+    def __init__(self,
+                 num_envs=1,
+                 num_steps=1000,
+                 dt = 0.01,
+                 init_state = np.array([0, 1, 1.05]),
+                 xyz_max = 100.0,
+                 u_max = 100.0,
+                 state_noise_max = 5.0,
+                 u_noise_max = 0.0,
+                 act_hold = 10,
+                 dynamics = batch_lorenz_dynamics,
+                 reward_fn = batch_quadratic_reward,
+                 integrator = batch_rk4,
+    ):
+        """
+        num_envs: how many systems to simulate
+        dynamics: function(t, Q, U) -> dQ/dt over (N, 3) arrays
+        reward_fn: function mapping the (N, 4) augmented state to (N,) rewards
+        integrator: must operate on batches, e.g. batch_rk4 or batch_euler
+        u_noise_max: uniform noise of this magnitude is added to every action before clipping
+        """
+
+        self.num_envs = num_envs
+        self.init_state = np.asarray(init_state, dtype=np.float64)
+
+        self.dt = dt
+        self.num_steps = num_steps
+        self.act_hold = act_hold
+        self.dynamics = dynamics
+        self.reward_fn = reward_fn
+        self.integrator = integrator
+
+        self.state_max = np.array([xyz_max, xyz_max, xyz_max, 1])
+        self.observation_space = gym.spaces.Box(low=-self.state_max, high=self.state_max, dtype=np.float64)
+        self.state_noise_max = state_noise_max
+
+        self.action_max = np.array([u_max, u_max, u_max])
+        self.action_space = gym.spaces.Box(low=-self.action_max, high=self.action_max, dtype=np.float64)
+        self.u_noise_max = u_noise_max
+
+        self.reward_state = 1
+        self.seed()
+        self.reset()
+
+    def seed(self, seed=None):
+        self.np_random, seed = seeding.np_random(seed)
+        return [seed]
+
+    def _sample_init(self, n):
+        # Same as GenEnv, one scalar offset per env added to every coordinate
+        return self.init_state + self.np_random.uniform(-self.state_noise_max, self.state_noise_max, size=(n, 1))
+
+    def _aug(self):
+        return np.column_stack((self.state, np.full(self.num_envs, self.reward_state, dtype=np.float64)))
+
+    def reset(self):
+        self.state = self._sample_init(self.num_envs)
+        self.cur_step = np.zeros(self.num_envs, dtype=np.int64)
+        return self._aug()
+
+    def step(self, action):
+        action = np.asarray(action, dtype=np.float64).reshape(self.num_envs, 3)
+        if self.u_noise_max > 0:
+            action = action + self.np_random.uniform(-self.u_noise_max, self.u_noise_max, size=action.shape)
+        action = np.clip(action, -self.action_max, self.action_max)
+
+        for i in range(self.act_hold):
+            self.state = self.integrator(self.dynamics, action, i*self.dt, self.dt, self.state)
+
+        aug_state = self._aug()
+        reward = self.reward_fn(aug_state)
+
+        self.cur_step += 1
+        done = self.cur_step > self.num_steps
+
+        info = {"terminal_obs": aug_state.copy()}
+        if done.any():
+            self.state[done] = self._sample_init(done.sum())
+            self.cur_step[done] = 0
+            aug_state[done, :3] = self.state[done]
+
+        return aug_state, reward, done, info
+
+    def render(self, mode="human"):
+        raise NotImplementedError
@@ -0,0 +1,122 @@
+import numpy as np
+import gym
+
+from gym.utils import seeding
+import gym.spaces
+
+from seagul.integration import batch_rk4, integrate_hold
+from seagul.envs.snapshot import SnapshotMixin
+
+
+class VecLinearEnv(SnapshotMixin, gym.Env):
+    """
+    N copies of the "Linear Z" system (see linear_z.LinearEnv) simulated in lock-step. The dynamics are written as
+    one matrix multiply over the whole (N, 3) batch, so stepping thousands of envs costs about the same as stepping one.
+
+    step returns (N, 4) augmented states (x,y,z,r), (N,) rewards and (N,) dones. Envs that finish are reset
+    automatically, the states they finished on are in info["terminal_obs"].
+    """
+
+    snapshot_attrs = ("state", "cur_step", "reward_state")
+
+    def __init__(
+        self,
+        num_envs=1,
+        num_steps=50,
+        dt=0.01,
+        act_hold=1,
+        init_state=np.array([1, 1, 1]),
+        init_noise_max=5.0,
+        xyz_max=float('inf'),
+        u_max=25,
+        reward_fn=lambda S: (-((.01*S[:, :3])**2).sum(axis=1), S),
+        integrator=batch_rk4
+    ):
+
+        """
+        num_envs: how many systems to simulate
+        reward_fn: lambda mapping the (N, 4) augmented state to (N,) rewards and the (possibly modified) augmented state
+        integrator: must operate on batches, e.g. batch_rk4 or batch_euler
+
+        everything else is the same as linear_z.LinearEnv
+        """
+
+        self.num_envs = num_envs
+        self.dt = dt
+        self.num_steps = num_steps
+        self.reward_fn = reward_fn
+        self.init_state = np.asarray(init_state, dtype=np.float64)
+        self.act_hold = act_hold
+        self.integrator = integrator
+        self.full_obs = np.empty((act_hold, num_envs, 3))
+
+        # like LinearEnv this is only set here, it carries over resets
+        self.reward_state = np.full(num_envs, 10.0)
+
+        # xdot = u0, ydot = u1, zdot = x
+        self.A = np.array([[0., 0., 0.], [0., 0., 0.], [1., 0., 0.]])
+        self.B = np.array([[1., 0.], [0., 1.], [0., 0.]])
+
+        self.state_max = np.array([xyz_max, xyz_max, xyz_max, 1])
+        self.observation_space = gym.spaces.Box(low=-(self.state_max+50), high=self.state_max+50, dtype=np.float32)
+        self.init_noise_max = init_noise_max
+
+        self.action_max = np.array([u_max, u_max])
+        self.action_space = gym.spaces.Box(low=-self.action_max, high=self.action_max, dtype=np.float32)
+
+        self.seed()
+        self.reset()
+
+    def seed(self, seed=None):
+        self.np_random, seed = seeding.np_random(seed)
+        return [seed]
+
+    def _sample_init(self, n):
+        # Same as LinearEnv, one scalar offset per env added to every coordinate
+        return self.init_state + self.np_random.uniform(-self.init_noise_max, self.init_noise_max, size=(n, 1))
+
+    def reset(self, init_state=None):
+        """
+        init_state: optional (3,) or (N, 3) array to start from
+        """
+        if init_state is None:
+            self.state = self._sample_init(self.num_envs)
+        else:
+            self.state = np.broadcast_to(np.asarray(init_state, dtype=np.float64), (self.num_envs, 3)).copy()
+
+        self.cur_step = np.zeros(self.num_envs, dtype=np.int64)
+        return np.column_stack((self.state, self.reward_state))
+
+    def step(self, action):
+        """
+        Note that info["full_obs"] is an (act_hold, N, 3) buffer that gets overwritten on the next step
+        """
+        action = np.clip(np.asarray(action, dtype=np.float64).reshape(self.num_envs, 2), -self.action_max, self.action_max)
+
+        integrate_hold(self._derivs, action, 0, self.dt, self.state, self.act_hold, out=self.full_obs, integrator=self.integrator)
+        self.state = self.full_obs[-1].copy()
+
+        aug_state = np.column_stack((self.state, self.reward_state))
+        reward, aug_state = self.reward_fn(aug_state)
+        self.reward_state = aug_state[:, -1].copy()
+
+        self.cur_step += 1
+        done = self.cur_step >= self.num_steps
+
+        info = {"full_obs": self.full_obs, "terminal_obs": aug_state.copy()}
+        if done.any():
+            self.state[done] = self._sample_init(done.sum())
+            self.cur_step[done] = 0
+            aug_state = aug_state.copy()
+            aug_state[done] = np.column_stack((self.state[done], self.reward_state[done]))
+
+        return aug_state, reward, done, info
+
+    def render(self, mode="human"):
+        raise NotImplementedError
+
+    def _derivs(self, t, Q, U):
+        """
+        Batched dynamics, Q is (N, 3) and U is (N, 2)
+        """
+        return Q @ self.A.T + U @ self.B.T
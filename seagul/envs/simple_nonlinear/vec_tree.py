@@ -0,0 +1,187 @@
+from gym import core, spaces
+from numpy.random import default_rng, SeedSequence
+import numpy as np
+from seagul.envs.snapshot import SnapshotMixin
+
+
+class _StreamPool:
+    """
+    One independent random stream per env, so an env's resets don't depend on how many other envs are in the batch
+    or when they finish. Each stream is drawn in blocks ahead of time, so sampling for any subset of envs is a single
+    fancy index instead of a python loop over generators.
+    """
+
+    def __init__(self, num_envs, seed=None, block=1024):
+        self.gens = [default_rng(s) for s in SeedSequence(seed).spawn(num_envs)]
+        self.block = block
+        self.pool = np.stack([g.random(block) for g in self.gens])
+        self.idx = np.zeros(num_envs, dtype=np.int64)
+
+    def uniform(self, mask, low=0.0, high=1.0):
+        """
+        One uniform [low, high) sample for every env where mask is True
+        """
+        envs = np.flatnonzero(mask)
+        for i in envs[self.idx[envs] >= self.block]:
+            self.pool[i] = self.gens[i].random(self.block)
+            self.idx[i] = 0
+
+        u = self.pool[envs, self.idx[envs]]
+        self.idx[envs] += 1
+        return low + u * (high - low)
+
+
+class VecTreeSimple(SnapshotMixin, core.Env):
+    """
+    N copies of TreeSimple stepped in lock-step, X is (N, 2) [x, y].
+
+    step takes (N,) or (N, 1) actions and returns (N, 2) obs, (N,) rewards and (N,) dones. Envs that finish are reset
+    automatically, the obs they finished on are in info["terminal_obs"].
+    """
+
+    snapshot_attrs = ("X", "cur_step")
+
+    def __init__(self, num_envs=1, L=5.0, init_y=2, g=-5, dt=.1, tol=.1, N=5, seed=None, deadzones=((-2, 2),), reset_range=None):
+        """
+        deadzones: (K, 2) [low, high] x intervals the sprite must not be in when it crosses y = 0
+        reset_range: [low, high] range x is reset in, defaults to the first deadzone like TreeSimple
+        """
+        self.num_envs = num_envs
+        self.L = L
+        self.init_y = init_y
+        self.g = g
+        self.dt = dt
+        self.tol = tol
+        self.N = N
+
+        self.observation_space = spaces.Box(low=np.array([-10.0, -10.0]), high=np.array([10.0, 10.0]))
+        self.action_space = spaces.Box(low=np.array([-self.L]), high=np.array([self.L]))
+
+        self.deadzones = np.array(deadzones, dtype=np.float64)
+        self.xrange = np.array([-10.0, 10.0])
+        self.reset_range = self.deadzones[0] if reset_range is None else np.asarray(reset_range, dtype=np.float64)
+
+        self.seed(seed)
+        self.reset()
+
+    def seed(self, seed=None):
+        self.rng = _StreamPool(self.num_envs, seed)
+
+    def _reset_envs(self, mask):
+        self.X[mask, 0] = self.rng.uniform(mask, self.reset_range[0], self.reset_range[1])
+        self.X[mask, 1] = self.init_y
+        self.cur_step[mask] = 0
+
+    def reset(self):
+        self.X = np.zeros((self.num_envs, 2))
+        self.cur_step = np.zeros(self.num_envs, dtype=np.int64)
+        self._reset_envs(np.ones(self.num_envs, dtype=bool))
+        return self.X.copy()
+
+    def step(self, act):
+        act = np.clip(np.asarray(act, dtype=np.float64).reshape(self.num_envs), -self.L, self.L)
+
+        self.X[:, 0] = np.clip(self.X[:, 0] + act * self.dt, self.xrange[0], self.xrange[1])
+        self.X[:, 1] += self.g * self.dt
+
+        reward = -0.1 * act ** 2 + 1
+
+        x = self.X[:, 0:1]
+        y = self.X[:, 1]
+        hit = ((self.deadzones[:, 0] < x) & (x < self.deadzones[:, 1])).any(axis=1) & (-self.tol < y) & (y < self.tol)
+        reward[hit] -= 25.0
+
+        self.cur_step += 1
+        done = hit | (self.cur_step >= self.N)
+
+        obs = self.X.copy()
+        info = {"terminal_obs": obs.copy()}
+        if done.any():
+            self._reset_envs(done)
+            obs[done] = self.X[done]
+
+        return obs, reward, done, info
+
+    def render(self, mode=None):
+        pass
+
+
+class VecTreeMulti(VecTreeSimple):
+    """
+    N copies of TreeMulti, same as VecTreeSimple but with two deadzones and resets spread over the whole x range
+    """
+
+    def __init__(self, num_envs=1, L=2.5, init_y=2, g=-5, dt=.1, tol=.1, N=5, seed=None):
+        super().__init__(num_envs=num_envs, L=L, init_y=init_y, g=g, dt=dt, tol=tol, N=N, seed=seed,
+                         deadzones=((-4, -2), (2, 4)), reset_range=(-10.0, 10.0))
+
+
+class VecTreeEnv(SnapshotMixin, core.Env):
+    """
+    N copies of TreeEnv (the tree dodging game) stepped in lock-step, without any rendering.
+
+    step takes (N,) or (N, 1) actions and returns (N, 3) obs, (N,) rewards and (N,) dones. Envs that crash are reset
+    automatically, the obs they finished on are in info["terminal_obs"].
+    """
+
+    snapshot_attrs = ("x", "tree_x", "tree_y")
+
+    def __init__(self, num_envs=1, seed=None):
+        self.num_envs = num_envs
+        self.screen_size = self.screen_width, self.screen_height = 640, 480
+        self.sprite_size = self.sprite_width, self.sprite_height = 10,10
+        self.tree_size = self.tree_width, self.tree_height = 150,50
+
+        self.yvel = 10
+        self.xvel = 20
+        self.ymax = self.screen_height + 50
+        self.y = self.screen_height - 50.0
+
+        self.observation_space = spaces.Box(low=np.array([-5.0,-5.0,-5.0]), high=np.array([5.0,5.0,5.0]))
+        self.action_space = spaces.Box(low=np.array([-1.0]), high=np.array([1.0]))
+
+        self.seed(seed)
+        self.reset()
+
+    def seed(self, seed=None):
+        self.rng = _StreamPool(self.num_envs, seed)
+
+    def _spawn_tree(self, mask):
+        self.tree_x[mask] = np.floor(self.rng.uniform(mask, 100, self.screen_width-100)) - self.screen_width//2
+        self.tree_y[mask] = -50
+
+    def reset(self):
+        self.x = np.zeros(self.num_envs)
+        self.tree_x = np.zeros(self.num_envs)
+        self.tree_y = np.zeros(self.num_envs)
+        self._spawn_tree(np.ones(self.num_envs, dtype=bool))
+        return self._get_obs()
+
+    def step(self, act):
+        act = np.clip(np.asarray(act, dtype=np.float64).reshape(self.num_envs), -1, 1)
+        self.x = np.clip(self.x + act * self.xvel, 100 - self.screen_width/2, self.screen_width/2 - 100)
+        self.tree_y += self.yvel
+
+        in_y = ((self.tree_y + self.tree_height/2) > (self.y - self.sprite_height/2)) & ((self.tree_y - self.tree_height/2) < (self.y + self.sprite_height/2))
+        in_x = ((self.tree_x + self.tree_width/2) > (self.x - self.sprite_width/2)) & ((self.tree_x - self.tree_width/2) < (self.x + self.sprite_width/2))
+        done = in_y & in_x
+
+        passed = self.tree_y > self.ymax
+        self.tree_y[passed] %= self.ymax
+        self._spawn_tree(passed)
+
+        reward = np.ones(self.num_envs)
+        obs = self._get_obs()
+        info = {"terminal_obs": obs.copy()}
+        if done.any():
+            self.x[done] = 0.0
+            self._spawn_tree(done)
+            obs[done] = self._get_obs()[done]
+
+        return obs, reward, done, info
+
+    def _get_obs(self):
+        return np.column_stack((self.x/220, (self.tree_y - self.y)/480, (self.x - self.tree_x)/480))
+
+    def render(self, mode=None):
+        pass
@@ -0,0 +1,102 @@
+import copy
+import numpy as np
+
+_immutable = (int, float, bool, complex, str, bytes, type(None), np.generic)
+
+
+def _copy(value):
+    # fast paths for what env state almost always is, so snapshotting every step stays cheap
+    if isinstance(value, _immutable):
+        return value
+    if isinstance(value, np.ndarray):
+        return value.copy()
+    if hasattr(value, "clone"):  # torch tensors
+        return value.clone()
+    return copy.deepcopy(value)
+
+
+class SnapshotMixin:
+    """
+    Adds get_state()/set_state() to an env whose whole state lives in a few attributes, listed in snapshot_attrs.
+
+    A snapshot can be restored any number of times, which is what branching rollouts need, e.g. evaluating both
+    sides of an antithetic ARS pair from the same state, or skipping a long warm up by restoring the state right
+    after it. The env's random number generators are not part of the snapshot.
+
+    Example:
+        snap = env.get_state()
+        ret_plus = do_rollout(env, policy_plus)
+        env.set_state(snap)
+        ret_minus = do_rollout(env, policy_minus)
+        env.release_state(snap)
+    """
+
+    snapshot_attrs = ("state", "cur_step")
+
+    def get_state(self):
+        """
+        Returns:
+            snapshot of the env, pass it to set_state to go back to this point
+        """
+        return {name: _copy(getattr(self, name)) for name in self.snapshot_attrs}
+
+    def set_state(self, snapshot):
+        """
+        Puts the env back to where it was when get_state returned snapshot, the next step continues from there.
+        """
+        for name in self.snapshot_attrs:
+            setattr(self, name, _copy(snapshot[name]))
+
+    def release_state(self, snapshot):
+        """
+        Frees anything snapshot holds outside of python, a no-op for envs whose snapshots are plain python objects.
+        """
+        pass
+
+
+class MujocoSnapshotMixin(SnapshotMixin):
+    """
+    SnapshotMixin for gym MujocoEnvs, snapshots hold sim.get_state() (time, qpos, qvel, act) along with
+    snapshot_attrs. The model is not part of the snapshot, so things set at reset like a hopper's terrain have to
+    be the same when the snapshot is restored.
+
+    gym's MujocoEnv.set_state(qpos, qvel) still works, set_state only treats its argument as a snapshot when qvel
+    is not passed.
+    """
+
+    snapshot_attrs = ()
+
+    def get_state(self):
+        snapshot = super().get_state()
+        snapshot["sim"] = self.sim.get_state()
+        return snapshot
+
+    def set_state(self, snapshot, qvel=None):
+        if qvel is not None:
+            return super(SnapshotMixin, self).set_state(snapshot, qvel)
+
+        super().set_state(snapshot)
+        self.sim.set_state(snapshot["sim"])
+        self.sim.forward()
+
+
+class BulletSnapshotMixin(SnapshotMixin):
+    """
+    SnapshotMixin for envs that own a bullet client in self._p, snapshots hold a saveState() id along with
+    snapshot_attrs. The saved state lives in the physics server's memory until release_state is called, so call it
+    when you're done with a snapshot if you take one every step. Snapshots don't survive a resetSimulation.
+    """
+
+    snapshot_attrs = ("cur_step",)
+
+    def get_state(self):
+        snapshot = super().get_state()
+        snapshot["bullet"] = self._p.saveState()
+        return snapshot
+
+    def set_state(self, snapshot):
+        super().set_state(snapshot)
+        self._p.restoreState(stateId=snapshot["bullet"])
+
+    def release_state(self, snapshot):
+        self._p.removeState(snapshot["bullet"])
@@ -0,0 +1,208 @@
+import multiprocessing
+import traceback
+import numpy as np
+import gym
+
+# one byte commands on the pipes, the data itself goes through shared memory so nothing gets pickled per step
+_STEP = b"s"
+_RESET = b"r"
+_CLOSE = b"c"
+_SEED = b"d"
+_OK = b"k"
+_ERROR = b"e"
+
+
+def _shared_array(ctx, shape, dtype):
+    dtype = np.dtype(dtype)
+    raw = ctx.RawArray("b", max(int(np.prod(shape)) * dtype.itemsize, 1))
+    return raw, shape, dtype
+
+
+def _as_array(shared):
+    raw, shape, dtype = shared
+    return np.frombuffer(raw, dtype=dtype, count=int(np.prod(shape))).reshape(shape)
+
+
+def _make_env(env_id, env_config):
+    if callable(env_id):
+        return env_id(**env_config)
+
+    import seagul.envs
+    return seagul.envs.make(env_id, **env_config)
+
+
+def _worker(idx, pipe, env_id, env_config, obs, terminal_obs, act, rew, done):
+    obs, terminal_obs, act, rew, done = [_as_array(a) for a in (obs, terminal_obs, act, rew, done)]
+    env = None
+
+    try:
+        env = _make_env(env_id, env_config)
+        pipe.send_bytes(_OK)
+
+        while True:
+            cmd = pipe.recv_bytes()
+            if cmd == _STEP:
+                o, r, d, _ = env.step(act[idx])
+                terminal_obs[idx] = o
+                if d:
+                    o = env.reset()
+                obs[idx] = o
+                rew[idx] = r
+                done[idx] = d
+            elif cmd == _RESET:
+                obs[idx] = env.reset()
+            elif cmd[:1] == _SEED:
+                env.seed(int(cmd[1:]))
+            elif cmd == _CLOSE:
+                break
+
+            pipe.send_bytes(_OK)
+
+    except (KeyboardInterrupt, EOFError):
+        pass  # the master went away or is shutting us down, nothing to report to
+    except Exception:
+        pipe.send_bytes(_ERROR + traceback.format_exc().encode())
+    finally:
+        if env is not None:
+            env.close()
+        pipe.close()
+
+
+class VecSubprocEnv(gym.Env):
+    """
+    Runs num_envs copies of an env, each in its own process, and steps them all at once. Same interface as the
+    Vec* envs in seagul.envs, so anything that takes one of those (e.g. PPOAgent) takes this too.
+
+    step takes (N, *act_shape) actions and returns (N, *obs_shape) obs, (N,) rewards and (N,) dones. Envs that finish
+    are reset automatically, the obs they finished on are in info["terminal_obs"]. observation_space and
+    action_space describe a single env. The envs' info dicts are dropped.
+
+    Observations, actions, rewards and dones live in shared memory, the pipes only carry one byte commands, so a
+    step costs one round trip per worker and no pickling. step_async/step_wait let you do something useful in the
+    master while the workers step.
+
+    Example:
+        env = VecSubprocEnv("su_cartpole-v0", num_envs=32)
+        obs = env.reset()
+        obs, rew, done, info = env.step(np.zeros((32, 1)))
+        env.close()
+    """
+
+    def __init__(self, env_id, num_envs, env_config=None, context=None):
+        """
+        Args:
+            env_id: registered env id (made with seagul.envs.make) or a picklable function returning an env
+            num_envs: number of envs (and processes)
+            env_config: kwargs for the env
+            context: multiprocessing start method, e.g. "fork" or "spawn", None for the default
+        """
+        if env_config is None:
+            env_config = {}
+
+        self.num_envs = num_envs
+        self.closed = False
+        self.waiting = False
+
+        env = _make_env(env_id, env_config)
+        self.observation_space = env.observation_space
+        self.action_space = env.action_space
+        env.close()
+
+        ctx = multiprocessing.get_context(context)
+        obs_shape = (num_envs, *self.observation_space.shape)
+        shared = [_shared_array(ctx, obs_shape, self.observation_space.dtype),
+                  _shared_array(ctx, obs_shape, self.observation_space.dtype),
+                  _shared_array(ctx, (num_envs, *self.action_space.shape), self.action_space.dtype),
+                  _shared_array(ctx, (num_envs,), np.float64),
+                  _shared_array(ctx, (num_envs,), bool)]
+        self._obs, self._terminal_obs, self._act, self._rew, self._done = [_as_array(a) for a in shared]
+
+        self.pipes = []
+        self.procs = []
+        for i in range(num_envs):
+            pipe, worker_pipe = ctx.Pipe()
+            proc = ctx.Process(target=_worker, args=(i, worker_pipe, env_id, env_config, *shared), daemon=True)
+            proc.start()
+            worker_pipe.close()
+            self.pipes.append(pipe)
+            self.procs.append(proc)
+
+        self._wait()
+
+    def _send(self, cmd):
+        for pipe in self.pipes:
+            pipe.send_bytes(cmd)
+
+    def _wait(self):
+        errors = []
+        for i, pipe in enumerate(self.pipes):
+            msg = pipe.recv_bytes()
+            if msg[:1] == _ERROR:
+                errors.append(f"worker {i}:\n{msg[1:].decode()}")
+
+        # every worker has answered now, close mustn't wait on them again
+        self.waiting = False
+        if errors:
+            self.close()
+            raise RuntimeError("env worker failed\n" + "\n".join(errors))
+
+    def seed(self, seed=None):
+        """
+        Seeds env i with seed + i
+        """
+        if seed is None:
+            seed = np.random.randint(2**31)
+        for i, pipe in enumerate(self.pipes):
+            pipe.send_bytes(_SEED + str(seed + i).encode())
+        self._wait()
+
+    def reset(self):
+        self._send(_RESET)
+        self._wait()
+        return self._obs.copy()
+
+    def step_async(self, actions):
+        """
+        Starts stepping every env with actions, returns right away. Call step_wait for the results.
+        """
+        self._act[:] = np.asarray(actions).reshape(self._act.shape)
+        self._send(_STEP)
+        self.waiting = True
+
+    def step_wait(self):
+        """
+        Waits for the step started by step_async, returns the same thing as step
+        """
+        self._wait()
+        return self._obs.copy(), self._rew.copy(), self._done.copy(), {"terminal_obs": self._terminal_obs.copy()}
+
+    def step(self, actions):
+        self.step_async(actions)
+        return self.step_wait()
+
+    def render(self, mode=None):
+        raise NotImplementedError('Frame by frame rendering not supported')
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+
+        for pipe, proc in zip(self.pipes, self.procs):
+            if proc.is_alive():
+                try:
+                    if self.waiting:
+                        pipe.recv_bytes()
+                    pipe.send_bytes(_CLOSE)
+                except (BrokenPipeError, EOFError):
+                    pass  # that worker is already gone
+
+        for pipe, proc in zip(self.pipes, self.procs):
+            proc.join(timeout=5)
+            if proc.is_alive():
+                proc.terminate()
+            pipe.close()
+
+    def __del__(self):
+        if not getattr(self, "closed", True):
+            self.close()
@@ -1,2 +1,10 @@
-from seagul.envs.wrappers.pybullet_physics import PyBulletPhysicsWrapper
-from seagul.envs.wrappers.time_wrappers import TimeFeatureWrapper
\ No newline at end of file
+# Modules are only imported when one of their wrappers is asked for, see seagul.envs.lazy
+from seagul.envs.lazy import lazy_exports
+
+_exports = {
+    "PyBulletPhysicsWrapper": "pybullet_physics",
+    "TimeFeatureWrapper": "time_wrappers",
+}
+
+__all__ = list(_exports)
+__getattr__, __dir__ = lazy_exports(__name__, _exports)
@@ -1,24 +1,112 @@
 import gym
 import numpy as np
-import pybullet as p
+import pybullet
+
+
+def _changed(new, applied):
+    """
+    The entries of new that aren't already in applied with the same value
+    """
+    return {k: v for k, v in new.items() if k not in applied or applied[k] != v}
 
 
 class PyBulletPhysicsWrapper(gym.Wrapper):
     """
     Wraps a pybulletgym environment, allowing us to change the physical and dynamical params on init/reset
+
+    Params are applied through the wrapped env's own bullet client (env.unwrapped._p) so they only touch that env's
+    physics server, envs that talk to the global pybullet connection fall back to the pybullet module.
+
+    physics_params are applied on every reset, it's one call and pybullet_envs sets the engine parameters back to
+    its own values every episode. For the per link dynamics the wrapper remembers what it already pushed to the
+    physics server and on every reset only sends the values that changed, so with fixed dynamics_params every reset
+    after the first skips the changeDynamics loop. dynamics_ranges adds domain randomization, every reset draws
+    each param uniformly from its (low, high) range (one rng call for all of them) and applies the draw to every
+    link of every body, together with dynamics_params.
+
+    Example:
+        env = PyBulletPhysicsWrapper(env, physics_params={"numSolverIterations": 20},
+                                     dynamics_ranges={"lateralFriction": (.5, 1.5), "restitution": (0, .2)})
     """
-    def __init__(self, env, physics_params, dynamics_params):
-        self.physics_params = physics_params
-        self.dynamics_params = dynamics_params
+    def __init__(self, env, physics_params=None, dynamics_params=None, dynamics_ranges=None, seed=None):
+        """
+        Args:
+            env: env to wrap
+            physics_params: kwargs for setPhysicsEngineParameter
+            dynamics_params: kwargs for changeDynamics, applied to every link of every body
+            dynamics_ranges: dict of changeDynamics kwarg -> (low, high), resampled every reset
+            seed: seed for the dynamics_ranges samples
+        """
+        self.physics_params = physics_params if physics_params is not None else {}
+        self.dynamics_params = dynamics_params if dynamics_params is not None else {}
+        self.dynamics_ranges = dynamics_ranges if dynamics_ranges is not None else {}
+
+        self._range_names = list(self.dynamics_ranges)
+        self._range_low = np.array([self.dynamics_ranges[k][0] for k in self._range_names], dtype=np.float64)
+        self._range_high = np.array([self.dynamics_ranges[k][1] for k in self._range_names], dtype=np.float64)
+        self.rng = np.random.default_rng(seed)
+
+        self.cur_dynamics = {}
+        self.invalidate()
         super().__init__(env)
 
-    def reset(self):
-        obs = super().reset()
-        p.setPhysicsEngineParameter(**self.physics_params)
+    @property
+    def _p(self):
+        # pybullet_envs only creates the client on the first reset, so look it up every time
+        return getattr(self.env.unwrapped, "_p", None) or pybullet
+
+    def invalidate(self):
+        """
+        Forget what has been applied, so the next reset pushes every param again. Call this if the wrapped env
+        rebuilds its world (resetSimulation) without changing how many bodies it has.
+        """
+        self._client = None
+        self._num_bodies = -1
+        self._links = ()
+        self._applied_dynamics = {}
+
+    def seed(self, seed=None):
+        self.rng = np.random.default_rng(seed)
+        return self.env.seed(seed)
+
+    def sample_dynamics(self):
+        """
+        Draws one set of dynamics params from dynamics_ranges
+
+        Returns:
+            dict of changeDynamics kwarg -> float, empty if there are no ranges
+        """
+        values = self.rng.uniform(self._range_low, self._range_high)
+        return dict(zip(self._range_names, values.tolist()))
+
+    def _update_links(self, client):
+        # a new client or a different number of bodies means the cache describes some other world
+        num_bodies = client.getNumBodies()
+        if client is not self._client or num_bodies != self._num_bodies:
+            self.invalidate()
+            self._client = client
+            self._num_bodies = num_bodies
+            links = []
+            for i in range(num_bodies):
+                body = client.getBodyUniqueId(i)
+                links += [(body, link) for link in range(-1, client.getNumJoints(body))]
+            self._links = tuple(links)
+
+    def reset(self, **kwargs):
+        obs = super().reset(**kwargs)
+        client = self._p
+        self._update_links(client)
+
+        # not cached, the env's reset (World.clean_everything in pybullet_envs) sets these back to its own values
+        if self.physics_params:
+            client.setPhysicsEngineParameter(**self.physics_params)
 
-        for body in range(p.getNumBodies()):
-            p.changeDynamics(body, -1, **self.dynamics_params)
-            for joint in range(p.getNumJoints(body)):
-                p.changeDynamics(body, joint)
+        # every link always gets the same values, so one record of what was applied covers all of them
+        self.cur_dynamics = {**self.dynamics_params, **self.sample_dynamics()}
+        dynamics = _changed(self.cur_dynamics, self._applied_dynamics)
+        if dynamics:
+            for body, link in self._links:
+                client.changeDynamics(body, link, **dynamics)
+            self._applied_dynamics.update(dynamics)
 
         return obs
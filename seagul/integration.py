@@ -63,3 +63,290 @@ def euler(derivs, a, t0, dt, s0):
     Single step of an euler integtation, exactly the same parameters and usage as rk4 above
     """
     return s0 + dt * derivs(t0 + dt, s0, a)
+
+
+def _as_batch(a, s0):
+    """
+    Reshapes states to (N, state_dim) and actions to (N, act_dim), broadcasting a shared action across the batch
+    """
+    s0 = np.atleast_2d(s0)
+    a = np.asarray(a, dtype=s0.dtype)
+    if a.ndim < 2:
+        a = np.broadcast_to(a.reshape(1, -1), (s0.shape[0], a.size)) if a.size != s0.shape[0] else a.reshape(-1, 1)
+    return a, s0
+
+
+def _as_col(dt):
+    """
+    Turns a per env (N,) array of timesteps into a column so it broadcasts against (N, state_dim), scalars pass through
+    """
+    dt = np.asarray(dt)
+    return dt.reshape(-1, 1) if dt.ndim else dt
+
+
+def batch_rk4(derivs, a, t0, dt, s0):
+    """
+    Single step of an RK4 solver for a whole batch of systems at once. Same idea as rk4 above, but instead of
+    calling rk4 in a loop for every env you hand us all the states stacked together and we do one vectorized update
+
+    Attributes:
+        derivs: the function you are trying to integrate, must operate on batches and have signature:
+        function(t,S,A) -> dS/dt, where S is (N, state_dim), A is (N, act_dim) and dS/dt is (N, state_dim)
+
+        a: actions, (N, act_dim). A single action of shape (act_dim,) is shared by every env, and an (N,) array is
+        treated as N one dimensional actions (pass (N, act_dim) if you want to be unambiguous)
+
+        t0: float or (N,) array, initial time
+
+        dt: float or (N,) array, how big of a timestep to integrate, per env if you pass an array
+
+        s0: initial states, (N, state_dim)
+
+    Returns:
+        S[n+1]: (N, state_dim) the state of every system after integrating with actions a for dt seconds
+
+    Example:
+        derivs = lambda t,Q,A: (Q+A)**2
+        A = np.ones((100,1))
+        S0 = np.ones((100,1))*5
+        S1 = batch_rk4(derivs, A, 0, .1, S0)
+
+    """
+    a, s0 = _as_batch(a, s0)
+    h = _as_col(dt)
+    t0 = np.asarray(t0)
+    dt = np.asarray(dt)
+
+    k1 = h * derivs(t0, s0, a)
+    k2 = h * derivs(t0 + dt / 2, s0 + k1 / 2, a)
+    k3 = h * derivs(t0 + dt / 2, s0 + k2 / 2, a)
+    k4 = h * derivs(t0 + dt, s0 + k3, a)
+
+    return s0 + 1 / 6 * (k1 + 2 * k2 + 2 * k3 + k4)
+
+
+def batch_euler(derivs, a, t0, dt, s0):
+    """
+    Single step of an euler integration for a batch of systems, exactly the same parameters and usage as batch_rk4 above
+    """
+    a, s0 = _as_batch(a, s0)
+    return s0 + _as_col(dt) * derivs(np.asarray(t0) + np.asarray(dt), s0, a)
+
+
+# Butcher tableau for the Dormand-Prince 5(4) pair, the same one used by ode45 and scipy's RK45
+_DP_C = np.array([0, 1 / 5, 3 / 10, 4 / 5, 8 / 9, 1])
+_DP_A = [
+    [],
+    [1 / 5],
+    [3 / 40, 9 / 40],
+    [44 / 45, -56 / 15, 32 / 9],
+    [19372 / 6561, -25360 / 2187, 64448 / 6561, -212 / 729],
+    [9017 / 3168, -355 / 33, 46732 / 5247, 49 / 176, -5103 / 18656],
+]
+_DP_B = np.array([35 / 384, 0, 500 / 1113, 125 / 192, -2187 / 6784, 11 / 84])
+# Difference between the 5th and 4th order weights, last entry multiplies the FSAL stage
+_DP_E = np.array([71 / 57600, 0, -71 / 16695, 71 / 1920, -17253 / 339200, 22 / 525, -1 / 40])
+
+
+def _dopri5_step(derivs, a, t, h, s, f0):
+    """
+    One Dormand-Prince step of size h, returns the 5th order solution, the error estimate, and derivs at the new point
+    """
+    k = [f0]
+    for c, row in zip(_DP_C[1:], _DP_A[1:]):
+        ds = sum(w * ki for w, ki in zip(row, k) if w != 0)
+        k.append(derivs(t + c * h, s + h * ds, a))
+
+    s1 = s + h * sum(w * ki for w, ki in zip(_DP_B, k) if w != 0)
+    f1 = derivs(t + h, s1, a)
+    k.append(f1)
+    err = h * sum(w * ki for w, ki in zip(_DP_E, k) if w != 0)
+    return s1, err, f1
+
+
+def _hermite(s0, f0, s1, f1, h, theta):
+    """
+    Cubic hermite interpolant between two accepted steps, theta in [0,1]. Only used to locate event roots
+    """
+    return ((1 - theta) * s0 + theta * s1
+            + theta * (theta - 1) * ((1 - 2 * theta) * (s1 - s0) + (theta - 1) * h * f0 + theta * h * f1))
+
+
+def _crossed(g0, g1, direction):
+    if direction > 0:
+        return g0 < 0 <= g1
+    if direction < 0:
+        return g0 > 0 >= g1
+    return (g0 < 0 <= g1) or (g0 > 0 >= g1)
+
+
+def dopri5_solve(derivs, a, t0, dt, s0, rtol=1e-6, atol=1e-8, h0=None, events=(), max_steps=10000):
+    """
+    Adaptive step Dormand-Prince (RK45) integration over [t0, t0 + dt], with optional event detection.
+    Takes as many internal steps as the error control demands, so you can hand it a much larger dt than
+    you would use with rk4 or euler.
+
+    Attributes:
+        derivs, a, t0, dt, s0: exactly the same as rk4 above (batches work too, the step size is shared). t0 can
+        be an (N,) array of per env times, dt must be a scalar
+
+        rtol, atol: relative and absolute error tolerances
+
+        h0: initial internal step size guess, defaults to dt. Pass back the h returned by the previous call to
+        avoid re-discovering the step size every control step
+
+        events: sequence of functions g(t,s,a) -> float. Integration stops at the first zero crossing of any of
+        them. Set a "direction" attribute on the function (like scipy) to only trigger on rising (+1) or falling (-1)
+        crossings
+
+        max_steps: maximum number of accepted + rejected internal steps before we give up
+
+    Returns:
+        s: state at the end of the interval, or at the event if one triggered
+        t: time corresponding to s
+        event: index into events of the event that stopped integration, None if we made it to t0 + dt
+        h: step size the controller would like to take next
+
+    Example:
+        derivs = lambda t,q,a: np.array([q[1], -9.8])
+        hit_ground = lambda t,q,a: q[0]
+        hit_ground.direction = -1
+        s, t, event, h = dopri5_solve(derivs, 0.0, 0, 10, np.array([1.0, 0.0]), events=[hit_ground])
+    """
+    # time elapsed since t0, shared by the whole batch so that t0 itself can be an array
+    tau = 0.0
+    s = np.asarray(s0, dtype=np.float64)
+    h = dt if h0 is None else h0
+
+    f = derivs(t0, s, a)
+    g = [ev(t0, s, a) for ev in events]
+
+    for _ in range(max_steps):
+        if tau >= dt:
+            break
+
+        t = t0 + tau
+        h_step = min(h, dt - tau)
+        s1, err, f1 = _dopri5_step(derivs, a, t, h_step, s, f)
+
+        scale = atol + rtol * np.maximum(np.abs(s), np.abs(s1))
+        err_norm = np.sqrt(np.mean((err / scale) ** 2))
+
+        if err_norm <= 1:
+            factor = 5.0 if err_norm == 0 else min(5.0, 0.9 * err_norm ** -0.2)
+        else:
+            h = h_step * max(0.2, 0.9 * err_norm ** -0.2)
+            continue
+
+        g1 = [ev(t + h_step, s1, a) for ev in events]
+        hits = [i for i, ev in enumerate(events) if _crossed(g[i], g1[i], getattr(ev, "direction", 0))]
+        if hits:
+            # Bisect on the interpolant for the earliest crossing, then take one exact step to the event
+            first, lo_best = None, 1.0
+            for i in hits:
+                lo, hi = 0.0, 1.0
+                direction = getattr(events[i], "direction", 0)
+                for _ in range(60):
+                    mid = (lo + hi) / 2
+                    g_mid = events[i](t + mid * h_step, _hermite(s, f, s1, f1, h_step, mid), a)
+                    if _crossed(g[i], g_mid, direction):
+                        hi = mid
+                    else:
+                        lo = mid
+                if hi <= lo_best:
+                    first, lo_best = i, hi
+
+            h_event = lo_best * h_step
+            s_event = _dopri5_step(derivs, a, t, h_event, s, f)[0] if h_event > 0 else s
+            return s_event, t + h_event, first, h
+
+        tau, s, f, g = tau + h_step, s1, f1, g1
+        if h_step < h:
+            # this step was cut short to land on t0 + dt, don't let that shrink the step we hand back
+            h = max(h, h_step * factor)
+        else:
+            h = h_step * factor
+
+    if tau < dt:
+        raise RuntimeError("dopri5 exceeded max_steps=%d without reaching t0 + dt" % max_steps)
+
+    return s, t0 + tau, None, h
+
+
+def dopri5(derivs, a, t0, dt, s0, **kwargs):
+    """
+    Adaptive step Dormand-Prince (RK45) integration over dt, drop in replacement for rk4 and euler above.
+    Any keyword arguments (rtol, atol, events etc.) are passed to dopri5_solve, so to change the tolerances for an
+    env you can do something like integrator=functools.partial(dopri5, rtol=1e-4)
+
+    If an event triggers the state at the event is returned, use dopri5_solve directly if you need to know which one
+    """
+    return dopri5_solve(derivs, a, t0, dt, s0, **kwargs)[0]
+
+
+def integrate_hold(derivs, a, t0, dt, s0, n_sub, out=None, integrator=rk4):
+    """
+    Holds action a for n_sub integration steps, writing every intermediate state into out. This is what the envs use
+    to implement act_hold, and lets them keep one trajectory buffer around instead of building a new one every step.
+
+    Attributes:
+        derivs, a, t0, dt, s0: exactly the same as rk4 above, t0 is advanced by dt every substep
+
+        n_sub: how many substeps to take
+
+        out: optional (n_sub, *s0.shape) array to write the trajectory into, allocated for you if None. It is
+        overwritten in place, so copy it if you are keeping it around across calls
+
+        integrator: any of the single step integrators in this module
+
+    Returns:
+        out: (n_sub, *s0.shape) array, out[i] is the state after i+1 substeps, so out[-1] is the final state
+
+    Example:
+        buf = np.empty((10, 4))
+        for _ in range(100):
+            integrate_hold(env._dynamics, a, 0, .01, s, 10, out=buf)
+            s = buf[-1].copy()
+    """
+    s0 = np.asarray(s0)
+    if out is None:
+        out = np.empty((n_sub,) + s0.shape, dtype=np.result_type(s0, np.float64))
+    elif out.shape != (n_sub,) + s0.shape:
+        raise ValueError("out has shape %s, expected %s" % (out.shape, (n_sub,) + s0.shape))
+
+    s = s0
+    for i in range(n_sub):
+        s = integrator(derivs, a, t0 + i * dt, dt, s)
+        out[i] = s
+
+    return out
+
+
+def symplectic_euler(derivs, a, t0, dt, s0):
+    """
+    Single step of semi-implicit (symplectic) euler, same parameters and usage as rk4 above, but only for mechanical
+    systems where the state is [positions, velocities] and derivs returns [velocities, accelerations], which is the
+    convention all the classic_control envs use. Updates the velocities first and then moves the positions with the
+    new velocities, which keeps the energy bounded instead of letting it drift like explicit euler does.
+
+    Works on single states and (N, state_dim) batches, the split is always along the last axis.
+    """
+    n = s0.shape[-1] // 2
+    v1 = s0[..., n:] + dt * derivs(t0, s0, a)[..., n:]
+    q1 = s0[..., :n] + dt * v1
+    return np.concatenate((q1, v1), axis=-1)
+
+
+def verlet(derivs, a, t0, dt, s0):
+    """
+    Single step of velocity verlet (kick-drift-kick), same usage and state convention as symplectic_euler above.
+    Second order and symplectic for conservative systems. Velocity dependent forces (coriolis terms, damping) get
+    evaluated at the half step velocity, so it is no longer exactly symplectic for those, but still much better
+    behaved than explicit euler. Costs two derivs evaluations per step.
+    """
+    n = s0.shape[-1] // 2
+    v_half = s0[..., n:] + dt / 2 * derivs(t0, s0, a)[..., n:]
+    q1 = s0[..., :n] + dt * v_half
+    s_half = np.concatenate((q1, v_half), axis=-1)
+    v1 = v_half + dt / 2 * derivs(t0 + dt, s_half, a)[..., n:]
+    return np.concatenate((q1, v1), axis=-1)
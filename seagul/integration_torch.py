@@ -0,0 +1,152 @@
+"""
+Torch versions of the fixed step integrators in seagul.integration, plus batched torch versions of some of the
+dynamics from seagul.envs. Everything here operates on (N, state_dim) tensors and keeps autograd intact, so you can
+roll out thousands of systems (and a policy) inside one graph and backprop through the whole thing.
+"""
+
+import torch
+
+
+def _as_col(x, like):
+    """
+    Turns a scalar or (N,) time/timestep into something that broadcasts against (N, state_dim)
+    """
+    x = torch.as_tensor(x, dtype=like.dtype, device=like.device)
+    return x.unsqueeze(-1) if x.dim() else x
+
+
+def rk4(derivs, a, t0, dt, s0):
+    """
+    Single step of an RK4 solver on torch tensors, same usage as seagul.integration.rk4 / batch_rk4
+
+    Attributes:
+        derivs: function(t,S,A) -> dS/dt operating on batches, S is (N, state_dim) and A is (N, act_dim)
+        a: (N, act_dim) tensor of actions
+        t0: float or (N,) tensor, initial time
+        dt: float or (N,) tensor, how big of a timestep to integrate
+        s0: (N, state_dim) tensor of initial states
+
+    Returns:
+        S[n+1]: (N, state_dim) tensor, differentiable w.r.t. s0, a, and anything derivs closes over
+
+    Example:
+        derivs = lambda t,Q,A: -Q + A
+        A = torch.ones(1000,1, requires_grad=True)
+        S1 = rk4(derivs, A, 0, .1, torch.zeros(1000,1))
+        S1.sum().backward()
+    """
+    h = _as_col(dt, s0)
+    t0 = torch.as_tensor(t0, dtype=s0.dtype, device=s0.device)
+    dt = torch.as_tensor(dt, dtype=s0.dtype, device=s0.device)
+
+    k1 = h * derivs(t0, s0, a)
+    k2 = h * derivs(t0 + dt / 2, s0 + k1 / 2, a)
+    k3 = h * derivs(t0 + dt / 2, s0 + k2 / 2, a)
+    k4 = h * derivs(t0 + dt, s0 + k3, a)
+
+    return s0 + 1 / 6 * (k1 + 2 * k2 + 2 * k3 + k4)
+
+
+def euler(derivs, a, t0, dt, s0):
+    """
+    Single step of an euler integration on torch tensors, exactly the same parameters and usage as rk4 above
+    """
+    t1 = torch.as_tensor(t0, dtype=s0.dtype, device=s0.device) + torch.as_tensor(dt, dtype=s0.dtype, device=s0.device)
+    return s0 + _as_col(dt, s0) * derivs(t1, s0, a)
+
+
+def rollout(derivs, policy, s0, num_steps, dt, act_hold=1, integrator=rk4):
+    """
+    Rolls out a batch of systems under a policy, entirely in torch so gradients flow from the trajectory back into
+    the policy parameters and the initial states.
+
+    Attributes:
+        derivs: batched dynamics, see rk4 above
+        policy: callable mapping (N, state_dim) states to (N, act_dim) actions, e.g. a seagul.nn.MLP
+        s0: (N, state_dim) tensor of initial states
+        num_steps: how many policy evaluations to make
+        dt: integration timestep
+        act_hold: how many integration steps to hold each action for
+        integrator: rk4 or euler from this module
+
+    Returns:
+        states: (num_steps + 1, N, state_dim) tensor, states[0] is s0
+        actions: (num_steps, N, act_dim) tensor
+
+    Example:
+        policy = MLP(4, 1, 2, 32)
+        states, acts = rollout(su_cartpole_derivs, policy, torch.zeros(1000, 4), 200, .005)
+        loss = torch.cos(states[..., 0]).mean()
+        loss.backward()
+    """
+    states = [s0]
+    actions = []
+    s = s0
+    t = 0.0
+    for _ in range(num_steps):
+        a = policy(s)
+        for _ in range(act_hold):
+            s = integrator(derivs, a, t, dt, s)
+            t += dt
+        states.append(s)
+        actions.append(a)
+
+    return torch.stack(states), torch.stack(actions)
+
+
+def su_cartpole_derivs(t, q, u, L=1.0, mc=4.0, mp=1.0, g=9.8):
+    """
+    Batched torch version of seagul.envs.classic_control.SUCartPoleEnv._derivs, defaults match that env.
+    q is (N,4) [theta, x, thetadot, xdot], u is (N,1) force on the cart
+    """
+    th, thd = q[:, 0], q[:, 2]
+    u = u[:, 0]
+    s, c = torch.sin(th), torch.cos(th)
+    delta = mp * s ** 2 + mc
+
+    thdd = -mp * thd ** 2 * s * c / delta - (mp + mc) * g * s / delta / L - u * c / delta / L
+    xdd = mp * L * thd ** 2 * s / delta + mp * L * g * s * c / delta / L + u / delta
+
+    return torch.stack((thd, q[:, 3], thdd, xdd), dim=-1)
+
+
+def acrobot_derivs(t, q, u, m1=1.0, m2=1.0, l1=1.0, lc1=.5, lc2=.5, i1=.2, i2=.8, g=9.8):
+    """
+    Batched torch version of seagul.envs.classic_control.SGAcroEnv._dynamics, defaults match that env.
+    q is (N,4) [th1, th2, th1dot, th2dot], u is (N,1) torque at the elbow. The 2x2 mass matrix is inverted in closed form
+    """
+    th1, th2, th1d, th2d = q[:, 0], q[:, 1], q[:, 2], q[:, 3]
+    tau = u[:, 0]
+    s2, c2 = torch.sin(th2), torch.cos(th2)
+
+    m11 = m1 * lc1 ** 2 + m2 * (l1 ** 2 + lc2 ** 2 + 2 * l1 * lc2 * c2) + i1 + i2
+    m22 = m2 * lc2 ** 2 + i2
+    m12 = m2 * (lc2 ** 2 + l1 * lc2 * c2) + i2
+
+    h1 = -m2 * l1 * lc2 * s2 * th2d ** 2 - 2 * m2 * l1 * lc2 * s2 * th2d * th1d
+    h2 = m2 * l1 * lc2 * s2 * th1d ** 2
+
+    phi2 = m2 * lc2 * g * torch.cos(th1 + th2)
+    phi1 = (m1 * lc1 + m2 * l1) * g * torch.cos(th1) + phi2
+
+    r1 = -h1 - phi1
+    r2 = tau - h2 - phi2
+    det = m11 * m22 - m12 ** 2
+
+    th1dd = (m22 * r1 - m12 * r2) / det
+    th2dd = (m11 * r2 - m12 * r1) / det
+
+    return torch.stack((th1d, th2d, th1dd, th2dd), dim=-1)
+
+
+def lorenz_derivs(t, q, u, s=10.0, b=8 / 3, r=28.0):
+    """
+    Batched torch version of seagul.envs.simple_nonlinear.generic.lorenz_dynamics.
+    q is (N,3) [x, y, z], u is (N,3)
+    """
+    x, y, z = q[:, 0], q[:, 1], q[:, 2]
+    xdot = s * (y - x) - u[:, 0]
+    ydot = r * x - y - x * z - u[:, 1]
+    zdot = x * y - b * z - u[:, 2]
+
+    return torch.stack((xdot, ydot, zdot), dim=-1)
@@ -1,3 +1,11 @@
 #from seagul.rl.ars.ars_pipe import ars
 from seagul.rl.ars.ars_np import ARSAgent, ARSModel
-from seagul.rl.ars.ars_torch import ARSTorchAgent, ARSTorchModel
+
+
+def __getattr__(name):
+    # ars_torch pulls in torch, which the numpy ARSAgent (and all of its workers) shouldn't have to pay for
+    if name in ("ARSTorchAgent", "ARSTorchModel"):
+        from seagul.rl.ars import ars_torch
+        return getattr(ars_torch, name)
+
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,10 +1,13 @@
 import gym
-from multiprocessing import Process,Queue
+import seagul.envs
 import copy
 from numpy.random import default_rng
 import numpy as np
 import time
 from seagul.rl.common import make_schedule
+from seagul.rl import rollout
+from seagul.rl.ars.shared_noise import SharedArray, get_noise_table
+from seagul.rl.ars.pool import WorkerPool
 
 
 def update_mean(data, cur_mean, cur_steps):
@@ -24,50 +27,43 @@ def update_std(data, cur_std, cur_steps):
         return np.sqrt((new_var * new_steps + cur_var * cur_steps) / (cur_steps + new_steps))
 
 
-def worker_fn(worker_q, master_q, env_name, env_config, postprocess, seed):
-    env = gym.make(env_name, **env_config)
+def worker_fn(worker_q, master_q, env_name, env_config, postprocess, seed, noise, params):
+    env = seagul.envs.make(env_name, **env_config)
     env.seed(int(seed))
+    buffers = rollout.RolloutBuffers.from_env(env)
+    W, state_mean, state_std = [p.array for p in params]
     while True:
         data = master_q.get()
         if data == "STOP":
             env.close()
             return
         else:
-            W,state_mean,state_std = data
-            policy = ARSModel(W, state_mean, state_std)
-            states, returns, log_returns = do_rollout_train(env, policy, postprocess)
+            # the master only sends where our delta is in the noise table, the policy itself is in shared memory
+            offset, sign, exp_noise = data
+            Ws = W + sign*exp_noise*noise.get(offset, W.size).reshape(W.shape)
+            policy = ARSModel(Ws, state_mean, state_std)
+            states, returns, log_returns = do_rollout_train(env, policy, postprocess, buffers)
             worker_q.put((states, returns, log_returns))
 
 
-def do_rollout_train(env, policy, postprocess):
-    state_list = []
-    act_list = []
-    reward_list = []
-
-#    print("reseting")
-    obs = env.reset()
-#    print("reset")
-    
-    done = False
-    while not done:
-        state_list.append(np.copy(obs))
+def do_rollout_train(env, policy, postprocess, buffers=None):
+    if buffers is None:
+        buffers = rollout.RolloutBuffers.from_env(env)
 
+    def select_action(obs):
         actions,_,_,_ = policy.step(obs)
- #       print("stepping")
-        obs, reward, done, _ = env.step(actions)
- #       print("step")
-
-        act_list.append(np.array(actions))
-        reward_list.append(reward-1)
+        return actions, actions
 
+    ep_length = rollout.do_rollout(env, select_action, buffers)
 
-    state_arr = np.stack(state_list)
-    act_arr = np.stack(act_list)
-    preprocess_sum = np.array(sum(reward_list))
+    state_arr = buffers.obs[:ep_length].copy()  # goes back to the master through a queue, the buffers get reused
+    act_arr = buffers.act[:ep_length]
+    reward_arr = buffers.rew[:ep_length, 0] - 1
+    preprocess_sum = np.array(reward_arr.sum())
 
     state_arr_n = (state_arr - policy.state_mean)/policy.state_std
-    reward_list = postprocess(state_arr_n, act_arr, np.array(reward_list))
-    reward_sum = (np.sum(reward_list).item())
+    reward_arr = postprocess(state_arr_n, act_arr, reward_arr)
+    reward_sum = (np.sum(reward_arr).item())
 
     return state_arr, reward_sum, preprocess_sum
 
@@ -94,6 +90,8 @@ class ARSAgent:
     """
     This is a version of Augmented Random Search (https://arxiv.org/pdf/1803.07055) that uses pure numpy and the built in python multiprocessing. I have found it simpler and more efficient than the version found in ars_torch, due to the way torch handles passing tensors between processes. The limitation is that only pure linear policies are supported, use seagul/ars/rl/ars_torch for a version which accepts any pytorch policy.
 
+    The workers are started on the first call to learn and reused by every call after that, call close() when you're done with the agent. They are started with env_name, env_config, postprocessor, seed and n_workers as they are at that point, close() and learn again to pick up changes to those.
+
     Args:
         env_name: name of the openAI gym env to solve
         seed: the random seed to use
@@ -107,11 +105,12 @@ class ARSAgent:
         postprocessor: reward post processor to use, default is none.
         step_schedule: an iterable of two step sizes to linearly interpolate between as training goes on, overrides step_size
         exp_schedule:  an iterable of two exp noises to linearly interpolate between as training goes on, overrides step_size
+        noise_size: number of entries in the shared noise table the deltas are taken from
             
     """
     def __init__(self, env_name, seed, env_config=None, n_workers=24, n_delta=32, n_top=32,
                  step_size=.02, exp_noise=0.03, reward_stop=None, postprocessor=postprocess_default,
-                 step_schedule=None, exp_schedule=None
+                 step_schedule=None, exp_schedule=None, noise_size=10_000_000
                  ):
         self.env_name = env_name
         self.n_workers = n_workers
@@ -130,20 +129,20 @@ class ARSAgent:
 
         self.step_schedule = step_schedule
         self.exp_schedule = exp_schedule
+        self.noise_size = noise_size
+        self.pool = None
+        self._shared = None
 
         if env_config is None:
             env_config = {}
         self.env_config = env_config
 
 
-        if env_name == "bball3-v1":
-            obs_size = 10
-            act_size = 3
-        elif env_name == "bball_1dof-v0":
+        if env_name == "bball_1dof-v0":
             obs_size = 10
             act_size = 5
         else:
-            env = gym.make(self.env_name, **self.env_config)
+            env = seagul.envs.make(self.env_name, **self.env_config)
             obs_size = env.observation_space.shape[0]
             act_size = env.action_space.shape[0]
 
@@ -153,10 +152,34 @@ class ARSAgent:
 
         #        env.close()
 
+    def __getstate__(self):
+        # worker processes and shared memory don't copy or pickle, copies start their own workers when they learn
+        return {**self.__dict__, "pool": None, "_shared": None}
+
+    def _start_pool(self):
+        noise = get_noise_table(self.noise_size)
+        params = (SharedArray(self.W.shape), SharedArray(self.state_mean.shape), SharedArray(self.state_std.shape))
+        self._shared = (noise, params)
+        self.pool = WorkerPool(worker_fn, (self.env_name, self.env_config, self.postprocessor, self.seed, noise, params), self.n_workers)
+
+    def give_pool(self, agent):
+        """
+        Hands this agent's running workers to agent (which must have the same env and W shape), e.g. to a copy of
+        this agent so the copy doesn't have to start its own. This agent starts new workers if it learns again.
+        """
+        agent.close()
+        agent.pool, agent._shared = self.pool, self._shared
+        self.pool, self._shared = None, None
+
+    def close(self):
+        """
+        Stops the workers, learn will start new ones if it's called again
+        """
+        if self.pool is not None:
+            self.pool.close()
+        self.pool, self._shared = None, None
+
     def learn(self, n_epochs, verbose=True):
-        proc_list = []
-        master_q_list = []
-        worker_q_list = []
         learn_start_idx = copy.copy(self.total_epochs)
 
         if self.step_schedule:
@@ -165,16 +188,12 @@ class ARSAgent:
         if self.exp_schedule:
             exp_lookup = make_schedule(self.exp_schedule, n_epochs)
 
-        for i in range(self.n_workers):
-            master_q = Queue()
-            worker_q = Queue()
-            proc = Process(target=worker_fn, args=(worker_q, master_q, self.env_name, self.env_config, self.postprocessor, self.seed))
-            proc.start()
-            proc_list.append(proc)
-            master_q_list.append(master_q)
-            worker_q_list.append(worker_q)
+        if self.pool is None or self.pool.closed:
+            self._start_pool()
 
         n_param = self.W.shape[0]*self.W.shape[1]
+        noise, params = self._shared
+        shared_W, shared_mean, shared_std = [p.array for p in params]
 
         rng = default_rng()         
 
@@ -190,18 +209,16 @@ class ARSAgent:
                     break
             
             W_flat = self.W.flatten()
-            deltas = rng.standard_normal((self.n_delta, n_param))
-            #import ipdb; ipdb.set_trace()
-            pm_W = np.concatenate((W_flat+(deltas*self.exp_noise), W_flat-(deltas*self.exp_noise)))
+            shared_W[:] = self.W
+            shared_mean[:] = self.state_mean
+            shared_std[:] = self.state_std
+
+            offsets = noise.sample_offsets(rng, self.n_delta, n_param)
+            pm_jobs = [(offset, 1, self.exp_noise) for offset in offsets] + [(offset, -1, self.exp_noise) for offset in offsets]
 
             start = time.time()
 
-            for i,Ws in enumerate(pm_W):
-                master_q_list[i % self.n_workers].put((Ws.reshape(self.W.shape[0], self.W.shape[1]) ,self.state_mean,self.state_std))
-                
-            results = []
-            for i, _ in enumerate(pm_W):
-                results.append(worker_q_list[i % self.n_workers].get())
+            results = self.pool.map(pm_jobs)
 
             end = time.time()
             t = (end - start)
@@ -240,16 +257,11 @@ class ARSAgent:
             self.total_steps += ep_steps
             self.total_epochs += 1
 
-            W_flat = W_flat + (self.step_size / (self.n_delta * np.concatenate((p_returns, m_returns)).std() + 1e-6)) * np.sum((p_returns - m_returns)*deltas[top_idx].T, axis=1)
+            deltas = noise.get_many(offsets[top_idx], n_param)
+            W_flat = W_flat + (self.step_size / (self.n_delta * np.concatenate((p_returns, m_returns)).std() + 1e-6)) * np.sum((p_returns - m_returns)*deltas.T, axis=1)
             #import ipdb; ipdb.set_trace()
             self.W = W_flat.reshape(self.W.shape[0], self.W.shape[1])
 
-
-        for q in master_q_list:
-            q.put("STOP")
-        for proc in proc_list:
-            proc.join()
-
         self.model = ARSModel(self.W, self.state_mean, self.state_std)
         return self.model, self.raw_rew_hist[learn_start_idx:], locals()
 
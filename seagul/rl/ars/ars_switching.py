@@ -1,12 +1,15 @@
 import gym
-from torch.multiprocessing import Process,Queue
+import seagul.envs
+import torch.multiprocessing
 import copy
 from numpy.random import default_rng
 import numpy as np
 import torch
 import time
 from seagul.rl.common import make_schedule
+from seagul.rl import rollout
 from seagul.nn import fit_model
+from seagul.rl.ars.pool import WorkerPool
 
 
 def update_mean(data, cur_mean, cur_steps):
@@ -28,8 +31,9 @@ def update_std(data, cur_std, cur_steps):
 
 def worker_fn(worker_q, master_q, model, env_name, env_config, postprocess, seed):
     torch.set_grad_enabled(False)
-    env = gym.make(env_name, **env_config)
+    env = seagul.envs.make(env_name, **env_config)
     env.seed(seed)
+    buffers = rollout.RolloutBuffers.from_env(env, act_shape=(1, *env.action_space.shape))
     while True:
         data = master_q.get()
         if data == "STOP":
@@ -41,34 +45,29 @@ def worker_fn(worker_q, master_q, model, env_name, env_config, postprocess, seed
             torch.nn.utils.vector_to_parameters(torch.tensor(W_flat,requires_grad=False), model.policy.parameters())
             model.policy.state_means = torch.from_numpy(state_mean)
             model.policy.state_std = torch.from_numpy(state_std)
-            states, returns, log_returns = do_rollout_train(env, model, postprocess)
+            states, returns, log_returns = do_rollout_train(env, model, postprocess, buffers)
             worker_q.put((states, returns, log_returns))
 
 
-def do_rollout_train(env, model, postprocess):
-    state_list = []
-    act_list = []
-    reward_list = []
-
-    obs = env.reset()
-    done = False
-    while not done:
-        state_list.append(np.copy(obs))
+def do_rollout_train(env, model, postprocess, buffers=None):
+    if buffers is None:
+        buffers = rollout.RolloutBuffers.from_env(env, act_shape=(1, *env.action_space.shape))
 
+    def select_action(obs):
         actions,_,_,_ = model.step(obs.reshape(1,-1))
         actions = actions.detach().numpy()
-        obs, reward, done, _ = env.step(actions)
+        return actions, actions
 
-        act_list.append(np.array(actions))
-        reward_list.append(reward)
+    ep_length = rollout.do_rollout(env, select_action, buffers)
 
-    state_arr = np.stack(state_list)
-    act_arr = np.stack(act_list)
-    preprocess_sum = np.array(sum(reward_list))
+    state_arr = buffers.obs[:ep_length].copy()  # goes back to the master through a queue, the buffers get reused
+    act_arr = buffers.act[:ep_length]
+    reward_arr = buffers.rew[:ep_length, 0]
+    preprocess_sum = np.array(reward_arr.sum())
 
     state_arr_n = (state_arr - np.asarray(model.policy.state_means))/np.asarray(model.policy.state_std)
-    reward_list = postprocess(state_arr_n, act_arr, np.array(reward_list))
-    reward_sum = (np.sum(reward_list).item())
+    reward_arr = postprocess(state_arr_n, act_arr, reward_arr)
+    reward_sum = (np.sum(reward_arr).item())
 
     return state_arr, reward_sum, preprocess_sum
 
@@ -110,6 +109,8 @@ class ARSSwitchingAgent:
         postprocessor: reward post processor to use, default is none.
         step_schedule: an iterable of two step sizes to linearly interpolate between as training goes on, overrides step_size
         exp_schedule:  an iterable of two exp noises to linearly interpolate between as training goes on, overrides step_size
+
+    The workers are started on the first call to learn and reused by every call after that, call close() when you're done with the agent.
             
     """
     def __init__(self, env_name, model_list, classifier, seed=None, env_config=None, n_workers=8, n_delta=16, n_top=16,
@@ -133,12 +134,13 @@ class ARSSwitchingAgent:
 
         self.step_schedule = step_schedule
         self.exp_schedule = exp_schedule
+        self.pool = None
 
         if env_config is None:
             env_config = {}
         self.env_config = env_config
 
-        env = gym.make(self.env_name, **self.env_config)
+        env = seagul.envs.make(self.env_name, **self.env_config)
         self.obs_size = env.observation_space.shape[0]
         self.act_size = env.action_space.shape[0]
 
@@ -152,10 +154,19 @@ class ARSSwitchingAgent:
         self.state_mean_list = [np.zeros(self.obs_size) for _ in range(len(model_list))]
         self.state_std_list = [np.ones(self.obs_size) for _ in range(len(model_list))]
 
+    def __getstate__(self):
+        # worker processes don't copy or pickle, copies start their own workers when they learn
+        return {**self.__dict__, "pool": None}
+
+    def close(self):
+        """
+        Stops the workers, learn will start new ones if it's called again
+        """
+        if self.pool is not None:
+            self.pool.close()
+        self.pool = None
+
     def learn(self, n_epochs, verbose=True):
-        proc_list = []
-        master_q_list = []
-        worker_q_list = []
         learn_start_idx = copy.copy(self.total_epochs)
 
         if self.step_schedule:
@@ -164,14 +175,9 @@ class ARSSwitchingAgent:
         if self.exp_schedule:
             exp_lookup = make_schedule(self.exp_schedule, n_epochs)
 
-        for i in range(self.n_workers):
-            master_q = Queue()
-            worker_q = Queue()
-            proc = Process(target=worker_fn, args=(worker_q, master_q, self.model_list[0], self.env_name, self.env_config, self.postprocessor, self.seed))
-            proc.start()
-            proc_list.append(proc)
-            master_q_list.append(master_q)
-            worker_q_list.append(worker_q)
+        if self.pool is None or self.pool.closed:
+            self.pool = WorkerPool(worker_fn, (self.model_list[0], self.env_name, self.env_config, self.postprocessor, self.seed),
+                                   self.n_workers, mp=torch.multiprocessing)
 
         n_param = self.W_flat_list[0].shape[0]
 
@@ -205,12 +211,8 @@ class ARSSwitchingAgent:
 
                     start = time.time()
 
-                    for i, Ws in enumerate(W_plus_delta):
-                        master_q_list[i % self.n_workers].put((Ws ,self.state_mean_list[model_i], self.state_std_list[model_i], seeds[i]))
-
-                    results = []
-                    for i, _ in enumerate(W_plus_delta):
-                        results.append(worker_q_list[i % self.n_workers].get())
+                    results = self.pool.map([(Ws, self.state_mean_list[model_i], self.state_std_list[model_i], seeds[i])
+                                             for i, Ws in enumerate(W_plus_delta)])
 
                     end = time.time()
                     t = (end - start)
@@ -303,11 +305,6 @@ class ARSSwitchingAgent:
 
                 self.total_epochs += 1
 
-        for q in master_q_list:
-            q.put("STOP")
-        for proc in proc_list:
-            proc.join()
-
         #print(f" model 0 state dict before: {self.model_list[0].policy.state_dict()}")
         for i, _ in enumerate(self.model_list):
             print(f" model {i} w_flat: {self.W_flat_list[i]}")
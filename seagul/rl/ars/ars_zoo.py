@@ -1,5 +1,5 @@
 import gym
-from torch.multiprocessing import Process,Queue
+import torch.multiprocessing
 import copy
 from numpy.random import default_rng
 import numpy as np
@@ -8,86 +8,71 @@ import time
 import os
 from seagul.mesh import mesh_dim, dict_to_array
 from seagul.rl.common import make_schedule
+from seagul.rl import rollout
+from seagul.rl.ars.shared_noise import SharedArray, get_noise_table
+from seagul.rl.ars.pool import WorkerPool
 from seagul.zoo3_utils import load_zoo_agent, OFF_POLICY_ALGOS, SOFT_ALGOS
 import stable_baselines3
 import collections
 
 
 
-def worker_fn(worker_q, master_q, algo, env_id, postprocess, get_trainable, seed):
+def worker_fn(worker_q, master_q, algo, env_id, postprocess, get_trainable, seed, noise, params):
     torch.set_grad_enabled(False)
     env, model = load_zoo_agent(env_id, algo)
+    buffers = rollout.RolloutBuffers.from_env(env)
+    W_flat = params.array
     
     if seed:
         env.seed(seed)
     
     while True:
         data = master_q.get()
-        W_flat, done, ep_seed = data
+        offset, sign, exp_noise, ep_seed, done = data
         if done == True:
             env.close()
             return
         else:
-            torch.nn.utils.vector_to_parameters(torch.tensor(W_flat,requires_grad=False), get_trainable(model))
+            # the master only sends where our delta is in the noise table, the policy itself is in shared memory
+            Ws = W_flat + sign*exp_noise*noise.get(offset, W_flat.size)
+            torch.nn.utils.vector_to_parameters(torch.from_numpy(Ws), get_trainable(model))
             if ep_seed:
                 env.seed(ep_seed)
-            states, returns, log_returns = do_rollout_train(env, model, postprocess)
+            states, returns, log_returns = do_rollout_train(env, model, postprocess, buffers)
             worker_q.put((returns, log_returns))
 
 
-def do_rollout_train(env, model, postprocess):
-    import time
-
-    predict_time = 0
-    step_time = 0
-    before_loop = time.time()
-    
-    state_list = []
-    act_list = []
-    mean_list = []
-    reward_list = []
-
-    obs = env.reset()
-    done = False
-
-    while not done:
-        state_list.append(np.copy(obs))
-
-        before_predict = time.time()
+def do_rollout_train(env, model, postprocess, buffers=None):
+    if buffers is None:
+        buffers = rollout.RolloutBuffers.from_env(env)
 
+    def select_action(obs):
+        obs = obs[None]  # zoo envs are VecEnvs with a single env
         if type(model.policy) == stable_baselines3.common.policies.ActorCriticCnnPolicy:
             tobs, venv = model.policy.obs_to_tensor(obs)
             latent_pi, b, latent_sde = model.policy._get_latent(tobs)
             means = model.policy.action_net(latent_pi)
             distribution = model.policy._get_action_dist_from_latent(latent_pi, latent_sde)
             actions = distribution.get_actions(deterministic=True).detach().cpu().numpy()
+            means = means.detach().cpu().numpy()
         else:
             actions,_= model.predict(obs, deterministic=True)
             means = actions
-            
-        predict_time += (time.time() - before_predict)
 
-        before_step = time.time()
-        obs, reward, done, _ = env.step(actions)
-        step_time += (time.time() - before_step)
-        
-        act_list.append(np.copy(actions))
-        mean_list.append(means.detach().cpu().numpy())
-        reward_list.append(reward)
+        # the means are what postprocess gets as the actions
+        return means, actions
 
+    ep_length = rollout.do_rollout(env, select_action, buffers)
 
-    state_arr = np.stack(state_list).squeeze()
-    act_arr = np.stack(act_list).squeeze()
-    mean_arr = np.stack(mean_list).squeeze()
-    preprocess_sum = np.array(sum(reward_list))
+    state_arr = buffers.obs[:ep_length].squeeze()
+    mean_arr = buffers.act[:ep_length].squeeze()
+    reward_arr = buffers.rew[:ep_length, 0]
+    preprocess_sum = np.array(reward_arr.sum())
 
     state_arr_n = state_arr
 
-    reward_list = postprocess(state_arr_n, mean_arr, np.array(reward_list))
-    reward_sum = (np.sum(reward_list).item())
-    total_time = time.time() - before_loop
-    
-    #print(f"{len(reward_list)}: predict_time:{predict_time}------step_time:{step_time}-----unacount_time{total_time - predict_time - step_time}")
+    reward_arr = postprocess(state_arr_n, mean_arr, reward_arr)
+    reward_sum = (np.sum(reward_arr).item())
 
     return state_arr, reward_sum, preprocess_sum
 
@@ -121,6 +106,8 @@ class ARSZooAgent:
     """
     This is a version of Augmented Random Search (https://arxiv.org/pdf/1803.07055) that uses arbitary pytorch polices. If you just want a linear policy see seagul/ars//ars_np for a version which uses pure numpy but is limited to linear policies. 
 
+    The workers are started on the first call to learn and reused by every call after that, call close() when you're done with the agent. They load the zoo agent once, when they start.
+
     Args:
         env_name: name of the openAI gym env to solve
         seed: the random seed to use
@@ -134,11 +121,12 @@ class ARSZooAgent:
         postprocessor: reward post processor to use, default is none.
         step_schedule: an iterable of two step sizes to linearly interpolate between as training goes on, overrides step_size
         exp_schedule:  an iterable of two exp noises to linearly interpolate between as training goes on, overrides step_size
+        noise_size: number of entries in the shared noise table the deltas are taken from
             
     """
     def __init__(self, env_name, algo, seed=None, env_config=None, n_workers=24, n_delta=32, n_top=None,
                  step_size=.02, exp_noise=0.03, reward_stop=None, postprocessor=postprocess_default,
-                 step_schedule=None, exp_schedule=None, epoch_seed=False, train_all=False
+                 step_schedule=None, exp_schedule=None, epoch_seed=False, train_all=False, noise_size=10_000_000
                  ):
         self.env_name = env_name
         self.algo = algo
@@ -156,6 +144,9 @@ class ARSZooAgent:
 
         self.step_schedule = step_schedule
         self.exp_schedule = exp_schedule
+        self.noise_size = noise_size
+        self.pool = None
+        self._shared = None
 
         if n_top is None:
             n_top = n_delta
@@ -203,12 +194,27 @@ class ARSZooAgent:
 
         env.close()
 
+    def __getstate__(self):
+        # worker processes and shared memory don't copy or pickle, copies start their own workers when they learn
+        return {**self.__dict__, "pool": None, "_shared": None}
+
+    def _start_pool(self):
+        noise = get_noise_table(self.noise_size)
+        params = SharedArray(self.W_flat.shape, self.W_flat.dtype)
+        self._shared = (noise, params)
+        self.pool = WorkerPool(worker_fn, (self.algo, self.env_name, self.postprocessor, self.get_trainable, self.seed, noise, params),
+                               self.n_workers, stop_msg=(None, None, None, None, True), mp=torch.multiprocessing)
+
+    def close(self):
+        """
+        Stops the workers, learn will start new ones if it's called again
+        """
+        if self.pool is not None:
+            self.pool.close()
+        self.pool, self._shared = None, None
         
     def learn(self, n_epochs, verbose=True):
         torch.set_grad_enabled(False)
-        proc_list = []
-        master_q_list = []
-        worker_q_list = []
         learn_start_idx = copy.copy(self.total_epochs)
 
         if self.step_schedule:
@@ -217,17 +223,11 @@ class ARSZooAgent:
         if self.exp_schedule:
             exp_lookup = make_schedule(self.exp_schedule, n_epochs)
 
-        for i in range(self.n_workers):
-            master_q = Queue()
-            worker_q = Queue()
-
-            proc = Process(target=worker_fn, args=(worker_q, master_q, self.algo, self.env_name, self.postprocessor, self.get_trainable, self.seed))
-            proc.start()
-            proc_list.append(proc)
-            master_q_list.append(master_q)
-            worker_q_list.append(worker_q)
+        if self.pool is None or self.pool.closed:
+            self._start_pool()
 
         n_param = self.W_flat.shape[0]
+        noise, params = self._shared
 
         rng = default_rng()         
 
@@ -242,14 +242,16 @@ class ARSZooAgent:
                     early_stop = True
                     break
             
-            deltas = rng.standard_normal((self.n_delta, n_param), dtype=np.float32)
-            #import ipdb; ipdb.set_trace()
-            pm_W = np.concatenate((self.W_flat+(deltas*self.exp_noise), self.W_flat-(deltas*self.exp_noise)))
+            params.array[:] = self.W_flat
+            offsets = noise.sample_offsets(rng, self.n_delta, n_param)
+            pm_offsets = np.concatenate((offsets, offsets))
+            pm_signs = [1]*self.n_delta + [-1]*self.n_delta
 
             start = time.time()
             seeds = np.random.randint(1,2**32-1,self.n_delta)
 
-            for i,Ws in enumerate(pm_W):
+            pm_jobs = []
+            for i, (offset, sign) in enumerate(zip(pm_offsets, pm_signs)):
                 # if self.epoch_seed:
                 #     epoch_seed = i%self.n_delta
                 # else:
@@ -258,11 +260,9 @@ class ARSZooAgent:
                 epoch_seed = int(seeds[i%self.n_delta])
                 #epoch_seed = None
                     
-                master_q_list[i % self.n_workers].put((Ws, False, epoch_seed))
+                pm_jobs.append((offset, sign, self.exp_noise, epoch_seed, False))
                 
-            results = []
-            for i, _ in enumerate(pm_W):
-                results.append(worker_q_list[i % self.n_workers].get())
+            results = self.pool.map(pm_jobs)
 
             end = time.time()
             t = (end - start)
@@ -311,14 +311,8 @@ class ARSZooAgent:
                     
 
             self.total_epochs += 1
-            self.W_flat = self.W_flat + (self.step_size / (self.n_delta * np.concatenate((p_returns, m_returns)).std() + 1e-6)) * np.sum((p_returns - m_returns)*deltas[top_idx].T, axis=1)
-
-        for q in master_q_list:
-            q.put((None, True, None))
-
-        for proc in proc_list:
-            proc.join()
-
+            deltas = noise.get_many(offsets[top_idx], n_param)
+            self.W_flat = self.W_flat + (self.step_size / (self.n_delta * np.concatenate((p_returns, m_returns)).std() + 1e-6)) * np.sum((p_returns - m_returns)*deltas.T, axis=1)
         torch.nn.utils.vector_to_parameters(torch.tensor(self.W_flat, requires_grad=False), self.get_trainable(self.model))
 
         torch.set_grad_enabled(True)
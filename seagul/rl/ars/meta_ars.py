@@ -30,6 +30,8 @@ class MetaARSAgent:
             top_agents = sorted_agents[:self.n_top_agents]
             import copy
             self.agents = copy.deepcopy(top_agents)
+            for new_agent, old_agent in zip(self.agents, top_agents):
+                old_agent.give_pool(new_agent)
             bad_agents = sorted_agents[self.n_top_agents:]
 
             num_agents_to_copy = len(bad_agents)//len(top_agents)
@@ -46,6 +48,17 @@ class MetaARSAgent:
 
             self.ml_hist.append(top_agents[0].raw_rew_hist[-1])
 
+            for agent in bad_agents:
+                agent.close()
+
+    def close(self):
+        """
+        Stops the workers of every agent
+        """
+        for agent in self.agents:
+            agent.close()
+
 if __name__ == "__main__":
     meta_agent = MetaARSAgent("Hopper-v2", n_agents=10, kwargs={"step_size": .05, "exp_noise": .05})
     meta_agent.learn(5)
+    meta_agent.close()
@@ -0,0 +1,77 @@
+import multiprocessing
+
+
+class WorkerPool:
+    """
+    n_workers processes each running worker_fn(worker_q, master_q, *args), started once and kept alive until close(),
+    so the ARS agents can reuse the same workers (and the envs they made) across learn calls.
+
+    Jobs are handed out round robin and results come back in the same order, a worker_fn gets jobs from master_q
+    and puts one result per job in worker_q until it gets stop_msg.
+
+    Example:
+        pool = WorkerPool(worker_fn, (env_name, env_config), n_workers=8)
+        results = pool.map(jobs)
+        pool.close()
+    """
+
+    def __init__(self, worker_fn, args, n_workers, stop_msg="STOP", mp=multiprocessing):
+        """
+        Args:
+            worker_fn: function run by every worker, see above
+            args: extra args for worker_fn
+            n_workers: number of processes
+            stop_msg: message that tells worker_fn to clean up and return
+            mp: multiprocessing module to use, pass torch.multiprocessing for workers that get torch models
+        """
+        self.n_workers = n_workers
+        self.stop_msg = stop_msg
+        self.closed = False
+        self.master_qs = []
+        self.worker_qs = []
+        self.procs = []
+
+        for i in range(n_workers):
+            master_q = mp.Queue()
+            worker_q = mp.Queue()
+            proc = mp.Process(target=worker_fn, args=(worker_q, master_q, *args), daemon=True)
+            proc.start()
+            self.procs.append(proc)
+            self.master_qs.append(master_q)
+            self.worker_qs.append(worker_q)
+
+    def map(self, jobs):
+        """
+        Runs every job and returns the results, in the same order as jobs
+        """
+        try:
+            for i, job in enumerate(jobs):
+                self.master_qs[i % self.n_workers].put(job)
+            return [self.worker_qs[i % self.n_workers].get() for i in range(len(jobs))]
+        except BaseException:
+            # the workers are now out of sync with us (half a batch of results still queued), don't reuse them
+            self.terminate()
+            raise
+
+    def close(self):
+        """
+        Stops the workers and waits for them to exit
+        """
+        if self.closed:
+            return
+        self.closed = True
+
+        for q in self.master_qs:
+            q.put(self.stop_msg)
+        for proc in self.procs:
+            proc.join()
+
+    def terminate(self):
+        """
+        Kills the workers without waiting for them to finish what they're doing
+        """
+        self.closed = True
+        for proc in self.procs:
+            proc.terminate()
+        for proc in self.procs:
+            proc.join()
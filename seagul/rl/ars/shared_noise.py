@@ -0,0 +1,88 @@
+import multiprocessing
+import numpy as np
+from numpy.random import default_rng
+
+# (size, seed, dtype) -> SharedNoiseTable, every agent in the process uses the same table
+_tables = {}
+
+
+class SharedArray:
+    """
+    numpy array in shared memory. Pass it to a Process when starting it and both sides see the same data, the
+    array itself never gets pickled.
+    """
+
+    def __init__(self, shape, dtype=np.float64):
+        self.shape = tuple(shape)
+        self.dtype = np.dtype(dtype)
+        self._raw = multiprocessing.RawArray("b", max(int(np.prod(self.shape)) * self.dtype.itemsize, 1))
+        self.array = self._view()
+
+    def _view(self):
+        return np.frombuffer(self._raw, dtype=self.dtype, count=int(np.prod(self.shape))).reshape(self.shape)
+
+    def __getstate__(self):
+        return {"shape": self.shape, "dtype": self.dtype, "_raw": self._raw}
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.array = self._view()
+
+
+class SharedNoiseTable(SharedArray):
+    """
+    Big block of gaussian noise in shared memory, as in the ARS paper (https://arxiv.org/pdf/1803.07055). A delta
+    is a slice of the table, so the master only has to tell a worker where its delta starts instead of sending the
+    perturbed parameters.
+
+    Example:
+        offsets = table.sample_offsets(rng, n_delta, n_param)
+        W_plus = W + exp_noise*table.get(offsets[0], n_param)   # in a worker
+        deltas = table.get_many(offsets, n_param)              # in the master
+    """
+
+    def __init__(self, size=10_000_000, seed=0, dtype=np.float32):
+        """
+        Args:
+            size: number of entries, must be at least the number of parameters being perturbed
+            seed: seed the noise is drawn with
+            dtype: dtype of the noise
+        """
+        super().__init__((size,), dtype)
+        self.size = size
+        self.seed = seed
+        default_rng(seed).standard_normal(size, dtype=self.dtype, out=self.array)
+
+    def __getstate__(self):
+        return {**super().__getstate__(), "size": self.size, "seed": self.seed}
+
+    def get(self, offset, dim):
+        """
+        The delta starting at offset, a read only view into the table
+        """
+        return self.array[offset:offset + dim]
+
+    def get_many(self, offsets, dim):
+        """
+        (len(offsets), dim) array of the deltas starting at offsets
+        """
+        return self.array[np.asarray(offsets)[:, None] + np.arange(dim)]
+
+    def sample_offsets(self, rng, n, dim):
+        """
+        n random offsets of deltas of size dim, drawn with the numpy Generator rng
+        """
+        if dim > self.size:
+            raise ValueError(f"noise table has {self.size} entries, can't take deltas of size {dim}")
+        return rng.integers(0, self.size - dim + 1, n)
+
+
+def get_noise_table(size=10_000_000, seed=0, dtype=np.float32):
+    """
+    SharedNoiseTable for (size, seed, dtype), only made once per process so agents can share it
+    """
+    key = (size, seed, np.dtype(dtype).str)
+    if key not in _tables:
+        _tables[key] = SharedNoiseTable(size, seed, dtype)
+        _tables[key].array.flags.writeable = False
+    return _tables[key]
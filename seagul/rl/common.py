@@ -1,13 +1,9 @@
 
 import numpy as np
 
-try:
-    import torch
-    from torch.distributions import Normal, Categorical
-except:
-    import warnings
-    
-    warnings.warn("Importing torch failed, only numpy algos will be available")
+# torch is only imported inside the functions that need it, the numpy algos (ARS) import make_schedule etc. from here
+# and shouldn't pay for torch in the master and every worker. The running stats and discounting work on numpy arrays
+# without touching torch, torch tensors go through torch like they always have.
 
 
 class ReplayBuffer:
@@ -16,6 +12,8 @@ class ReplayBuffer:
     """
 
     def __init__(self, obs_dim, act_dim, max_size):
+        import torch
+
         self.obs1_buf = torch.zeros([max_size, obs_dim], dtype=torch.float32)
         self.obs2_buf = torch.zeros([max_size, obs_dim], dtype=torch.float32)
         self.acts_buf = torch.zeros([max_size, act_dim], dtype=torch.float32)
@@ -66,10 +64,18 @@ class ReplayBuffer:
 
 def update_mean(data, cur_mean, cur_steps):
     new_steps = data.shape[0]
+    if isinstance(data, np.ndarray):
+        return (np.mean(data, 0) * new_steps + cur_mean * cur_steps) / (cur_steps + new_steps)
+
+    import torch
     return (torch.mean(data, 0) * new_steps + cur_mean * cur_steps) / (cur_steps + new_steps)
 
 
 def update_std(data, cur_std, cur_steps):
+    if isinstance(data, np.ndarray):
+        return _update_std_np(data, cur_std, cur_steps)
+
+    import torch
     new_steps = data.shape[0]
     batch_var = torch.var(data, 0)
 
@@ -82,8 +88,31 @@ def update_std(data, cur_std, cur_steps):
         return torch.sqrt((new_var * new_steps + cur_var * cur_steps) / (cur_steps + new_steps))
 
 
+def _update_std_np(data, cur_std, cur_steps):
+    # Same as the torch version, including the unbiased std (so a single sample gives nan and is skipped)
+    new_steps = data.shape[0]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        batch_var = np.var(data, 0, ddof=1)
+
+    if np.isnan(batch_var).any():
+        return cur_std
+    else:
+        cur_var = np.asarray(cur_std, dtype=np.float64) ** 2
+        new_var = batch_var.copy()
+        new_var[new_var < 1e-6] = cur_var[new_var < 1e-6]
+        return np.sqrt((new_var * new_steps + cur_var * cur_steps) / (cur_steps + new_steps))
+
+
 # can make this faster I think?
 def discount_cumsum(rewards, discount):
+    if isinstance(rewards, np.ndarray):
+        cumulative_rewards = np.empty_like(rewards, dtype=np.result_type(rewards, np.float64))
+        future_cumulative_reward = 0
+        for i in range(len(rewards) - 1, -1, -1):
+            cumulative_rewards[i] = future_cumulative_reward = rewards[i] + discount * future_cumulative_reward
+        return cumulative_rewards
+
+    import torch
     future_cumulative_reward = 0
     cumulative_rewards = torch.empty_like(torch.as_tensor(rewards))
     for i in range(len(rewards) - 1, -1, -1):
@@ -102,6 +131,7 @@ class RandModel:
         self.act_size = act_size
 
     def select_action(self, state, noise):
+        import torch
         return (torch.rand(self.act_size) * 2 * self.act_limit - self.act_limit, 1 / (self.act_limit * 2))
 
 
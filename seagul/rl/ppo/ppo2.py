@@ -2,8 +2,10 @@ import numpy as np
 import torch
 import tqdm.auto as tqdm
 import gym
+import seagul.envs
 import copy
 from seagul.rl.common import update_mean, update_std, make_schedule, discount_cumsum
+from seagul.rl import rollout
 
 
 class PPOAgent:
@@ -34,11 +36,14 @@ class PPOAgent:
                  normalize_return=True,
                  normalize_obs=True,
                  normalize_adv=True,
-                 env_config=None):
+                 env_config=None,
+                 num_envs=None):
 
         """
                   Args:
                       env_name: name of the openAI gym environment to solve
+                          can also be a vector env like su_cartpole_vec-v0, then every step runs all its envs with
+                          one batched forward pass (pass num_envs in env_config)
                       model: model from seagul.rl.ppo.models Contains policy and value fn
                       epoch_batch_size: number of environment steps to take per batch
                       gamma: discount applied to future rewards, usually close to 1
@@ -59,6 +64,8 @@ class PPOAgent:
                       normalize_obs: normalize obs before sending to the model?
                       normalize_adv: normalize advantage after each batch?
                       env_config: dictionary containing kwargs to pass to the environment
+                      num_envs: if not None, run this many copies of env_name in their own processes
+                          (seagul.envs.vec_subproc.VecSubprocEnv) and collect from all of them at once
            """
 
         self.env_name = env_name
@@ -85,10 +92,11 @@ class PPOAgent:
         if env_config is None:
             env_config = {}
         self.env_config = env_config
+        self.num_envs = num_envs
         self.old_model = copy.deepcopy(self.model)
 
         torch.set_num_threads(1)
-        env = gym.make(self.env_name, **self.env_config)
+        env = seagul.envs.make(self.env_name, **self.env_config)
         if isinstance(env.action_space, gym.spaces.Box):
             self.act_size = env.action_space.shape[0]
             self.act_dtype = torch.double
@@ -133,13 +141,32 @@ class PPOAgent:
         # init everything
         # ==============================================================================
         # seed all our RNGs
-        env = gym.make(self.env_name, **self.env_config)
+        if self.num_envs is None:
+            env = seagul.envs.make(self.env_name, **self.env_config)
+        else:
+            from seagul.envs.vec_subproc import VecSubprocEnv
+            env = VecSubprocEnv(self.env_name, self.num_envs, self.env_config)
+
+        # vector envs (anything with num_envs that resets itself, like the Vec* envs in seagul.envs) are stepped
+        # all at once, every epoch is a fixed number of steps of every env, see collect_vec
+        num_envs = getattr(env, "num_envs", None)
+        if num_envs is None:
+            buffers = rollout.RolloutBuffers.from_env(env, backend="torch", dtype=self.model.policy.dtype)
+        else:
+            buffers = rollout.RolloutBuffers.from_env(env, horizon=-(-self.epoch_batch_size // num_envs),
+                                                      backend="torch", dtype=self.model.policy.dtype,
+                                                      num_envs=num_envs)
 
         cur_total_steps = 0
         env.seed(self.seed)
         torch.manual_seed(self.seed)
         np.random.seed(self.seed)
 
+        if num_envs is not None:
+            obs = env.reset()
+            ep_ret = np.zeros(num_envs)
+            ep_len = np.zeros(num_envs, dtype=np.int64)
+
         progress_bar = tqdm.tqdm(total=total_steps)
         lr_lookup = make_schedule(self.lr_schedule, total_steps)
 
@@ -167,38 +194,44 @@ class PPOAgent:
 
             # construct batch data from rollouts
             # ==============================================================================
-            while cur_batch_steps < self.epoch_batch_size:
-                ep_obs, ep_act, ep_rew, ep_steps, ep_term = do_rollout(env, self.model, self.env_no_term_steps)
+            if num_envs is None:
+                while cur_batch_steps < self.epoch_batch_size:
+                    ep_obs, ep_act, ep_rew, ep_steps, ep_term = do_rollout(env, self.model, self.env_no_term_steps, buffers)
 
-                cur_batch_steps += ep_steps
-                cur_total_steps += ep_steps
+                    cur_batch_steps += ep_steps
+                    cur_total_steps += ep_steps
 
-                #print(sum(ep_rew).item())
-                self.raw_rew_hist.append(sum(ep_rew).item())
-                #print("Rew:", sum(ep_rew).item())
-                batch_obs = torch.cat((batch_obs, ep_obs.clone()))
-                batch_act = torch.cat((batch_act, ep_act.clone()))
+                    #print(sum(ep_rew).item())
+                    self.raw_rew_hist.append(sum(ep_rew).item())
+                    #print("Rew:", sum(ep_rew).item())
+                    batch_obs = torch.cat((batch_obs, ep_obs.clone()))
+                    batch_act = torch.cat((batch_act, ep_act.clone()))
 
-                if self.normalize_return:
-                    self.rew_std = update_std(ep_rew, self.rew_std, cur_total_steps)
-                    ep_rew = ep_rew / (self.rew_std + 1e-6)
+                    if self.normalize_return:
+                        self.rew_std = update_std(ep_rew, self.rew_std, cur_total_steps)
+                        ep_rew = ep_rew / (self.rew_std + 1e-6)
 
-                if ep_term:
-                    ep_rew = torch.cat((ep_rew, torch.zeros(1, 1)))
-                else:
-                    ep_rew = torch.cat((ep_rew, self.model.value_fn(ep_obs[-1]).detach().reshape(1, 1).clone()))
+                    if ep_term:
+                        ep_rew = torch.cat((ep_rew, torch.zeros(1, 1)))
+                    else:
+                        ep_rew = torch.cat((ep_rew, self.model.value_fn(ep_obs[-1]).detach().reshape(1, 1).clone()))
 
-                ep_discrew = discount_cumsum(ep_rew, self.gamma)[:-1]
-                batch_discrew = torch.cat((batch_discrew, ep_discrew.clone()))
+                    ep_discrew = discount_cumsum(ep_rew, self.gamma)[:-1]
+                    batch_discrew = torch.cat((batch_discrew, ep_discrew.clone()))
 
-                with torch.no_grad():
-                    ep_val = torch.cat((self.model.value_fn(ep_obs), ep_rew[-1].reshape(1, 1).clone()))
-                    deltas = ep_rew[:-1] + self.gamma * ep_val[1:] - ep_val[:-1]
+                    with torch.no_grad():
+                        ep_val = torch.cat((self.model.value_fn(ep_obs), ep_rew[-1].reshape(1, 1).clone()))
+                        deltas = ep_rew[:-1] + self.gamma * ep_val[1:] - ep_val[:-1]
 
-                ep_adv = discount_cumsum(deltas, self.gamma * self.lam)
-                # make sure our advantages are zero mean and unit variance
+                    ep_adv = discount_cumsum(deltas, self.gamma * self.lam)
+                    # make sure our advantages are zero mean and unit variance
 
-                batch_adv = torch.cat((batch_adv, ep_adv.clone()))
+                    batch_adv = torch.cat((batch_adv, ep_adv.clone()))
+            else:
+                cur_batch_steps = buffers.horizon * num_envs
+                cur_total_steps += cur_batch_steps
+                obs, batch_obs, batch_act, batch_adv, batch_discrew = self.collect_vec(env, obs, buffers, ep_ret,
+                                                                                       ep_len, cur_total_steps)
 
             # PostProcess epoch and update weights
             # ==============================================================================
@@ -243,8 +276,84 @@ class PPOAgent:
             progress_bar.update(cur_batch_steps)
 
         progress_bar.close()
+        env.close()
         return self.model, self.raw_rew_hist, locals()
 
+    def collect_vec(self, env, obs, buffers, ep_ret, ep_len, cur_total_steps):
+        """
+        Collects one batch from a vector env, stepping every env buffers.horizon times with one batched policy
+        forward pass per step. Each env is its own stream of episodes, episodes that don't fit in this batch carry
+        on into the next one.
+
+        Same bootstrapping as the single env path, episodes that end before env_no_term_steps are terminal and
+        everything else (time limits and streams cut off by the end of the batch) is bootstrapped with the value
+        function, then advantages are GAE computed per stream.
+
+        Args:
+            env: vector env, step takes (N, act_size) actions and auto resets, putting the obs episodes ended on in
+                info["terminal_obs"]
+            obs: (N, obs_size) obs to start from
+            buffers: RolloutBuffers with num_envs=N
+            ep_ret: (N,) running returns, updated in place
+            ep_len: (N,) running episode lengths, updated in place
+            cur_total_steps: total steps including this batch, for the reward normalization
+
+        Returns:
+            obs to continue from, batch_obs, batch_act, batch_adv, batch_discrew
+        """
+        torch.autograd.set_grad_enabled(False)
+
+        dtype = self.model.policy.dtype
+        n_steps, num_envs = buffers.horizon, buffers.num_envs
+        boot = torch.zeros(n_steps, num_envs, dtype=dtype)  # values of the states time limited episodes ended in
+
+        for t in range(n_steps):
+            buffers.obs[t] = torch.as_tensor(obs, dtype=dtype)
+            act, logprob = self.model.select_action(buffers.obs[t])
+            obs, rew, done, info = env.step(act.numpy())
+
+            buffers.act[t] = act
+            buffers._rew[t] = rew
+            buffers._done[t] = done
+
+            ep_ret += rew
+            ep_len += 1
+            if done.any():
+                self.raw_rew_hist.extend(ep_ret[done].tolist())
+                cut = done & (ep_len >= self.env_no_term_steps)
+                if cut.any():
+                    terminal_obs = torch.as_tensor(info["terminal_obs"][cut], dtype=dtype)
+                    boot[t, torch.as_tensor(cut)] = self.model.value_fn(terminal_obs).reshape(-1)
+                ep_ret[done] = 0
+                ep_len[done] = 0
+
+        rew = buffers.rew
+        if self.normalize_return:
+            self.rew_std = update_std(rew.reshape(-1, 1), self.rew_std, cur_total_steps)
+            rew = rew / (self.rew_std + 1e-6)
+
+        done = buffers.done
+        val = self.model.value_fn(buffers.obs.reshape(n_steps*num_envs, -1)).reshape(n_steps, num_envs)
+        next_val = self.model.value_fn(torch.as_tensor(obs, dtype=dtype)).reshape(num_envs)
+
+        adv = torch.empty_like(rew)
+        discrew = torch.empty_like(rew)
+        next_adv = torch.zeros(num_envs, dtype=rew.dtype)
+        next_discrew = next_val
+        for t in range(n_steps - 1, -1, -1):
+            next_val = torch.where(done[t], boot[t], next_val)
+            next_discrew = torch.where(done[t], boot[t], next_discrew)
+            next_adv = next_adv * ~done[t]
+
+            adv[t] = rew[t] + self.gamma * next_val - val[t] + self.gamma * self.lam * next_adv
+            discrew[t] = rew[t] + self.gamma * next_discrew
+
+            next_val, next_adv, next_discrew = val[t], adv[t], discrew[t]
+
+        torch.autograd.set_grad_enabled(True)
+        return (obs, buffers.obs.reshape(n_steps*num_envs, -1), buffers.act.reshape(n_steps*num_envs, -1),
+                adv.reshape(-1, 1), discrew.reshape(-1, 1))
+
     # Takes list or array and returns a lambda that interpolates it for each epoch
     def policy_update(self, batch_act, batch_obs, batch_adv):
         num_mbatch = int(batch_obs.shape[0] / self.sgd_batch_size)
@@ -315,42 +424,20 @@ class PPOAgent:
             return val_loss
 
 
-def do_rollout(env, model, n_steps_complete):
+def do_rollout(env, model, n_steps_complete, buffers=None):
     torch.autograd.set_grad_enabled(False)
 
-    act_list = []
-    obs_list = []
-    rew_list = []
-
-    dtype = model.policy.dtype
-    obs = env.reset()
-    done = False
-    cur_step = 0
-
-    while not done:
-        obs = torch.as_tensor(obs, dtype=dtype).detach()
-        obs_list.append(obs.clone())
+    if buffers is None:
+        buffers = rollout.RolloutBuffers.from_env(env, backend="torch", dtype=model.policy.dtype)
 
+    def select_action(obs):
         act, logprob = model.select_action(obs)
-        obs, rew, done, _ = env.step(act.numpy())
-
-        act_list.append(torch.as_tensor(act.clone()))
-        rew_list.append(rew)
-
-        cur_step += 1
-
-    if cur_step < n_steps_complete:
-        ep_term = True
-    else:
-        ep_term = False
+        return act, act.numpy()
 
-    ep_length = len(rew_list)
-    ep_obs = torch.stack(obs_list)
-    ep_act = torch.stack(act_list)
-    ep_rew = torch.tensor(rew_list, dtype=dtype)
-    ep_rew = ep_rew.reshape(-1, 1)
+    ep_length = rollout.do_rollout(env, select_action, buffers)
+    ep_term = ep_length < n_steps_complete
 
     torch.autograd.set_grad_enabled(True)
-    return ep_obs, ep_act, ep_rew, ep_length, ep_term
+    return buffers.obs[:ep_length], buffers.act[:ep_length], buffers.rew[:ep_length], ep_length, ep_term
 
 
@@ -3,6 +3,7 @@ import torch
 from torch.utils import data
 import tqdm.auto as tqdm
 import gym
+import seagul.envs
 import pickle
 
 from seagul.rl.common import update_mean, update_std
@@ -85,7 +86,7 @@ def ppo_switch(
     # ==============================================================================
     torch.set_num_threads(1)
 
-    env = gym.make(env_name, **env_config)
+    env = seagul.envs.make(env_name, **env_config)
     if isinstance(env.action_space, gym.spaces.Box):
         act_size = env.action_space.shape[0]
         act_dtype = torch.double
@@ -2,9 +2,11 @@ import numpy as np
 import torch
 import tqdm.auto as tqdm
 import gym
+import seagul.envs
 import pickle
 from seagul.rl.common import update_mean, update_std, make_schedule
 from seagul.rl.common import ReplayBuffer
+from seagul.rl import rollout
 
 
 def ppo_visit(
@@ -86,7 +88,8 @@ def ppo_visit(
     # ==============================================================================
     torch.set_num_threads(1)
 
-    env = gym.make(env_name, **env_config)
+    env = seagul.envs.make(env_name, **env_config)
+    buffers = rollout.RolloutBuffers.from_env(env, backend="torch", dtype=torch.float32)
     if isinstance(env.action_space, gym.spaces.Box):
         act_size = env.action_space.shape[0]
         act_dtype = torch.double
@@ -150,7 +153,7 @@ def ppo_visit(
         # construct batch data from rollouts
         # ==============================================================================
         while cur_batch_steps < epoch_batch_size:
-            ep_obs, ep_act, ep_rew, ep_steps, ep_term = do_rollout(env, model, env_no_term_steps)
+            ep_obs, ep_act, ep_rew, ep_steps, ep_term = do_rollout(env, model, env_no_term_steps, buffers)
 
             raw_rew_hist.append(sum(ep_rew).item())
 
@@ -265,43 +268,21 @@ def ppo_visit(
 # Takes list or array and returns a lambda that interpolates it for each epoch
 
 
-def do_rollout(env, model, n_steps_complete):
+def do_rollout(env, model, n_steps_complete, buffers=None):
     torch.autograd.set_grad_enabled(False)
 
-    act_list = []
-    obs_list = []
-    rew_list = []
-
-    dtype = torch.float32
-    obs = env.reset()
-    done = False
-    cur_step = 0
-
-    while not done:
-        obs = torch.as_tensor(obs, dtype=dtype).detach()
-        obs_list.append(obs.clone())
+    if buffers is None:
+        buffers = rollout.RolloutBuffers.from_env(env, backend="torch", dtype=torch.float32)
 
+    def select_action(obs):
         act, logprob = model.select_action(obs)
-        obs, rew, done, _ = env.step(act.numpy())
-
-        act_list.append(torch.as_tensor(act.clone()))
-        rew_list.append(rew)
-
-        cur_step += 1
-
-    if cur_step < n_steps_complete:
-        ep_term = True
-    else:
-        ep_term = False
+        return act, act.numpy()
 
-    ep_length = len(rew_list)
-    ep_obs = torch.stack(obs_list)
-    ep_act = torch.stack(act_list)
-    ep_rew = torch.tensor(rew_list, dtype=dtype)
-    ep_rew = ep_rew.reshape(-1, 1)
+    ep_length = rollout.do_rollout(env, select_action, buffers)
+    ep_term = ep_length < n_steps_complete
 
     torch.autograd.set_grad_enabled(True)
-    return ep_obs, ep_act, ep_rew, ep_length, ep_term
+    return buffers.obs[:ep_length], buffers.act[:ep_length], buffers.rew[:ep_length], ep_length, ep_term
 
 
 # can make this faster I think?
@@ -3,6 +3,7 @@ import torch
 from torch.utils import data
 import tqdm.auto as tqdm
 import gym
+import seagul.envs
 import pickle
 from seagul.rl.common import ReplayBuffer
 
@@ -88,7 +89,7 @@ def ppo_visit(
     # ==============================================================================
     torch.set_num_threads(1)
 
-    env = gym.make(env_name, **env_config)
+    env = seagul.envs.make(env_name, **env_config)
     if isinstance(env.action_space, gym.spaces.Box):
         act_size = env.action_space.shape[0]
         act_dtype = torch.double
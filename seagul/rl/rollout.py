@@ -0,0 +1,143 @@
+import numpy as np
+
+
+def env_horizon(env, default=1000):
+    """
+    Max episode length of env as registered with gym (the TimeLimit wrapper), default if it doesn't have one
+    """
+    horizon = getattr(env, "_max_episode_steps", None)
+    if horizon is None and getattr(env, "spec", None) is not None:
+        horizon = env.spec.max_episode_steps
+    return horizon or default
+
+
+class RolloutBuffers:
+    """
+    Preallocated storage for one episode, reused for every episode so the rollout loop only writes into rows that
+    already exist instead of appending to python lists and stacking at the end.
+
+    obs, act, rew and done (and next_obs if asked for) have one row per step, rew and done are (horizon, 1) since
+    that's the shape every algorithm in seagul wants them in. With backend="torch" they are tensors that share
+    memory with the numpy arrays do_rollout writes into, so nothing gets converted after the episode either. If an
+    episode runs past horizon the buffers are doubled.
+
+    With num_envs every row holds one step of all the envs in a vector env instead, obs is (horizon, num_envs,
+    *obs_shape) and rew and done are (horizon, num_envs). do_rollout is single env only, vectorized collection
+    writes into the buffers itself.
+
+    Slices of the buffers are only good until the next rollout, copy anything you want to keep past that.
+    """
+
+    def __init__(self, obs_shape, act_shape, horizon=1000, backend="numpy", dtype=np.float64, obs_dtype=None,
+                 next_obs=False, num_envs=None):
+        """
+        Args:
+            obs_shape: shape of one observation
+            act_shape: shape of one action, as it should be stored
+            horizon: number of steps to allocate for, usually the env's max episode length
+            backend: "numpy" or "torch", what type obs/act/rew/done are
+            dtype: dtype for act and rew (and obs if obs_dtype is None), a numpy dtype or a torch dtype to match backend
+            obs_dtype: dtype for obs and next_obs
+            next_obs: also keep the observation after every step, for the off policy algorithms
+            num_envs: number of envs in the vector env being stored, None for a regular env
+        """
+        if backend not in ("numpy", "torch"):
+            raise ValueError(f"backend must be 'numpy' or 'torch', got {backend}")
+
+        self.num_envs = num_envs
+        self.obs_shape = tuple(obs_shape) if num_envs is None else (num_envs, *obs_shape)
+        self.act_shape = tuple(act_shape) if num_envs is None else (num_envs, *act_shape)
+        self.step_shape = (1,) if num_envs is None else (num_envs,)
+        self.backend = backend
+        self.dtype = dtype
+        self.obs_dtype = dtype if obs_dtype is None else obs_dtype
+        self.has_next_obs = next_obs
+        self._alloc(horizon)
+
+    @classmethod
+    def from_env(cls, env, horizon=None, backend="numpy", dtype=np.float64, obs_dtype=None, next_obs=False,
+                 act_shape=None, num_envs=None):
+        """
+        Buffers shaped for env, sized by env_horizon(env) unless horizon is passed. Actions are stored in the shape
+        of the action space unless act_shape is passed (discrete actions as (1,) rows). With the numpy backend obs
+        are stored as whichever of dtype and the observation space dtype is wider, most envs declare float32 spaces
+        but return float64 obs, which we don't want to round.
+        """
+        if obs_dtype is None and backend == "numpy":
+            obs_dtype = np.result_type(env.observation_space.dtype, dtype)
+        if act_shape is None:
+            act_shape = env.action_space.shape or (1,)
+
+        return cls(env.observation_space.shape, act_shape,
+                   horizon=horizon or env_horizon(env), backend=backend, dtype=dtype, obs_dtype=obs_dtype,
+                   next_obs=next_obs, num_envs=num_envs)
+
+    def _zeros(self, shape, dtype):
+        if self.backend == "torch":
+            import torch
+            buf = torch.zeros(shape, dtype=torch.bool if dtype is bool else dtype)
+            return buf, buf.numpy()
+
+        buf = np.zeros(shape, dtype=dtype)
+        return buf, buf
+
+    def _alloc(self, horizon):
+        self.horizon = horizon
+        self.obs, self._obs = self._zeros((horizon, *self.obs_shape), self.obs_dtype)
+        self.act, self._act = self._zeros((horizon, *self.act_shape), self.dtype)
+        self.rew, self._rew = self._zeros((horizon, *self.step_shape), self.dtype)
+        self.done, self._done = self._zeros((horizon, *self.step_shape), bool)
+        if self.has_next_obs:
+            self.next_obs, self._next_obs = self._zeros((horizon, *self.obs_shape), self.obs_dtype)
+
+    def grow(self):
+        """
+        Doubles the horizon, keeping what's already been written
+        """
+        old = [self._obs, self._act, self._rew, self._done] + ([self._next_obs] if self.has_next_obs else [])
+        self._alloc(2 * self.horizon)
+        new = [self._obs, self._act, self._rew, self._done] + ([self._next_obs] if self.has_next_obs else [])
+        for o, n in zip(old, new):
+            n[:len(o)] = o
+
+
+def do_rollout(env, select_action, buffers):
+    """
+    Runs one episode of env, writing it into buffers. This is the rollout loop for every algorithm in seagul, they
+    only differ in select_action and what they do with the buffers afterwards.
+
+    Args:
+        env: gym env to roll out
+        select_action: obs -> (act, env_act), obs is the row of buffers.obs holding the current observation, act
+            is what gets stored in buffers.act and env_act what gets passed to env.step
+        buffers: RolloutBuffers to write the episode into
+
+    Returns:
+        number of steps in the episode, the episode is buffers.obs[:ep_length] etc.
+
+    Example:
+        buffers = RolloutBuffers.from_env(env)
+        ep_length = do_rollout(env, lambda obs: (policy(obs),)*2, buffers)
+        ep_return = buffers.rew[:ep_length].sum()
+    """
+    obs = env.reset()
+    done = False
+    cur_step = 0
+
+    while not done:
+        if cur_step == buffers.horizon:
+            buffers.grow()
+
+        buffers._obs[cur_step] = obs
+        act, env_act = select_action(buffers.obs[cur_step])
+        obs, rew, done, _ = env.step(env_act)
+
+        buffers._act[cur_step] = act
+        buffers._rew[cur_step] = rew
+        buffers._done[cur_step] = done
+        if buffers.has_next_obs:
+            buffers._next_obs[cur_step] = obs
+
+        cur_step += 1
+
+    return cur_step
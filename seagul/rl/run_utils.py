@@ -19,6 +19,7 @@ except:
     warnings.warn("baselines install not found, only seagul loads will work", ImportWarning)
 
 import gym
+import seagul.envs
 import dill
 import subprocess
 import time, datetime, json
@@ -262,7 +263,7 @@ def load_workspace(save_path):
         model = torch.load(infile, pickle_module=dill)
 
     env_name = data["args"]["env_name"]
-    env = gym.make(env_name)
+    env = seagul.envs.make(env_name)
 
     return model, env, data, workspace
 
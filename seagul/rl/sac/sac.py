@@ -3,9 +3,11 @@ import torch
 from torch.utils import data
 import tqdm.auto as tqdm
 import gym
+import seagul.envs
 import copy
 
 from seagul.rl.common import ReplayBuffer, update_mean, update_std, RandModel, make_schedule
+from seagul.rl import rollout
 
 
 
@@ -72,7 +74,8 @@ class SACAgent:
 
         torch.set_num_threads(1) # performance issue with data loader
 
-        env = gym.make(self.env_name, **self.env_config)
+        env = seagul.envs.make(self.env_name, **self.env_config)
+        buffers = rollout.RolloutBuffers.from_env(env, backend="torch", dtype=torch.float32, next_obs=True)
         if isinstance(env.action_space, gym.spaces.Box):
             act_size = env.action_space.shape[0]
             act_dtype = env.action_space.sample().dtype
@@ -118,7 +121,7 @@ class SACAgent:
         norm_obs1 = torch.empty(0)
 
         while cur_total_steps < self.normalize_steps:
-            ep_obs1, ep_obs2, ep_acts, ep_rews, ep_done = do_rollout(env, random_model, self.env_max_steps)
+            ep_obs1, ep_obs2, ep_acts, ep_rews, ep_done = do_rollout(env, random_model, self.env_max_steps, buffers)
             norm_obs1 = torch.cat((norm_obs1, ep_obs1))
 
             ep_steps = ep_rews.shape[0]
@@ -143,7 +146,7 @@ class SACAgent:
             self.model.q2_fn.state_std = self.model.q1_fn.state_std
 
         while cur_total_steps < self.exploration_steps:
-            ep_obs1, ep_obs2, ep_acts, ep_rews, ep_done = do_rollout(env, random_model, self.env_max_steps)
+            ep_obs1, ep_obs2, ep_acts, ep_rews, ep_done = do_rollout(env, random_model, self.env_max_steps, buffers)
             self.replay_buf.store(ep_obs1, ep_obs2, ep_acts, ep_rews, ep_done)
 
             ep_steps = ep_rews.shape[0]
@@ -163,7 +166,7 @@ class SACAgent:
             # collect data with the current policy
             # ========================================================================
             while cur_batch_steps < self.min_steps_per_update:
-                ep_obs1, ep_obs2, ep_acts, ep_rews, ep_done = do_rollout(env, self.model, self.env_max_steps)
+                ep_obs1, ep_obs2, ep_acts, ep_rews, ep_done = do_rollout(env, self.model, self.env_max_steps, buffers)
                 self.replay_buf.store(ep_obs1, ep_obs2, ep_acts, ep_rews, ep_done)
 
                 ep_steps = ep_rews.shape[0]
@@ -278,46 +281,21 @@ class SACAgent:
         return self.model, self.raw_rew_hist, locals()
 
 
-def do_rollout(env, model, num_steps):
+def do_rollout(env, model, num_steps, buffers=None):
     torch.autograd.set_grad_enabled(False)
-    acts_list = []
-    obs1_list = []
-    obs2_list = []
-    rews_list = []
-    done_list = []
 
-    dtype = torch.float32
     act_size = env.action_space.shape[0]
-    obs = env.reset()
-    done = False
-    cur_step = 0
-
-    while not done:
-        obs = torch.as_tensor(obs, dtype=dtype)
-        obs1_list.append(obs.clone())
+    if buffers is None:
+        buffers = rollout.RolloutBuffers.from_env(env, backend="torch", dtype=torch.float32, next_obs=True)
 
+    def select_action(obs):
         noise = torch.randn(1, act_size)
         act, _ = model.select_action(obs.reshape(1, -1), noise)
+        return act, act.numpy().reshape(-1)
 
-        obs, rew, done, _ = env.step(act.numpy().reshape(-1))
-        obs = torch.as_tensor(obs, dtype=dtype)
-
-        acts_list.append(torch.as_tensor(act.clone(), dtype=dtype))
-        rews_list.append(torch.as_tensor(rew, dtype=dtype))
-        obs2_list.append(obs.clone())
-
-        if cur_step < num_steps:
-            done_list.append(torch.as_tensor(done))
-        else:
-            done_list.append(torch.as_tensor(False))
-
-        cur_step += 1
-
-    ep_obs1 = torch.stack(obs1_list)
-    ep_acts = torch.stack(acts_list).reshape(-1, act_size)
-    ep_rews = torch.stack(rews_list).reshape(-1, 1)
-    ep_obs2 = torch.stack(obs2_list)
-    ep_done = torch.stack(done_list).reshape(-1, 1)
+    ep_length = rollout.do_rollout(env, select_action, buffers)
+    buffers.done[num_steps:ep_length] = False  # hitting the time limit isn't a real termination
 
     torch.autograd.set_grad_enabled(True)
-    return ep_obs1, ep_obs2, ep_acts, ep_rews, ep_done
+    return (buffers.obs[:ep_length], buffers.next_obs[:ep_length], buffers.act[:ep_length],
+            buffers.rew[:ep_length], buffers.done[:ep_length])
@@ -1,7 +1,9 @@
 from seagul.rl.common import ReplayBuffer, RandModel, make_schedule, update_target_fn
+from seagul.rl import rollout
 import numpy as np
 import copy
 import gym
+import seagul.envs
 import dill
 import tqdm.auto as tqdm
 import torch
@@ -29,7 +31,8 @@ def ddpg(
     # ========================================================================
     if env_config is None:
         env_config = {}
-    env = gym.make(env_name, **env_config)
+    env = seagul.envs.make(env_name, **env_config)
+    buffers = rollout.RolloutBuffers.from_env(env, backend="torch", dtype=torch.float32, next_obs=True)
     if isinstance(env.action_space, gym.spaces.Box):
         act_size = env.action_space.shape[0]
         act_dtype = env.action_space.sample().dtype
@@ -72,7 +75,7 @@ def ddpg(
     # Fill the replay buffer with actions taken from a random model
     # ========================================================================
     while cur_total_steps < exploration_steps:
-        ep_obs1, ep_obs2, ep_acts, ep_rews, ep_done = do_rollout(env, random_model, env_max_steps, act_std)
+        ep_obs1, ep_obs2, ep_acts, ep_rews, ep_done = do_rollout(env, random_model, env_max_steps, act_std, buffers)
         replay_buf.store(ep_obs1, ep_obs2, ep_acts, ep_rews, ep_done)
 
         ep_steps = ep_rews.shape[0]
@@ -94,7 +97,7 @@ def ddpg(
         # collect data with the current policy
         # ========================================================================
         while cur_batch_steps < min_steps_per_update:
-            ep_obs1, ep_obs2, ep_acts, ep_rews, ep_done = do_rollout(env, model, env_max_steps, act_std)
+            ep_obs1, ep_obs2, ep_acts, ep_rews, ep_done = do_rollout(env, model, env_max_steps, act_std, buffers)
             replay_buf.store(ep_obs1, ep_obs2, ep_acts, ep_rews, ep_done)
 
             ep_steps = ep_rews.shape[0]
@@ -159,47 +162,22 @@ def ddpg(
     return model, raw_rew_hist, locals()
 
 
-def do_rollout(env, model, num_steps, act_std):
+def do_rollout(env, model, num_steps, act_std, buffers=None):
     torch.autograd.set_grad_enabled(False)
-    acts_list = []
-    obs1_list = []
-    obs2_list = []
-    rews_list = []
-    done_list = []
 
-    dtype = torch.float32
     act_size = env.action_space.shape[0]
-    obs = env.reset()
-    done = False
-    cur_step = 0
-
-    while not done:
-        obs = torch.as_tensor(obs, dtype=dtype).detach()
-        obs1_list.append(obs.clone())
+    if buffers is None:
+        buffers = rollout.RolloutBuffers.from_env(env, backend="torch", dtype=torch.float32, next_obs=True)
 
+    def select_action(obs):
         noise = torch.randn(1, act_size)*act_std
         act, _ = model.select_action(obs.reshape(1, -1), noise)
         act = act.detach()
+        return act, act.numpy().reshape(-1)
 
-        obs, rew, done, _ = env.step(act.numpy().reshape(-1))
-        obs = torch.as_tensor(obs, dtype=dtype).detach()
-
-        acts_list.append(torch.as_tensor(act.clone(), dtype=dtype))
-        rews_list.append(torch.as_tensor(rew, dtype=dtype))
-        obs2_list.append(obs.clone())
-
-        if cur_step < num_steps:
-            done_list.append(torch.as_tensor(done))
-        else:
-            done_list.append(torch.as_tensor(False))
-
-        cur_step += 1
-
-    ep_obs1 = torch.stack(obs1_list)
-    ep_acts = torch.stack(acts_list).reshape(-1, act_size)
-    ep_rews = torch.stack(rews_list).reshape(-1, 1)
-    ep_obs2 = torch.stack(obs2_list)
-    ep_done = torch.stack(done_list).reshape(-1, 1)
+    ep_length = rollout.do_rollout(env, select_action, buffers)
+    buffers.done[num_steps:ep_length] = False  # hitting the time limit isn't a real termination
 
     torch.autograd.set_grad_enabled(True)
-    return ep_obs1, ep_obs2, ep_acts, ep_rews, ep_done
+    return (buffers.obs[:ep_length], buffers.next_obs[:ep_length], buffers.act[:ep_length],
+            buffers.rew[:ep_length], buffers.done[:ep_length])
@@ -0,0 +1,170 @@
+import numpy as np
+from numpy import sin, cos, pi
+from seagul.integration import rk4
+from seagul.envs.matlab import bball_np
+from seagul.envs.matlab.bball_env import BBallEnv
+from seagul.envs.matlab.bball3_env import BBall3Env
+
+
+def impact_m(X, e=0.8):
+    # bball3_src/impact.m line for line (params.m inlined), the reference bball_np.impact is checked against
+    M1 = M2 = M3 = 1.0; Mb = 0.1
+    l1 = l2 = l3 = 0.3
+    I1 = I2 = I3 = 0.0075
+    p1 = p2 = p3 = 0.15
+
+    q1, q2, q3, xb, yb = X[:5]
+    th1 = q1; th2 = q1 + q2; th3 = q1 + q2 + q3
+    thetaPerp = th3 + pi/2
+
+    x1 = -l1*sin(th1); x1cm = -p1*sin(th1)
+    x2 = x1 - l2*sin(th2); x2cm = x1 - p2*sin(th2)
+    x3 = x2 - l3*sin(th3); x3cm = x2 - p3*sin(th3)
+    y1 = l1*cos(th1); y1cm = p1*cos(th1)
+    y2 = y1 + l2*cos(th2); y2cm = y1 + p2*cos(th2)
+    y3 = y2 + l3*cos(th3); y3cm = y2 + p3*cos(th3)
+
+    ImpLinkSlope = (y3 - y2)/(x3 - x2)
+    impLinkIntercept = y3 - ImpLinkSlope*x3
+    assert ImpLinkSlope >= 1e-10, "the horizontal shortcut in impact.m isn't reproduced by bball_np"
+    perpLineSlope = -1/ImpLinkSlope
+    perpLineIntercept = yb - perpLineSlope*xb
+    interceptPoint = np.linalg.solve([[-ImpLinkSlope, 1], [-perpLineSlope, 1]], [impLinkIntercept, perpLineIntercept])
+    limp = np.sqrt((interceptPoint[0] - x2)**2 + (interceptPoint[1] - y2)**2)
+    ximp = x2 - limp*sin(th3)
+    yimp = y2 + limp*cos(th3)
+
+    mass = [M1, M2, M3]; inertia = [I1, I2, I2]
+    linkComX = [x1cm, x2cm, x3cm]; linkComY = [y1cm, y2cm, y3cm]
+    Mx = np.zeros((3, 3)); My = np.zeros((3, 3)); Mt = np.zeros((3, 3))
+    for row, (xp, yp) in enumerate([(0, 0), (x1, y1), (x2, y2)]):
+        for n in range(row, 3):
+            Mx[row, n] = -mass[n]*(linkComY[n] - yp)
+            My[row, n] = mass[n]*(linkComX[n] - xp)
+            Mt[row, n] = inertia[n]
+
+    JX = np.array([[-p1*cos(q1), 0, 0],
+                   [-p2*cos(q1 + q2) - l1*cos(q1), -p2*cos(q1 + q2), 0],
+                   [-l2*cos(q1 + q2) - l1*cos(q1) - p3*cos(q1 + q2 + q3), -l2*cos(q1 + q2) - p3*cos(q1 + q2 + q3), -p3*cos(q1 + q2 + q3)]])
+    JY = np.array([[-p1*sin(q1), 0, 0],
+                   [-p2*sin(q1 + q2) - l1*sin(q1), -p2*sin(q1 + q2), 0],
+                   [-l2*sin(q1 + q2) - l1*sin(q1) - p3*sin(q1 + q2 + q3), -l2*sin(q1 + q2) - p3*sin(q1 + q2 + q3), -p3*sin(q1 + q2 + q3)]])
+    Jth = np.array([[1, 0, 0], [1, 1, 0], [1, 1, 1]])
+
+    arm = Mx @ JX + My @ JY + Mt @ Jth
+    eqns = np.zeros((5, 5))
+    eqns[:3, :3] = arm
+    eqns[:3, 3:] = [[-Mb*yimp, Mb*ximp], [-Mb*(yimp - y1), Mb*(ximp - x1)], [-Mb*(yimp - y2), Mb*(ximp - x2)]]
+    eqns[3] = [l2*cos(q1 + q2 - thetaPerp) + limp*cos(q1 + q2 + q3 - thetaPerp) + l1*cos(q1 - thetaPerp),
+               l2*cos(q1 + q2 - thetaPerp) + limp*cos(q1 + q2 + q3 - thetaPerp), limp*cos(q1 + q2 + q3 - thetaPerp),
+               cos(thetaPerp), sin(thetaPerp)]
+    eqns[4] = [l2*sin(q1 + q2 - thetaPerp) + limp*sin(q1 + q2 + q3 - thetaPerp) + l1*sin(q1 - thetaPerp),
+               l2*sin(q1 + q2 - thetaPerp) + limp*sin(q1 + q2 + q3 - thetaPerp), limp*sin(q1 + q2 + q3 - thetaPerp),
+               -sin(thetaPerp), cos(thetaPerp)]
+    LHS = eqns @ X[5:10]
+    LHS[4] *= -e
+    return np.concatenate((X[:5], np.linalg.solve(eqns, LHS)))
+
+
+def energy(X, ode, prm):
+    # mass matrix recovered from the ode itself (d2x = D^-1 (U - C)), so this doesn't share any code with it
+    nl = len(prm["l"])
+    acc = lambda U: ode(0, X, U)[nl + 2:2*nl + 2]
+    D = np.linalg.inv(np.column_stack([acc(np.eye(nl)[i]) - acc(np.zeros(nl)) for i in range(nl)]))
+    dq, vb = X[nl + 2:2*nl + 2], X[2*nl + 2:]
+
+    th = np.cumsum(X[:nl])
+    y_joint = np.concatenate(([0], np.cumsum(np.array(prm["l"])*cos(th))))
+    y_com = y_joint[:-1] + np.array(prm["p"])*cos(th)
+
+    kinetic = dq @ D @ dq/2 + prm["Mb"]*(vb @ vb)/2
+    potential = prm["g"]*(np.array(prm["M"]) @ y_com + prm["Mb"]*X[nl + 1])
+    return kinetic + potential
+
+
+def link_slope(X, prm):
+    # slope of the last link the way impact.m computes it, below 1e-10 it takes its horizontal shortcut
+    _, P = bball_np._joints(X, prm)
+    return (P[-1, 1] - P[-2, 1])/(P[-1, 0] - P[-2, 0])
+
+
+def ball_on_link(q, along, speed, prm, gap=0.0, noise=1.0):
+    # state with the ball gap above the last link's surface and moving towards it, plus noise on the velocities
+    nl = len(prm["l"])
+    th, P = bball_np._joints(np.concatenate((q, [0, 0])), prm)
+    d = np.array([-sin(th[-1]), cos(th[-1])])
+    normal = np.array([-d[1], d[0]])
+    if normal[1] < 0:
+        normal = -normal
+    ball = P[-2] + along*d + (prm["rb"] + gap)*normal
+    rng = np.random.default_rng(len(q))
+    return np.concatenate((q, ball, noise*rng.normal(size=nl), -speed*normal + noise*rng.normal(size=2)*.1)), normal
+
+
+if __name__ == "__main__":
+    rng = np.random.default_rng(0)
+    prm3_elastic = dict(bball_np.BBALL3_PARAMS, e=1.0)
+    prm2_elastic = dict(bball_np.BBALL_PARAMS, e=1.0)
+
+    # impact agrees with impact.m wherever impact.m doesn't take its horizontal link shortcut
+    n_checked = 0
+    while n_checked < 50:
+        X, _ = ball_on_link(rng.uniform(-pi/3, pi/3, 3), rng.uniform(.05, .25), rng.uniform(.5, 3), bball_np.BBALL3_PARAMS)
+        if link_slope(X, bball_np.BBALL3_PARAMS) < 1e-10:
+            continue
+        assert np.allclose(bball_np.impact(X, bball_np.BBALL3_PARAMS), impact_m(X), rtol=1e-9, atol=1e-11)
+        assert np.allclose(bball_np.impact(X, prm3_elastic), impact_m(X, e=1.0), rtol=1e-9, atol=1e-11)
+        n_checked += 1
+
+    # with e=1 impacts conserve energy as well as impact.m does, with e<1 they lose some
+    worst_m, worst_np = 0.0, 0.0
+    for _ in range(50):
+        X, _ = ball_on_link(rng.uniform(-pi/3, pi/3, 3), rng.uniform(.05, .25), rng.uniform(.5, 3), bball_np.BBALL3_PARAMS)
+        E0 = energy(X, bball_np.ode_torque3, prm3_elastic)
+        worst_np = max(worst_np, abs(energy(bball_np.impact(X, prm3_elastic), bball_np.ode_torque3, prm3_elastic) - E0))
+        if link_slope(X, prm3_elastic) >= 1e-10:
+            worst_m = max(worst_m, abs(energy(impact_m(X, e=1.0), bball_np.ode_torque3, prm3_elastic) - E0))
+        assert energy(bball_np.impact(X, bball_np.BBALL3_PARAMS), bball_np.ode_torque3, prm3_elastic) < E0
+
+        X, _ = ball_on_link(rng.uniform(-pi/3, pi/3, 2), rng.uniform(.05, .25), rng.uniform(.5, 3), bball_np.BBALL_PARAMS)
+        E0 = energy(X, bball_np.ode_torque2, prm2_elastic)
+        worst_np = max(worst_np, abs(energy(bball_np.impact(X, prm2_elastic), bball_np.ode_torque2, prm2_elastic) - E0))
+    assert worst_np <= max(10*worst_m, 1e-12), (worst_np, worst_m)
+
+    # zero torque dynamics conserve energy, checks D and C against each other
+    for ode, prm, q in [(bball_np.ode_torque2, bball_np.BBALL_PARAMS, [.3, -.5]),
+                        (bball_np.ode_torque3, bball_np.BBALL3_PARAMS, [.3, -.5, .8])]:
+        nl = len(q)
+        X = np.concatenate((q, [2.0, 5.0], rng.normal(size=nl), [0, 0]))
+        E0 = energy(X, ode, prm)
+        for _ in range(2000):
+            X = rk4(ode, np.zeros(nl), 0, 1e-4, X)
+        assert abs(energy(X, ode, prm) - E0) < 1e-6*abs(E0)
+
+    # the envs bounce a ball thrown at the arm off it, within one step
+    for env, prm, q in [(BBallEnv(backend="numpy"), bball_np.BBALL_PARAMS, [.3, -.5]),
+                        (BBall3Env(backend="numpy"), bball_np.BBALL3_PARAMS, [.3, -.5, .4])]:
+        env.reset()
+        env.state, normal = ball_on_link(np.array(q), .15, 3.0, prm, gap=.02, noise=0.0)
+        obs, rew, done, info = env.step(np.zeros(env.action_space.shape))
+        assert obs[-2:] @ normal > 0, type(env).__name__
+
+    # and match the matlab backend, when there is one
+    try:
+        import matlab.engine
+    except ImportError:
+        print("no matlab engine, skipping the comparison against the matlab backend")
+    else:
+        for make in (BBallEnv, lambda **kw: BBall3Env(max_torque=0.0, **kw)):
+            env_np, env_m = make(backend="numpy"), make(backend="matlab")
+            obs_np, obs_m = env_np.reset(), env_m.reset()
+            for _ in range(10):
+                act = np.zeros(env_np.action_space.shape)
+                obs_np, _, done_np, _ = env_np.step(act)
+                obs_m, _, done_m, _ = env_m.step(act)
+                # matlab works in single precision, and detects impacts on samples instead of bisecting
+                assert np.allclose(obs_np, obs_m, atol=1e-2), (obs_np, obs_m)
+                if done_np or done_m:
+                    break
+
+    print("bball_np checks passed")
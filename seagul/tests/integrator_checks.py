@@ -0,0 +1,28 @@
+import numpy as np
+from seagul.integration import batch_euler, batch_rk4, symplectic_euler, verlet, dopri5, dopri5_solve
+from seagul.envs.classic_control.vec_acrobot import VecSGAcroEnv
+
+
+if __name__ == "__main__":
+    # one step of VecSGAcroEnv with every integrator its docstring lists
+    for integrator in (batch_euler, batch_rk4, symplectic_euler, verlet, dopri5):
+        env = VecSGAcroEnv(num_envs=4, integrator=integrator)
+        env.reset()
+        env.t[:] = [0.0, 0.01, 0.02, 0.03]  # per env times, as after some of them auto reset
+        obs, rew, done, info = env.step(np.zeros((4, 1)))
+        assert obs.shape == (4, 4) and rew.shape == (4,) and done.shape == (4,), integrator.__name__
+        assert np.isfinite(obs).all(), integrator.__name__
+
+    # dopri5 with per env start times hands back per env end times
+    derivs = lambda t, Q, A: np.column_stack((Q[:, 1], -Q[:, 0]))
+    s, t, event, h = dopri5_solve(derivs, np.zeros((2, 1)), np.array([0.0, 1.0]), 1.0, np.array([[1.0, 0.0]] * 2))
+    assert np.allclose(t, [1.0, 2.0]) and event is None
+    assert np.allclose(s, [[np.cos(1), -np.sin(1)]] * 2)
+
+    # events still work from a scalar start time
+    hit_ground = lambda t, q, a: q[0]
+    hit_ground.direction = -1
+    s, t, event, h = dopri5_solve(lambda t, q, a: np.array([q[1], -9.8]), 0.0, 0, 10, np.array([1.0, 0.0]), events=[hit_ground])
+    assert event == 0 and np.isclose(t, np.sqrt(2 / 9.8)) and abs(s[0]) < 1e-6
+
+    print("integrator checks passed")
@@ -0,0 +1,77 @@
+import signal
+import numpy as np
+import gym
+from seagul.envs.vec_subproc import VecSubprocEnv
+
+
+class RaiseOnThirdStep(gym.Env):
+    observation_space = gym.spaces.Box(-1, 1, (2,), dtype=np.float32)
+    action_space = gym.spaces.Box(-1, 1, (1,), dtype=np.float32)
+
+    def __init__(self, raise_on=3):
+        self.raise_on = raise_on
+        self.cur_step = 0
+
+    def reset(self):
+        self.cur_step = 0
+        return np.zeros(2, dtype=np.float32)
+
+    def step(self, act):
+        self.cur_step += 1
+        if self.cur_step == self.raise_on:
+            raise ValueError("boom")
+        return np.full(2, self.cur_step, dtype=np.float32), 1.0, False, {}
+
+
+class RaiseInFirstWorker(RaiseOnThirdStep):
+    # only the env seeded with 0 (the first worker after seed(0)) blows up, the others stay healthy
+
+    def __init__(self):
+        super().__init__(raise_on=None)
+
+    def seed(self, seed=None):
+        self.raise_on = 3 if seed == 0 else None
+
+
+if __name__ == "__main__":
+    signal.alarm(60)  # a hang is a failure, don't wait on it forever
+
+    # normal stepping
+    env = VecSubprocEnv(lambda: RaiseOnThirdStep(raise_on=None), num_envs=3)
+    obs = env.reset()
+    assert obs.shape == (3, 2)
+    obs, rew, done, info = env.step(np.zeros((3, 1)))
+    assert (obs == 1).all() and rew.shape == (3,) and done.shape == (3,)
+    assert info["terminal_obs"].shape == (3, 2)
+    env.close()
+
+    # an exception in a worker's step comes back to the master as a RuntimeError, the master doesn't hang
+    env = VecSubprocEnv(RaiseInFirstWorker, num_envs=3)
+    env.seed(0)
+    env.reset()
+    env.step(np.zeros((3, 1)))
+    env.step(np.zeros((3, 1)))
+    try:
+        env.step(np.zeros((3, 1)))
+    except RuntimeError as e:
+        assert "boom" in str(e) and "worker 0" in str(e)
+    else:
+        raise AssertionError("worker exception was not raised")
+    assert env.closed and not any(proc.is_alive() for proc in env.procs)
+
+    # same thing through step_async/step_wait
+    env = VecSubprocEnv(RaiseInFirstWorker, num_envs=2)
+    env.seed(0)
+    env.reset()
+    for _ in range(2):
+        env.step_async(np.zeros((2, 1)))
+        env.step_wait()
+    env.step_async(np.zeros((2, 1)))
+    try:
+        env.step_wait()
+    except RuntimeError:
+        pass
+    else:
+        raise AssertionError("worker exception was not raised")
+
+    print("vec_subproc checks passed")